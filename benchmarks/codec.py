@@ -0,0 +1,106 @@
+"""
+Compare JSON backends and request compression on large payloads.
+
+Sends long-context and vision requests through ``OpenAI`` to a local mock
+gateway that answers with a long reply, once for each combination of the
+stdlib/orjson JSON backend and gzip request compression off/on, and reports
+the request and response bytes on the wire and the client CPU time per
+request. CPU time is that of the calling thread, so the mock gateway's own
+work is not counted. Context checks are turned off so token counting does
+not dilute the encoding costs.
+
+Usage:
+    python benchmarks/codec.py [--requests 200] [--prompt-kb 200] [--image-kb 150] [--reply-kb 32]
+"""
+import argparse
+import base64
+import os
+import random
+import sys
+import time
+from typing import List, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.mock_gateway import MockGateway  # noqa: E402
+from functions.codec import configure_codec  # noqa: E402
+from functions.config import configure  # noqa: E402
+from functions.openai import OpenAI  # noqa: E402
+from functions.telemetry import add_hook, remove_hook  # noqa: E402
+from functions.tokens import configure_context_checks  # noqa: E402
+
+# (label, json backend, compress)
+CONFIGS: List[Tuple[str, str, bool]] = [
+    ("json", "json", False),
+    ("orjson", "orjson", False),
+    ("json+gzip", "json", True),
+    ("orjson+gzip", "orjson", True),
+]
+
+
+def long_prompt(kilobytes: int, seed: int = 0) -> str:
+    # Word salad from a small vocabulary, compressing about as well as prose
+    rng = random.Random(seed)
+    vocabulary = [
+        "".join(rng.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(rng.randint(2, 9)))
+        for _ in range(3000)
+    ]
+    words: List[str] = []
+    size = 0
+    while size < kilobytes * 1024:
+        word = rng.choice(vocabulary)
+        words.append(word)
+        size += len(word) + 1
+    return " ".join(words)
+
+
+def image_url(kilobytes: int, seed: int = 0) -> str:
+    # Already-compressed image data is close to random bytes
+    data = random.Random(seed).randbytes(kilobytes * 1024)
+    return "data:image/jpeg;base64," + base64.b64encode(data).decode("ascii")
+
+
+def run(label: str, n: int, gateway: MockGateway, message: str, image: str) -> None:
+    received = []
+    hook = add_hook(lambda record: received.append(record.response_bytes))
+    gateway.reset()
+    cpu = time.thread_time()
+    wall = time.perf_counter()
+    for i in range(n):
+        OpenAI(f"{i} {message}", imageURL=image, max_tokens=1000)
+    wall = time.perf_counter() - wall
+    cpu = time.thread_time() - cpu
+    remove_hook(hook)
+    print(
+        f"  {label:12s} sent {gateway.bytes_received / n / 1024:8.1f} KiB  received {sum(received) / n / 1024:6.1f} KiB"
+        f"  cpu {cpu / n * 1000:6.2f} ms  wall {wall / n * 1000:6.2f} ms"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--prompt-kb", type=int, default=200, help="size of the long-context prompt")
+    parser.add_argument("--image-kb", type=int, default=150, help="size of the image before base64 encoding")
+    parser.add_argument("--reply-kb", type=int, default=32, help="size of each reply")
+    args = parser.parse_args()
+
+    configure_context_checks("off")
+    prompt = long_prompt(args.prompt_kb)
+    scenarios = [
+        ("long context", prompt, None),
+        ("vision", "Describe this image.", image_url(args.image_kb)),
+    ]
+    with MockGateway(reply=long_prompt(args.reply_kb, seed=1)) as gateway:
+        configure(api_key="mock", base_url=gateway.url)
+        for name, message, image in scenarios:
+            print(f"{name} ({args.requests} requests):")
+            for label, backend, compress in CONFIGS:
+                configure_codec(json_backend=backend, compress=compress)
+                OpenAI("warm up", imageURL=image)
+                run(label, args.requests, gateway, message, image)
+    configure_codec()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Compare latency percentiles with and without hedged requests.
+
+Runs the same sequence of ``OpenAI`` calls against a local mock gateway whose
+latency has a slow tail, first plainly and then with ``hedge=True``.
+
+Usage:
+    python benchmarks/hedging.py [--requests 400] [--tail 0.05]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from typing import List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.mock_gateway import MockGateway, tail_latency  # noqa: E402
+from functions.async_client import AsyncOpenAI  # noqa: E402
+from functions.async_transport import close_async_transport  # noqa: E402
+from functions.config import configure  # noqa: E402
+from functions.hedge import configure_hedging  # noqa: E402
+from functions.openai import OpenAI  # noqa: E402
+
+
+def percentile(samples: List[float], q: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q / 100))]
+
+
+def run_sync(n: int, hedge: bool) -> List[float]:
+    latencies = []
+    for i in range(n):
+        start = time.perf_counter()
+        OpenAI(f"request {i}", hedge=hedge)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+async def run_async(n: int, hedge: bool) -> List[float]:
+    latencies = []
+    for i in range(n):
+        start = time.perf_counter()
+        await AsyncOpenAI(f"request {i}", hedge=hedge)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+async def run_async_pair(n: int, gateway: MockGateway) -> None:
+    # Both runs share one event loop, since the shared async client is bound to it
+    for label, hedge in (("async", False), ("async hedged", True)):
+        before = gateway.requests
+        latencies = await run_async(n, hedge)
+        report(label, latencies, gateway.requests - before)
+    await close_async_transport()
+
+
+def report(label: str, latencies: List[float], upstream: int) -> None:
+    print(
+        f"{label:<18} p50 {percentile(latencies, 50) * 1000:7.1f} ms"
+        f"   p99 {percentile(latencies, 99) * 1000:7.1f} ms"
+        f"   upstream requests {upstream / len(latencies):.3f}x"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=400, help="calls per run")
+    parser.add_argument("--base", type=float, default=0.02, help="typical latency in seconds")
+    parser.add_argument("--slow", type=float, default=0.4, help="latency of slow requests in seconds")
+    parser.add_argument("--tail", type=float, default=0.05, help="fraction of slow requests")
+    parser.add_argument("--budget", type=float, default=0.1, help="maximum fraction of extra requests")
+    args = parser.parse_args()
+
+    with MockGateway(latency=tail_latency(args.base, args.slow, args.tail)) as gateway:
+        configure(api_key="mock", base_url=gateway.url)
+        hedger = configure_hedging(percentile=90, budget=args.budget, min_samples=20)
+
+        for label, hedge in (("sync", False), ("sync hedged", True)):
+            before = gateway.requests
+            latencies = run_sync(args.requests, hedge)
+            report(label, latencies, gateway.requests - before)
+        asyncio.run(run_async_pair(args.requests, gateway))
+        print(f"hedges sent: {hedger.hedges} of {hedger.requests} hedge-enabled calls")
+
+
+if __name__ == "__main__":
+    main()
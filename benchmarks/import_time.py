@@ -0,0 +1,79 @@
+"""
+Measure the cold import time of the ``functions`` modules.
+
+Each import runs in a fresh interpreter with no HKBU credentials set, so the
+numbers include everything a short-lived worker pays before its first call.
+
+Usage:
+    python benchmarks/import_time.py [--runs 15]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from typing import List, Tuple
+
+ROOT: str = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+TARGETS: List[str] = [
+    "functions",
+    "functions.openai",
+    "functions.claude",
+    "functions.gemini",
+    "functions.llama",
+    "functions.deepseek",
+    "functions.qwen",
+    "functions.batch",
+    "functions.async_client",
+]
+
+# Third-party modules whose presence after import shows what got loaded eagerly
+HEAVY_MODULES: Tuple[str, ...] = ("requests", "httpx", "dotenv")
+
+SNIPPET = """
+import sys, time
+start = time.perf_counter()
+import {target}
+elapsed = time.perf_counter() - start
+print(elapsed, ",".join(m for m in {heavy!r} if m in sys.modules))
+"""
+
+
+def measure(target: str, runs: int) -> Tuple[float, str]:
+    """
+    Import ``target`` in ``runs`` fresh interpreters.
+
+    Args:
+        target (str): Module to import.
+        runs (int): Number of interpreters to start.
+
+    Returns:
+        Tuple[float, str]: Median import time in milliseconds and the heavy modules loaded.
+    """
+    env = {k: v for k, v in os.environ.items() if not k.startswith("HKBU_")}
+    code = SNIPPET.format(target=target, heavy=HEAVY_MODULES)
+    timings = []
+    loaded = ""
+    for _ in range(runs):
+        out = subprocess.run(
+            [sys.executable, "-c", code], cwd=ROOT, env=env, capture_output=True, text=True, check=True
+        ).stdout.split()
+        timings.append(float(out[0]) * 1000)
+        loaded = out[1] if len(out) > 1 else "-"
+    return statistics.median(timings), loaded
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=15, help="interpreters per module")
+    args = parser.parse_args()
+
+    print(f"{'module':<26}{'median ms':>10}  loaded")
+    for target in TARGETS + list(HEAVY_MODULES):
+        ms, loaded = measure(target, args.runs)
+        print(f"{target:<26}{ms:>10.1f}  {loaded}")
+
+
+if __name__ == "__main__":
+    main()
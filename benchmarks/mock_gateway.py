@@ -0,0 +1,434 @@
+"""
+Local stand-in for the HKBU GenAI gateway, for benchmarks that must not touch the network.
+
+Answers every ``/deployments/{model}/...`` POST in the format of the
+endpoint's model family (``chat/completions``, ``messages``,
+``generate_content``, ``llama/completion`` and ``embeddings``) after a delay
+drawn from a configurable latency distribution. A share of requests can be
+answered with 5xx errors or 429s, and requests with ``"stream": true`` get an
+SSE stream of the reply, sent with chunked transfer encoding so the
+connection stays reusable. Gzip-compressed request bodies are accepted.
+
+Usage:
+    with MockGateway(latency=tail_latency(0.02, 0.5, 0.05), error_rate=0.01) as gateway:
+        configure(api_key="mock", base_url=gateway.url)
+        OpenAI("hello")
+
+    python benchmarks/mock_gateway.py --port 8000 --latency lognormal:0.05:0.5
+"""
+import argparse
+import gzip
+import json
+import math
+import random
+import threading
+import time
+from collections import Counter
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from typing import Optional, Dict, List, Any, Callable, Tuple
+
+Latency = Callable[[], float]
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    # The default backlog of 5 drops connects of concurrent clients, which then
+    # wait a full SYN retransmission timeout (1 s) and swamp the percentiles
+    request_queue_size = 1024
+
+
+def fixed_latency(seconds: float) -> Latency:
+    """Every request takes ``seconds``."""
+    return lambda: seconds
+
+
+def _sampler(seed: Optional[int], draw: Callable[[random.Random], float]) -> Latency:
+    rng = random.Random(seed)
+    lock = threading.Lock()
+
+    def sample() -> float:
+        with lock:
+            return max(0.0, draw(rng))
+
+    return sample
+
+
+def uniform_latency(low: float, high: float, seed: Optional[int] = 0) -> Latency:
+    """Latencies are spread evenly between ``low`` and ``high`` seconds."""
+    return _sampler(seed, lambda rng: rng.uniform(low, high))
+
+
+def lognormal_latency(median: float, sigma: float = 0.5, seed: Optional[int] = 0) -> Latency:
+    """
+    Log-normally distributed latencies, the usual shape of service response times.
+
+    Args:
+        median (float): Median latency in seconds.
+        sigma (float): Standard deviation of the log latency; larger values give a longer tail.
+        seed (Optional[int]): Random seed for reproducible runs.
+
+    Returns:
+        Latency: A function returning the next request's latency.
+    """
+    mu = math.log(median)
+    return _sampler(seed, lambda rng: rng.lognormvariate(mu, sigma))
+
+
+def tail_latency(base: float, tail: float, tail_probability: float, seed: Optional[int] = 0) -> Latency:
+    """
+    Most requests take about ``base`` seconds; a ``tail_probability`` fraction take ``tail``.
+
+    Args:
+        base (float): Typical latency in seconds.
+        tail (float): Latency of slow requests in seconds.
+        tail_probability (float): Fraction of slow requests.
+        seed (Optional[int]): Random seed for reproducible runs.
+
+    Returns:
+        Latency: A function returning the next request's latency.
+    """
+    return _sampler(seed, lambda rng: (tail if rng.random() < tail_probability else base) * rng.uniform(0.9, 1.1))
+
+
+def parse_latency(spec: str) -> Latency:
+    """
+    Build a latency distribution from a command-line spec.
+
+    Accepted forms: ``0.05`` (fixed), ``uniform:LOW:HIGH``,
+    ``lognormal:MEDIAN[:SIGMA]`` and ``tail:BASE:TAIL:PROBABILITY``.
+
+    Args:
+        spec (str): The spec.
+
+    Returns:
+        Latency: The distribution.
+    """
+    kind, *args = spec.split(":")
+    try:
+        if not args:
+            return fixed_latency(float(kind))
+        values = [float(arg) for arg in args]
+        if kind == "uniform":
+            return uniform_latency(*values)
+        if kind == "lognormal":
+            return lognormal_latency(*values)
+        if kind == "tail":
+            return tail_latency(*values)
+    except (TypeError, ValueError):
+        pass
+    raise ValueError(f"Invalid latency spec {spec!r}")
+
+
+def _family(path: str) -> str:
+    if "/embeddings" in path:
+        return "embeddings"
+    if "/messages" in path:
+        return "claude"
+    if "/generate_content" in path:
+        return "gemini"
+    if "/llama/completion" in path:
+        return "llama"
+    return "chat"
+
+
+def _deployment(path: str) -> Optional[str]:
+    _, found, rest = path.partition("/deployments/")
+    return rest.split("/", 1)[0] if found else None
+
+
+def response_body(path: str, request: Dict[str, Any], text: str = "Hello") -> Dict[str, Any]:
+    """
+    Build a minimal successful response in the format of the endpoint at ``path``.
+
+    Args:
+        path (str): Request path.
+        request (Dict[str, Any]): Parsed request body.
+        text (str): Reply text.
+
+    Returns:
+        Dict[str, Any]: Response JSON.
+    """
+    family = _family(path)
+    completion_tokens = max(1, len(text.split()))
+    if family == "embeddings":
+        inputs = request.get("input") or []
+        data = [{"object": "embedding", "index": i, "embedding": [0.0] * 8} for i in range(len(inputs))]
+        return {"object": "list", "data": data, "usage": {"prompt_tokens": len(inputs), "total_tokens": len(inputs)}}
+    if family == "claude":
+        return {
+            "type": "message",
+            "role": "assistant",
+            "content": [{"type": "text", "text": text}],
+            "stop_reason": "end_turn",
+            "usage": {"input_tokens": 5, "output_tokens": completion_tokens},
+        }
+    if family == "gemini":
+        return {
+            "candidates": [{"content": {"role": "model", "parts": [{"text": text}]}, "finishReason": "STOP"}],
+            "usageMetadata": {
+                "promptTokenCount": 5,
+                "candidatesTokenCount": completion_tokens,
+                "totalTokenCount": 5 + completion_tokens,
+            },
+        }
+    if family == "llama":
+        return {"generation": text, "prompt_token_count": 5, "generation_token_count": completion_tokens, "stop_reason": "stop"}
+    return {
+        "object": "chat.completion",
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": "stop"}],
+        "usage": {"prompt_tokens": 5, "completion_tokens": completion_tokens, "total_tokens": 5 + completion_tokens},
+    }
+
+
+def stream_events(path: str, text: str = "Hello", chunks: int = 8) -> List[Tuple[Optional[str], str]]:
+    """
+    Build the SSE events that stream ``text`` in the format of the endpoint at ``path``.
+
+    Args:
+        path (str): Request path.
+        text (str): Reply text, split into about ``chunks`` deltas.
+        chunks (int): Number of text deltas.
+
+    Returns:
+        List[Tuple[Optional[str], str]]: ``(event name, data)`` pairs in sending order.
+    """
+    family = _family(path)
+    size = max(1, -(-len(text) // max(1, chunks)))
+    pieces = [text[i:i + size] for i in range(0, len(text), size)] or [""]
+    completion_tokens = max(1, len(text.split()))
+    events: List[Tuple[Optional[str], Any]] = []
+    if family == "claude":
+        events.append(("message_start", {"type": "message_start", "message": {"usage": {"input_tokens": 5}}}))
+        for piece in pieces:
+            events.append(("content_block_delta", {
+                "type": "content_block_delta", "index": 0, "delta": {"type": "text_delta", "text": piece},
+            }))
+        events.append(("message_delta", {
+            "type": "message_delta", "delta": {"stop_reason": "end_turn"}, "usage": {"output_tokens": completion_tokens},
+        }))
+        events.append(("message_stop", {"type": "message_stop"}))
+    elif family == "gemini":
+        for piece in pieces:
+            events.append((None, {"candidates": [{"content": {"role": "model", "parts": [{"text": piece}]}}]}))
+        events.append((None, {
+            "candidates": [{"content": {"role": "model", "parts": []}, "finishReason": "STOP"}],
+            "usageMetadata": {"promptTokenCount": 5, "candidatesTokenCount": completion_tokens},
+        }))
+    elif family == "llama":
+        for piece in pieces:
+            events.append((None, {"generation": piece}))
+        events.append((None, {"generation": "", "stop_reason": "stop", "generation_token_count": completion_tokens}))
+    else:
+        for piece in pieces:
+            events.append((None, {"choices": [{"index": 0, "delta": {"content": piece}}]}))
+        events.append((None, {"choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]}))
+    encoded = [(name, json.dumps(data, separators=(",", ":"))) for name, data in events]
+    if family == "chat":
+        encoded.append((None, "[DONE]"))
+    return encoded
+
+
+class MockGateway:
+    """
+    Threaded HTTP server imitating the gateway's deployment endpoints.
+
+    ``requests`` counts the requests received, ``bytes_received`` their body
+    bytes as sent on the wire and ``statuses`` the status codes sent, so
+    benchmarks can report upstream load and injected failures. Tests can set
+    ``forced_status`` or ``forced_body`` to answer every request with that
+    status or JSON body, map deployments to the status all their requests get
+    in ``deployment_statuses``, and read the last request from ``last_path``
+    and ``last_request``.
+    """
+
+    def __init__(
+        self,
+        latency: Latency = fixed_latency(0.0),
+        host: str = "127.0.0.1",
+        port: int = 0,
+        error_rate: float = 0.0,
+        rate_limit_rate: float = 0.0,
+        retry_after: float = 0.0,
+        reply: str = "Hello",
+        stream_chunks: int = 8,
+        chunk_interval: float = 0.0,
+        seed: Optional[int] = 0,
+    ) -> None:
+        """
+        Args:
+            latency (Latency): Returns the delay in seconds before each response (or first stream event).
+            host (str): Interface to listen on.
+            port (int): Port to listen on; 0 picks a free one.
+            error_rate (float): Fraction of requests answered with a 500 or 503.
+            rate_limit_rate (float): Fraction of requests answered with a 429.
+            retry_after (float): Seconds sent in the ``Retry-After`` header of 429s.
+            reply (str): Reply text of every completion.
+            stream_chunks (int): Number of text deltas a streamed reply is split into.
+            chunk_interval (float): Delay in seconds between stream events.
+            seed (Optional[int]): Random seed of the failure injection.
+        """
+        self.latency = latency
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after
+        self.reply = reply
+        self.stream_chunks = stream_chunks
+        self.chunk_interval = chunk_interval
+        self.requests = 0
+        self.bytes_received = 0
+        self.statuses: Counter = Counter()
+        self.forced_status: Optional[int] = None
+        self.forced_body: Optional[Dict[str, Any]] = None
+        self.deployment_statuses: Dict[str, int] = {}
+        self.last_path: Optional[str] = None
+        self.last_request: Any = None
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        gateway = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Headers and body are written separately; don't let Nagle delay the body
+            disable_nagle_algorithm = True
+
+            def log_message(self, *args: Any) -> None:
+                pass
+
+            def do_POST(self) -> None:
+                body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+                status = gateway._next_status(len(body), self.path)
+                if self.headers.get("Content-Encoding") == "gzip":
+                    body = gzip.decompress(body)
+                time.sleep(gateway.latency())
+                try:
+                    request = json.loads(body or b"{}")
+                except ValueError:
+                    request = {}
+                gateway.last_path, gateway.last_request = self.path, request
+                try:
+                    if status != 200:
+                        self._send_error(status)
+                    elif isinstance(request, dict) and request.get("stream"):
+                        self._send_stream()
+                    elif gateway.forced_body is not None:
+                        self._send_json(gateway.forced_body)
+                    else:
+                        self._send_json(response_body(self.path, request, gateway.reply))
+                except (BrokenPipeError, ConnectionResetError):
+                    # The client gave up on this request (e.g. a cancelled hedge)
+                    self.close_connection = True
+
+            def _send_json(self, data: Dict[str, Any], status: int = 200, headers: Optional[Dict[str, str]] = None) -> None:
+                out = json.dumps(data).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(out)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(out)
+
+            def _send_error(self, status: int) -> None:
+                if status == 429:
+                    error = {"error": {"code": "429", "message": "Rate limit exceeded"}}
+                    self._send_json(error, status, {"Retry-After": f"{gateway.retry_after:g}"})
+                else:
+                    self._send_json({"error": {"code": str(status), "message": "Injected failure"}}, status)
+
+            def _send_stream(self) -> None:
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                for i, (name, data) in enumerate(stream_events(self.path, gateway.reply, gateway.stream_chunks)):
+                    if i and gateway.chunk_interval:
+                        time.sleep(gateway.chunk_interval)
+                    event = f"event: {name}\ndata: {data}\n\n" if name else f"data: {data}\n\n"
+                    payload = event.encode("utf-8")
+                    self.wfile.write(b"%x\r\n%s\r\n" % (len(payload), payload))
+                    self.wfile.flush()
+                self.wfile.write(b"0\r\n\r\n")
+
+        self.server = _Server((host, port), Handler)
+        self._thread: Optional[threading.Thread] = None
+
+    def _next_status(self, size: int = 0, path: str = "") -> int:
+        with self._lock:
+            self.requests += 1
+            self.bytes_received += size
+            draw = self._rng.random()
+            deployment = _deployment(path)
+            if deployment in self.deployment_statuses:
+                status = self.deployment_statuses[deployment]
+            elif self.forced_status is not None:
+                status = self.forced_status
+            elif draw < self.rate_limit_rate:
+                status = 429
+            elif draw < self.rate_limit_rate + self.error_rate:
+                status = self._rng.choice((500, 503))
+            else:
+                status = 200
+            self.statuses[status] += 1
+        return status
+
+    @property
+    def url(self) -> str:
+        """Base URL to pass as HKBU_BASIC_URL."""
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def reset(self) -> None:
+        """Zero the request, byte and status counters and clear the forced answers."""
+        with self._lock:
+            self.requests = 0
+            self.bytes_received = 0
+            self.statuses.clear()
+            self.forced_status = None
+            self.forced_body = None
+            self.deployment_statuses = {}
+            self.last_path = None
+            self.last_request = None
+
+    def start(self) -> "MockGateway":
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self) -> "MockGateway":
+        return self.start()
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Serve a mock HKBU GenAI gateway until interrupted.")
+    parser.add_argument("--host", default="127.0.0.1", help="interface to listen on")
+    parser.add_argument("--port", type=int, default=8000, help="port to listen on")
+    parser.add_argument("--latency", default="0", help="0.05, uniform:LOW:HIGH, lognormal:MEDIAN:SIGMA or tail:BASE:TAIL:P")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of 5xx answers")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="fraction of 429 answers")
+    parser.add_argument("--retry-after", type=float, default=0.0, help="Retry-After seconds of 429 answers")
+    parser.add_argument("--chunk-interval", type=float, default=0.0, help="seconds between stream events")
+    args = parser.parse_args()
+
+    gateway = MockGateway(
+        parse_latency(args.latency), args.host, args.port, args.error_rate, args.rate_limit_rate,
+        args.retry_after, chunk_interval=args.chunk_interval,
+    )
+    print(f"Mock gateway listening on {gateway.url}")
+    try:
+        gateway.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        gateway.server.server_close()
+        print(f"Served {gateway.requests} requests: {dict(gateway.statuses)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,316 @@
+"""
+Offline benchmark suite for the wrappers in ``functions/``.
+
+Sends mixed-family traffic through a local mock gateway
+(``benchmarks/mock_gateway.py``) in several modes and reports throughput,
+latency percentiles and peak memory for each:
+
+    sequential  one call after another through the sync wrappers
+    threaded    the same calls from a thread pool
+    async       the async wrappers on one event loop
+    batch       ``run_batch`` over a JSONL file
+    stream      sequential streamed calls, reading every delta
+
+Peak memory is the tracemalloc peak of a second, traced run of each scenario,
+so tracing does not distort the timings. Results can be saved as JSON and
+compared with an earlier run: if any metric is worse than the baseline by more
+than the tolerance, the script exits with status 1.
+
+Usage:
+    python benchmarks/suite.py [--requests 300] [--latency lognormal:0.005:0.5] [--save results.json]
+    python benchmarks/suite.py --baseline results.json [--tolerance 0.25]
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, List, Any, Callable, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.mock_gateway import MockGateway, parse_latency  # noqa: E402
+from functions import async_client  # noqa: E402
+from functions.async_transport import AsyncTransport, close_async_transport, set_async_transport  # noqa: E402
+from functions.batch import WRAPPERS, run_batch, run_request  # noqa: E402
+from functions.config import configure  # noqa: E402
+from functions.qwen import build_conversation  # noqa: E402
+from functions.registry import get_model  # noqa: E402
+from functions.retry import RetryPolicy  # noqa: E402
+from functions.telemetry import add_hook, remove_hook  # noqa: E402
+from functions.transport import configure_transport  # noqa: E402
+
+DEFAULT_MODELS: str = "gpt-4-o-mini,claude-3-5-sonnet,gemini-1.5-flash,llama3_1,deepseek-r1,qwen-plus"
+
+
+def _async_qwen(message: str, model_name: str) -> Any:
+    return async_client.AsyncQwen(model_name, build_conversation(message))
+
+
+# Model family -> async wrapper taking (message, model_name=...)
+ASYNC_WRAPPERS: Dict[str, Callable[..., Any]] = {
+    "openai": async_client.AsyncOpenAI,
+    "claude": async_client.AsyncClaude,
+    "gemini": async_client.AsyncGemini,
+    "llama": async_client.AsyncLlama,
+    "deepseek": async_client.AsyncDeepSeek,
+    "qwen": _async_qwen,
+}
+
+# (latencies in seconds, failed calls, wall-clock seconds)
+Run = Tuple[List[float], int, float]
+
+
+def percentile(samples: List[float], q: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q / 100))] if ordered else 0.0
+
+
+def records(n: int, models: List[str], parameters: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+    """Batch records cycling through ``models``, each with a distinct message."""
+    return [
+        {"id": i, "model": models[i % len(models)], "message": f"Benchmark request {i}", "parameters": parameters or {}}
+        for i in range(n)
+    ]
+
+
+def succeeded(result: Dict[str, Any]) -> bool:
+    # The wrappers report failures as error strings or None rather than raising
+    return "error" not in result and isinstance(result.get("response"), dict)
+
+
+def timed_request(record: Dict[str, Any]) -> Tuple[float, bool]:
+    start = time.perf_counter()
+    result = run_request(record)
+    return time.perf_counter() - start, succeeded(result)
+
+
+def run_sequential(n: int, models: List[str], workers: int) -> Run:
+    start = time.perf_counter()
+    results = [timed_request(record) for record in records(n, models)]
+    return [latency for latency, _ in results], sum(not ok for _, ok in results), time.perf_counter() - start
+
+
+def run_threaded(n: int, models: List[str], workers: int) -> Run:
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(timed_request, records(n, models)))
+    return [latency for latency, _ in results], sum(not ok for _, ok in results), time.perf_counter() - start
+
+
+async def _run_async(n: int, models: List[str], workers: int) -> Run:
+    # Fresh transport per run, since the async client is bound to its event loop
+    set_async_transport(AsyncTransport(retry_policy=_retry_policy))
+    slots = asyncio.Semaphore(workers)
+    latencies: List[float] = []
+    failures = 0
+
+    async def call(record: Dict[str, Any]) -> None:
+        nonlocal failures
+        wrapper = ASYNC_WRAPPERS[get_model(record["model"]).family]
+        async with slots:
+            begin = time.perf_counter()
+            try:
+                result = await wrapper(record["message"], model_name=record["model"])
+            except Exception:
+                result = None
+            latencies.append(time.perf_counter() - begin)
+        if not isinstance(result, dict):
+            failures += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(call(record) for record in records(n, models)))
+    elapsed = time.perf_counter() - start
+    await close_async_transport()
+    return latencies, failures, elapsed
+
+
+def run_async(n: int, models: List[str], workers: int) -> Run:
+    return asyncio.run(_run_async(n, models, workers))
+
+
+def run_batch_file(n: int, models: List[str], workers: int) -> Run:
+    # run_batch does not expose per-call timings; collect them from the transport
+    latencies: List[float] = []
+    failures = 0
+
+    def observe(record: Any) -> None:
+        latencies.append(record.total)
+
+    with tempfile.TemporaryDirectory() as directory:
+        source = os.path.join(directory, "input.jsonl")
+        target = os.path.join(directory, "output.jsonl")
+        with open(source, "w", encoding="utf-8") as f:
+            for record in records(n, models):
+                f.write(json.dumps(record) + "\n")
+        add_hook(observe)
+        try:
+            start = time.perf_counter()
+            run_batch(source, target, max_workers=workers, resume=False)
+            elapsed = time.perf_counter() - start
+        finally:
+            remove_hook(observe)
+        with open(target, "r", encoding="utf-8") as f:
+            failures = sum(not succeeded(json.loads(line)) for line in f)
+    return latencies, failures, elapsed
+
+
+def run_stream(n: int, models: List[str], workers: int) -> Run:
+    streamable = [model for model in models if "stream" in get_model(model).capabilities] or models
+    latencies: List[float] = []
+    failures = 0
+    start = time.perf_counter()
+    for record in records(n, streamable):
+        begin = time.perf_counter()
+        # Batch records can't stream, so call the wrapper directly
+        wrapper = WRAPPERS[get_model(record["model"]).family]
+        try:
+            text = "".join(wrapper(record["message"], model_name=record["model"], stream=True))
+        except Exception:
+            text = ""
+        latencies.append(time.perf_counter() - begin)
+        failures += not text
+    return latencies, failures, time.perf_counter() - start
+
+
+SCENARIOS: Dict[str, Callable[[int, List[str], int], Run]] = {
+    "sequential": run_sequential,
+    "threaded": run_threaded,
+    "async": run_async,
+    "batch": run_batch_file,
+    "stream": run_stream,
+}
+
+_retry_policy: Optional[RetryPolicy] = None
+
+
+def peak_memory(scenario: Callable[[int, List[str], int], Run], n: int, models: List[str], workers: int) -> float:
+    """Return the tracemalloc peak in MB of one run of ``scenario``."""
+    tracemalloc.start()
+    try:
+        scenario(n, models, workers)
+        return tracemalloc.get_traced_memory()[1] / 2 ** 20
+    finally:
+        tracemalloc.stop()
+
+
+def measure(name: str, gateway: MockGateway, n: int, models: List[str], workers: int, memory: bool) -> Dict[str, float]:
+    scenario = SCENARIOS[name]
+    gateway.reset()
+    latencies, failures, elapsed = scenario(n, models, workers)
+    upstream = gateway.requests
+    return {
+        "requests": n,
+        "upstream": upstream,
+        "errors": failures,
+        "throughput": n / elapsed if elapsed else 0.0,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p90_ms": percentile(latencies, 90) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "peak_mb": peak_memory(scenario, n, models, workers) if memory else 0.0,
+    }
+
+
+def report(results: Dict[str, Dict[str, float]]) -> None:
+    print(
+        f"{'scenario':<11} {'requests':>8} {'upstream':>8} {'errors':>6} {'req/s':>9}"
+        f" {'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8} {'peak MB':>8}"
+    )
+    for name, r in results.items():
+        print(
+            f"{name:<11} {r['requests']:>8} {r['upstream']:>8} {r['errors']:>6} {r['throughput']:>9.1f} {r['p50_ms']:>8.2f}"
+            f" {r['p90_ms']:>8.2f} {r['p99_ms']:>8.2f} {r['peak_mb']:>8.2f}"
+        )
+
+
+# Metric -> whether higher is better, for the baseline comparison
+COMPARED: Dict[str, bool] = {"throughput": True, "p50_ms": False, "p99_ms": False, "peak_mb": False}
+
+
+def regressions(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]], tolerance: float) -> List[str]:
+    """
+    List the metrics that are worse than the baseline by more than ``tolerance``.
+
+    Args:
+        results (Dict[str, Dict[str, float]]): This run's results per scenario.
+        baseline (Dict[str, Dict[str, float]]): An earlier run's results.
+        tolerance (float): Allowed relative change, e.g. 0.25 for 25%.
+
+    Returns:
+        List[str]: One line per regressed metric.
+    """
+    found = []
+    for name, current in results.items():
+        before = baseline.get(name)
+        if not before:
+            continue
+        for metric, higher_is_better in COMPARED.items():
+            old, new = before.get(metric), current.get(metric)
+            if not old or not new:
+                continue
+            change = (old - new) / old if higher_is_better else (new - old) / old
+            if change > tolerance:
+                found.append(f"{name} {metric}: {old:.2f} -> {new:.2f} ({change:+.0%} worse)")
+    return found
+
+
+def main() -> None:
+    global _retry_policy
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=300, help="calls per scenario")
+    parser.add_argument("--workers", type=int, default=16, help="threads, or in-flight async calls")
+    parser.add_argument("--models", default=DEFAULT_MODELS, help="comma-separated deployments to cycle through")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="comma-separated scenarios to run")
+    parser.add_argument("--latency", default="lognormal:0.005:0.5", help="mock latency spec (see mock_gateway.parse_latency)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of 5xx answers")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="fraction of 429 answers")
+    parser.add_argument("--retry-delay", type=float, default=0.01, help="base retry delay in seconds")
+    parser.add_argument("--no-memory", action="store_true", help="skip the traced runs that measure peak memory")
+    parser.add_argument("--save", help="write the results to this JSON file")
+    parser.add_argument("--baseline", help="compare with the results in this JSON file")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed relative regression")
+    args = parser.parse_args()
+
+    models = [model.strip() for model in args.models.split(",") if model.strip()]
+    unknown = [model for model in models if get_model(model) is None]
+    if unknown:
+        parser.error(f"unknown models: {', '.join(unknown)}")
+    names = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    if any(name not in SCENARIOS for name in names):
+        parser.error(f"scenarios must be among: {', '.join(SCENARIOS)}")
+
+    _retry_policy = RetryPolicy(base_delay=args.retry_delay, max_delay=args.retry_delay * 4)
+    gateway = MockGateway(
+        latency=parse_latency(args.latency), error_rate=args.error_rate, rate_limit_rate=args.rate_limit_rate
+    )
+    with gateway:
+        configure(api_key="mock", base_url=gateway.url)
+        configure_transport(retry_policy=_retry_policy, pool_maxsize=max(args.workers, 32))
+        # Open the pooled connections before measuring
+        run_sequential(len(models), models, 1)
+
+        results: Dict[str, Dict[str, float]] = {}
+        for name in names:
+            results[name] = measure(name, gateway, args.requests, models, args.workers, not args.no_memory)
+        report(results)
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        found = regressions(results, baseline, args.tolerance)
+        for line in found:
+            print(f"REGRESSION {line}")
+        if found:
+            sys.exit(1)
+        print(f"No regressions beyond {args.tolerance:.0%} against {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Python wrappers for the HKBU GenAI Platform API.
+
+Names are resolved lazily: ``import functions`` loads nothing else, and
+``from functions import OpenAI`` imports only ``functions.openai``. HTTP
+libraries and credentials are loaded on the first request.
+"""
+import importlib
+from typing import Any, Dict, List
+
+# Public name -> submodule that defines it
+_EXPORTS: Dict[str, str] = {
+    "OpenAI": "openai",
+    "Claude": "claude",
+    "Gemini": "gemini",
+    "DeepSeek": "deepseek",
+    "Qwen": "qwen",
+    "Embeddings": "embeddings",
+    "VectorStore": "vector_store",
+    "AsyncOpenAI": "async_client",
+    "AsyncClaude": "async_client",
+    "AsyncGemini": "async_client",
+    "AsyncLlama": "async_client",
+    "AsyncDeepSeek": "async_client",
+    "AsyncQwen": "async_client",
+    "Config": "config",
+    "configure": "config",
+    "get_config": "config",
+    "get_model": "registry",
+    "get_registry": "registry",
+    "load_models": "registry",
+    "register_model": "registry",
+    "run_batch": "batch",
+    "Router": "router",
+    "fan_out": "fanout",
+    "afan_out": "fanout",
+    "Conversation": "conversation",
+    "PromptTemplate": "prepared",
+    "image_data_url": "prepared",
+    "configure_codec": "codec",
+    "StructuredOutput": "structured",
+    "Agent": "agent",
+    "Tool": "agent",
+    "tool": "agent",
+    "Response": "responses",
+    "parse_response": "responses",
+    "count_tokens": "tokens",
+    "configure_context_checks": "tokens",
+    "configure_hedging": "hedge",
+    "add_hook": "telemetry",
+    "configure_metrics": "telemetry",
+    "configure_usage": "usage",
+    "usage_tag": "usage",
+    "Budget": "usage",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str) -> Any:
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(__all__))
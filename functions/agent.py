@@ -0,0 +1,498 @@
+import asyncio
+import contextvars
+import inspect
+import time
+import typing
+from concurrent.futures import ThreadPoolExecutor, Future, wait, FIRST_COMPLETED
+from typing import Optional, Dict, List, Any, Callable, NamedTuple, Sequence, Tuple, Union
+
+from .codec import dumps, response_json
+from .registry import get_model
+from .responses import Response, ToolCall
+from .schema import compile_schema
+from .structured import gemini_schema
+
+# Families whose APIs support function calling
+TOOL_FAMILIES = ("openai", "deepseek", "qwen", "claude", "gemini")
+
+_JSON_TYPES: Dict[Any, str] = {str: "string", int: "integer", float: "number", bool: "boolean", list: "array", dict: "object"}
+
+
+def _annotation_schema(annotation: Any) -> Dict[str, Any]:
+    origin = typing.get_origin(annotation)
+    args = typing.get_args(annotation)
+    if origin is Union:
+        options = [arg for arg in args if arg is not type(None)]
+        return _annotation_schema(options[0]) if len(options) == 1 else {}
+    if origin is typing.Literal:
+        return {"enum": list(args)}
+    if origin in (list, tuple, set, frozenset):
+        return {"type": "array", "items": _annotation_schema(args[0])} if args else {"type": "array"}
+    if origin is dict:
+        return {"type": "object"}
+    json_type = _JSON_TYPES.get(annotation)
+    return {"type": json_type} if json_type else {}
+
+
+def function_schema(function: Callable[..., Any]) -> Dict[str, Any]:
+    """
+    Derive the JSON schema of a function's keyword arguments from its signature.
+
+    ``str``, ``int``, ``float``, ``bool``, ``list``/``List[X]``, ``dict``,
+    ``Optional[X]`` and ``Literal[...]`` annotations are translated; other
+    parameters accept any value. Parameters without defaults are required.
+
+    Args:
+        function (Callable[..., Any]): The function.
+
+    Returns:
+        Dict[str, Any]: An object schema of the parameters.
+    """
+    hints = typing.get_type_hints(function)
+    properties: Dict[str, Any] = {}
+    required: List[str] = []
+    for name, parameter in inspect.signature(function).parameters.items():
+        if parameter.kind in (parameter.VAR_POSITIONAL, parameter.VAR_KEYWORD):
+            continue
+        properties[name] = _annotation_schema(hints.get(name, Any))
+        if parameter.default is parameter.empty:
+            required.append(name)
+    schema: Dict[str, Any] = {"type": "object", "properties": properties}
+    if required:
+        schema["required"] = required
+    return schema
+
+
+class Tool:
+    """A Python function the model may call, with the schema of its arguments."""
+
+    __slots__ = ("name", "function", "description", "parameters", "timeout", "_compiled")
+
+    def __init__(
+        self,
+        function: Callable[..., Any],
+        name: Optional[str] = None,
+        description: Optional[str] = None,
+        parameters: Optional[Dict[str, Any]] = None,
+        timeout: Optional[float] = None,
+    ) -> None:
+        """
+        Args:
+            function (Callable[..., Any]): Called with the model's arguments as keywords; may be a coroutine function.
+            name (Optional[str]): Name shown to the model (default: the function's name).
+            description (Optional[str]): What the tool does (default: the docstring's first paragraph).
+            parameters (Optional[Dict[str, Any]]): JSON schema of the arguments (default: from the signature).
+            timeout (Optional[float]): Seconds the call may take; overrides the agent's ``tool_timeout``.
+        """
+        self.function = function
+        self.name = name or function.__name__
+        self.description = description if description is not None else (inspect.getdoc(function) or "").split("\n\n")[0]
+        self.parameters = parameters or function_schema(function)
+        self.timeout = timeout
+        self._compiled = compile_schema(self.parameters)
+
+    def __repr__(self) -> str:
+        return f"Tool({self.name!r})"
+
+    def declaration(self, family: str) -> Dict[str, Any]:
+        """
+        Return the tool's declaration in a family's format.
+
+        Args:
+            family (str): Model family, one of ``TOOL_FAMILIES``.
+
+        Returns:
+            Dict[str, Any]: The function declaration.
+        """
+        if family == "claude":
+            return {"name": self.name, "description": self.description, "input_schema": self.parameters}
+        if family == "gemini":
+            return {"name": self.name, "description": self.description, "parameters": gemini_schema(self.parameters)}
+        return {"type": "function", "function": {"name": self.name, "description": self.description, "parameters": self.parameters}}
+
+    def errors(self, arguments: Any) -> List[str]:
+        """Return the problems of ``arguments`` against the parameter schema."""
+        return self._compiled.errors(arguments)
+
+
+def tool(
+    function: Optional[Callable[..., Any]] = None, **kwargs: Any
+) -> Union[Tool, Callable[[Callable[..., Any]], Tool]]:
+    """
+    Turn a function into a ``Tool``; use as ``@tool`` or ``@tool(timeout=5)``.
+
+    Args:
+        function (Optional[Callable[..., Any]]): The function.
+        **kwargs: Passed to ``Tool``.
+
+    Returns:
+        Union[Tool, Callable[[Callable[..., Any]], Tool]]: The tool, or a decorator making one.
+    """
+    if function is None:
+        return lambda f: Tool(f, **kwargs)
+    return Tool(function, **kwargs)
+
+
+class ToolResult(NamedTuple):
+    """Outcome of one tool call."""
+    call: ToolCall
+    value: Any
+    content: str
+    error: bool
+    latency: float
+
+
+class AgentResult(NamedTuple):
+    """Final answer of an agent run."""
+    text: Optional[str]
+    response: Response
+    messages: List[Dict[str, Any]]
+    tool_results: List[ToolResult]
+    turns: int
+
+
+def _content(value: Any) -> str:
+    if isinstance(value, str):
+        return value
+    try:
+        return dumps(value).decode("utf-8")
+    except TypeError:
+        return str(value)
+
+
+def _chat_assistant(data: Dict[str, Any]) -> Dict[str, Any]:
+    message = (data.get("choices") or [{}])[0].get("message") or {}
+    # Only echo what the API accepts back; e.g. DeepSeek rejects reasoning_content
+    reply: Dict[str, Any] = {"role": "assistant", "content": message.get("content")}
+    if message.get("tool_calls"):
+        reply["tool_calls"] = message["tool_calls"]
+    return reply
+
+
+def _chat_results(results: List[ToolResult]) -> List[Dict[str, Any]]:
+    return [{"role": "tool", "tool_call_id": result.call.id, "content": result.content} for result in results]
+
+
+def _claude_assistant(data: Dict[str, Any]) -> Dict[str, Any]:
+    return {"role": "assistant", "content": data.get("content") or []}
+
+
+def _claude_results(results: List[ToolResult]) -> List[Dict[str, Any]]:
+    blocks = []
+    for result in results:
+        block: Dict[str, Any] = {"type": "tool_result", "tool_use_id": result.call.id, "content": result.content}
+        if result.error:
+            block["is_error"] = True
+        blocks.append(block)
+    return [{"role": "user", "content": blocks}]
+
+
+def _gemini_assistant(data: Dict[str, Any]) -> Dict[str, Any]:
+    return (data.get("candidates") or [{}])[0].get("content") or {"role": "model", "parts": []}
+
+
+def _gemini_results(results: List[ToolResult]) -> List[Dict[str, Any]]:
+    # Gemini calls carry no ids; responses are matched by name and order
+    parts = []
+    for result in results:
+        value = result.value if isinstance(result.value, dict) and not result.error else {"content": result.content}
+        parts.append({"functionResponse": {"name": result.call.name, "response": value}})
+    return [{"role": "user", "parts": parts}]
+
+
+# Family -> (assistant message from a response, messages carrying tool results)
+DIALECTS: Dict[str, Tuple[Callable[[Dict[str, Any]], Dict[str, Any]], Callable[[List[ToolResult]], List[Dict[str, Any]]]]] = {
+    "openai": (_chat_assistant, _chat_results),
+    "deepseek": (_chat_assistant, _chat_results),
+    "qwen": (_chat_assistant, _chat_results),
+    "claude": (_claude_assistant, _claude_results),
+    "gemini": (_gemini_assistant, _gemini_results),
+}
+
+
+def _tool_pool(calls: int) -> ThreadPoolExecutor:
+    # One thread per call of a turn, so no tool waits for a thread and tools
+    # abandoned at their timeout only keep their own turn's threads
+    return ThreadPoolExecutor(max_workers=max(1, calls), thread_name_prefix="agent-tool")
+
+
+class Agent:
+    """
+    Let a model call Python functions until it answers, running each turn's tool calls in parallel.
+
+    Each turn the model's reply is parsed for tool calls (OpenAI, DeepSeek
+    and Qwen ``tool_calls``, Claude ``tool_use`` blocks, Gemini
+    ``functionCall`` parts). Arguments are checked against the tool's
+    schema, all calls of the turn run concurrently, and the results are
+    appended to the same message list before it is sent again, so a
+    multi-tool turn takes as long as its slowest tool. A tool that raises,
+    gets invalid arguments or exceeds its timeout reports the error to the
+    model instead of ending the run.
+
+    Example:
+        @tool
+        def get_weather(city: str) -> dict:
+            \"\"\"Current weather in a city.\"\"\"
+            return weather_api(city)
+
+        agent = Agent("gpt-4-o", [get_weather])
+        agent.run("Is it warmer in Boston or in Hong Kong?").text
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        tools: Sequence[Union[Tool, Callable[..., Any]]],
+        system_message: Optional[str] = None,
+        temperature: float = 0.0,
+        max_tokens: int = 1024,
+        max_turns: int = 8,
+        tool_timeout: Optional[float] = 30.0,
+        timeout: Optional[float] = 60,
+    ) -> None:
+        """
+        Args:
+            model_name (str): OpenAI, DeepSeek, Qwen, Claude or Gemini deployment.
+            tools (Sequence[Union[Tool, Callable[..., Any]]]): Tools, or plain functions to wrap in ``Tool``.
+            system_message (Optional[str]): Optional system message to set context.
+            temperature (float): Sampling temperature.
+            max_tokens (int): Maximum tokens in each response.
+            max_turns (int): Model requests per run; the run ends with the last reply once reached.
+            tool_timeout (Optional[float]): Seconds each tool call may take, unless the tool sets its own.
+            timeout (Optional[float]): Timeout of each model request in seconds.
+
+        Raises:
+            ValueError: If the model does not support function calling or two tools share a name.
+        """
+        spec = get_model(model_name)
+        if spec is None or spec.family not in TOOL_FAMILIES:
+            raise ValueError(f"Model {model_name} does not support function calling")
+        self.model_name = model_name
+        self.family = spec.family
+        self.tools: Dict[str, Tool] = {}
+        for item in tools:
+            item = item if isinstance(item, Tool) else Tool(item)
+            if item.name in self.tools:
+                raise ValueError(f"Duplicate tool name {item.name!r}")
+            self.tools[item.name] = item
+        self.system_message = system_message
+        self.temperature = temperature
+        self.max_tokens = max_tokens
+        self.max_turns = max_turns
+        self.tool_timeout = tool_timeout
+        self.timeout = timeout
+        declarations = [item.declaration(self.family) for item in self.tools.values()]
+        self._declarations = [{"function_declarations": declarations}] if self.family == "gemini" else declarations
+
+    def build_request(self, message: str) -> Tuple[str, Dict[str, str], Dict[str, Any]]:
+        """
+        Build the first request of a run, with the tool declarations.
+
+        Args:
+            message (str): User message content.
+
+        Returns:
+            Tuple[str, Dict[str, str], Dict[str, Any]]: The request URL, headers and payload.
+        """
+        from .builders import REQUEST_BUILDERS
+
+        url, headers, payload = REQUEST_BUILDERS[self.family](
+            message, self.model_name, self.system_message, self.temperature, self.max_tokens
+        )
+        if self._declarations:
+            payload["tools"] = self._declarations
+        return url, headers, payload
+
+    def _history(self, payload: Dict[str, Any]) -> List[Dict[str, Any]]:
+        return payload["contents"] if self.family == "gemini" else payload["messages"]
+
+    def _prepare(self, call: ToolCall) -> Tuple[Optional[Tool], Optional[str]]:
+        # The tool to run, or the error to report instead
+        item = self.tools.get(call.name)
+        if item is None:
+            return None, f"Error: unknown tool {call.name!r}"
+        arguments = call.arguments if call.arguments is not None else {}
+        if not isinstance(arguments, dict):
+            return None, f"Error: arguments of {call.name} are not a JSON object"
+        errors = item.errors(arguments)
+        if errors:
+            return None, f"Error: invalid arguments for {call.name}: " + "; ".join(errors)
+        return item, None
+
+    def _limit(self, item: Tool) -> Optional[float]:
+        return item.timeout if item.timeout is not None else self.tool_timeout
+
+    @staticmethod
+    def _invoke(item: Tool, arguments: Dict[str, Any]) -> Any:
+        value = item.function(**arguments)
+        if inspect.isawaitable(value):
+            # A coroutine tool used from the sync loop runs on its own event loop
+            value = asyncio.run(value)
+        return value
+
+    def run_tools(self, calls: Sequence[ToolCall]) -> List[ToolResult]:
+        """
+        Run tool calls concurrently, each on its own thread.
+
+        A call's timeout runs from when its tool starts. A call that is still
+        running at its timeout is reported as timed out and abandoned; its
+        thread finishes in the background.
+
+        Args:
+            calls (Sequence[ToolCall]): The calls of one model turn.
+
+        Returns:
+            List[ToolResult]: One result per call, in the order of ``calls``.
+        """
+        results: List[Optional[ToolResult]] = [None] * len(calls)
+        tools: Dict[int, Tool] = {}
+        for index, call in enumerate(calls):
+            item, error = self._prepare(call)
+            if item is None:
+                results[index] = ToolResult(call, None, error, True, 0.0)
+            else:
+                tools[index] = item
+        if not tools:
+            return results  # type: ignore[return-value]
+        started: Dict[int, float] = {}
+
+        def invoke(index: int, item: Tool, arguments: Dict[str, Any]) -> Any:
+            started[index] = time.monotonic()
+            return self._invoke(item, arguments)
+
+        limits = {index: self._limit(item) for index, item in tools.items()}
+        pool = _tool_pool(len(tools))
+        try:
+            pending: Dict[Future, int] = {
+                pool.submit(contextvars.copy_context().run, invoke, index, item, calls[index].arguments or {}): index
+                for index, item in tools.items()
+            }
+            while pending:
+                now = time.monotonic()
+                # A tool that has not started yet cannot time out before its full limit from now
+                waiting = [started.get(index, now) + limits[index] for index in pending.values() if limits[index] is not None]
+                remaining = max(0.0, min(waiting) - now) if waiting else None
+                done, _ = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+                now = time.monotonic()
+                for future in done:
+                    index = pending.pop(future)
+                    results[index] = self._result(calls[index], future, now - started[index])
+                for future, index in list(pending.items()):
+                    limit = limits[index]
+                    if limit is not None and index in started and started[index] + limit <= now:
+                        del pending[future]
+                        results[index] = self._timed_out(calls[index], now - started[index])
+        finally:
+            pool.shutdown(wait=False)
+        return results  # type: ignore[return-value]
+
+    async def arun_tools(self, calls: Sequence[ToolCall]) -> List[ToolResult]:
+        """
+        Async version of ``run_tools``; coroutine tools are awaited, others run in threads.
+
+        Timed-out coroutine tools are cancelled.
+        """
+        pool: Optional[ThreadPoolExecutor] = None
+
+        async def run_one(call: ToolCall) -> ToolResult:
+            nonlocal pool
+            item, error = self._prepare(call)
+            if item is None:
+                return ToolResult(call, None, error, True, 0.0)
+            arguments = call.arguments or {}
+            start = time.monotonic()
+            if inspect.iscoroutinefunction(item.function):
+                pending = item.function(**arguments)
+            else:
+                if pool is None:
+                    pool = _tool_pool(len(calls))
+                pending = asyncio.get_running_loop().run_in_executor(
+                    pool, contextvars.copy_context().run, self._invoke, item, arguments
+                )
+            try:
+                value = await asyncio.wait_for(pending, self._limit(item))
+            except asyncio.TimeoutError:
+                return self._timed_out(call, time.monotonic() - start)
+            except Exception as e:
+                return ToolResult(call, None, f"Error: {type(e).__name__}: {e}", True, time.monotonic() - start)
+            return ToolResult(call, value, _content(value), False, time.monotonic() - start)
+
+        try:
+            return list(await asyncio.gather(*(run_one(call) for call in calls)))
+        finally:
+            if pool is not None:
+                pool.shutdown(wait=False)
+
+    def _result(self, call: ToolCall, future: Future, latency: float) -> ToolResult:
+        try:
+            value = future.result()
+        except Exception as e:
+            return ToolResult(call, None, f"Error: {type(e).__name__}: {e}", True, latency)
+        return ToolResult(call, value, _content(value), False, latency)
+
+    def _timed_out(self, call: ToolCall, latency: float) -> ToolResult:
+        return ToolResult(call, None, f"Error: {call.name} timed out after {latency:.1f}s", True, latency)
+
+    def _advance(self, history: List[Dict[str, Any]], data: Dict[str, Any], results: List[ToolResult]) -> None:
+        assistant, tool_results = DIALECTS[self.family]
+        history.append(assistant(data))
+        history.extend(tool_results(results))
+
+    def run(self, message: str) -> AgentResult:
+        """
+        Send ``message`` and run the requested tools until the model answers.
+
+        Args:
+            message (str): User message content.
+
+        Returns:
+            AgentResult: The final reply, the whole message history and every tool result.
+            If ``max_turns`` was reached, ``response.tool_calls`` holds the calls left unanswered.
+
+        Raises:
+            requests.exceptions.RequestException: If a model request fails.
+        """
+        from .transport import get_transport
+
+        url, headers, payload = self.build_request(message)
+        history = self._history(payload)
+        all_results: List[ToolResult] = []
+        turn = 0
+        while True:
+            turn += 1
+            response = get_transport().post(url, deployment=self.model_name, json=payload, headers=headers, timeout=self.timeout)
+            response.raise_for_status()
+            data = response_json(response)
+            reply = Response.from_json(data, self.family, response.content)
+            if not reply.tool_calls or turn >= self.max_turns:
+                return AgentResult(reply.text, reply, history, all_results, turn)
+            results = self.run_tools(reply.tool_calls)
+            all_results.extend(results)
+            self._advance(history, data, results)
+
+    async def arun(self, message: str) -> AgentResult:
+        """
+        Async version of ``run``.
+
+        Raises:
+            httpx.HTTPError: If a model request fails.
+        """
+        from .async_transport import get_async_transport
+
+        url, headers, payload = self.build_request(message)
+        history = self._history(payload)
+        all_results: List[ToolResult] = []
+        turn = 0
+        while True:
+            turn += 1
+            response = await get_async_transport().post(
+                url, deployment=self.model_name, json=payload, headers=headers, timeout=self.timeout
+            )
+            response.raise_for_status()
+            data = response_json(response)
+            reply = Response.from_json(data, self.family, response.content)
+            if not reply.tool_calls or turn >= self.max_turns:
+                return AgentResult(reply.text, reply, history, all_results, turn)
+            results = await self.arun_tools(reply.tool_calls)
+            all_results.extend(results)
+            self._advance(history, data, results)
@@ -0,0 +1,265 @@
+import logging
+import httpx
+from typing import Optional, Dict, List, Union, Any, AsyncIterator
+
+from . import openai, claude, gemini, llama as llama_module, deepseek, qwen
+from .async_transport import get_async_transport
+from .codec import response_json
+from .exceptions import HKBUAPIError, HKBUClientError
+from .responses import Response
+from .streaming import aiter_deltas
+
+logger = logging.getLogger(__name__)
+
+# Async counterparts of the wrappers in this package. Each one builds the same
+# request as its synchronous sibling, sends it through the shared AsyncTransport
+# and returns the same response shape (and error convention). With stream=True
+# they return an async iterator of text deltas; HTTP errors are then raised
+# from the iterator instead of being returned. With as_response=True they
+# return a normalized ``responses.Response`` instead of the raw dict.
+
+
+async def astream_deltas(
+    url: str,
+    deployment: str,
+    family: str,
+    **kwargs: Any
+) -> AsyncIterator[str]:
+    """
+    Stream a request through the shared async transport and yield its text deltas.
+
+    Args:
+        url (str): Request URL.
+        deployment (str): Deployment name used to bound concurrency.
+        family (str): Model family, a key of ``streaming.DELTA_EXTRACTORS``.
+        **kwargs: Passed through to ``AsyncTransport.stream``.
+
+    Yields:
+        str: Each non-empty text delta, as soon as it arrives.
+    """
+    async with get_async_transport().stream(url, deployment=deployment, **kwargs) as response:
+        response.raise_for_status()
+        async for delta in aiter_deltas(response, family):
+            yield delta
+
+
+async def AsyncOpenAI(
+        message: str,
+        model_name: str = "gpt-4-o-mini",
+        imageURL: Optional[str] = None,
+        temperature: float = 0,
+        max_tokens: int = 100,
+        tools: Optional[List[Dict[str, Any]]] = None,
+        stream: bool = False,
+        response_format: Optional[Dict[str, str]] = None,
+        system_message: Optional[str] = None,
+        hedge: bool = False,
+        as_response: bool = False
+        ) -> Union[Dict[str, Any], Response, str, AsyncIterator[str]]:
+    """
+    Async version of ``OpenAI``.
+
+    Returns:
+        Response data from the API, an async iterator of text deltas if stream is set, or error message
+    """
+    url, headers, payload = openai.build_request(
+        message, model_name, imageURL, temperature, max_tokens,
+        tools, stream, response_format, system_message
+    )
+    if stream:
+        return astream_deltas(url, model_name, "openai", json=payload, headers=headers, timeout=30)
+
+    try:
+        response = await get_async_transport().post(
+            url, deployment=model_name, json=payload, headers=headers, timeout=30, hedge=hedge
+        )
+        response.raise_for_status()
+        return Response.from_http(response, "openai") if as_response else response_json(response)
+    except (httpx.HTTPError, HKBUAPIError) as e:
+        return f'Error: {str(e)}'
+
+
+async def AsyncClaude(
+    message: str,
+    model_name: str = "claude-3-5-sonnet",
+    image_url: Optional[str] = None,
+    temperature: float = 0.0,
+    max_tokens: int = 100,
+    stream: bool = False,
+    hedge: bool = False,
+    as_response: bool = False
+) -> Union[Dict[str, Any], Response, str, AsyncIterator[str]]:
+    """
+    Async version of ``Claude``.
+
+    Returns:
+        Union[Dict[str, Any], str, AsyncIterator[str]]: The JSON response from the API, an async
+        iterator of text deltas if ``stream`` is set, or an error message.
+    """
+    url, headers, payload = claude.build_request(message, model_name, image_url, temperature, max_tokens, stream)
+    if stream:
+        return astream_deltas(url, model_name, "claude", json=payload, headers=headers)
+
+    try:
+        response = await get_async_transport().post(url, deployment=model_name, json=payload, headers=headers, hedge=hedge)
+        response.raise_for_status()
+        return Response.from_http(response, "claude") if as_response else response_json(response)
+    except (httpx.HTTPError, HKBUAPIError) as e:
+        return f"Error: {e}"
+
+
+async def AsyncGemini(
+    message: str,
+    model_name: str = "gemini-1.5-flash",
+    temperature: float = 0.5,
+    maxOutputTokens: int = 10,
+    response_mime_type: str = "application/json",
+    response_schema: Optional[dict] = None,
+    stream: bool = False,
+    hedge: bool = False,
+    as_response: bool = False
+) -> Union[Dict[str, Any], Response, None, AsyncIterator[str]]:
+    """
+    Async version of ``Gemini``.
+
+    Returns:
+        Union[Dict[str, Any], None, AsyncIterator[str]]: The JSON response, an async iterator of
+        text deltas if ``stream`` is set, or None if the request failed.
+    """
+    url, headers, payload = gemini.build_request(
+        message, model_name, temperature, maxOutputTokens, response_mime_type, response_schema, stream
+    )
+    if stream:
+        return astream_deltas(url, model_name, "gemini", json=payload, headers=headers)
+
+    response = await get_async_transport().post(url, deployment=model_name, json=payload, headers=headers, hedge=hedge)
+
+    if response.status_code == 200:
+        return Response.from_http(response, "gemini") if as_response else response_json(response)
+    else:
+        logger.warning("Gemini request to %s failed with status code %s: %s", model_name, response.status_code, response.text)
+        return None
+
+
+async def AsyncLlama(
+    message: str,
+    model_name: str = "llama3_1",
+    image_url: Optional[str] = None,
+    temperature: float = 0.0,
+    max_tokens: int = 100,
+    top_p: float = 1.0,
+    top_k: int = 50,
+    stop_sequences: Optional[List[str]] = None,
+    stream: bool = False,
+    system: Optional[str] = None,
+    as_response: bool = False
+) -> Union[Dict[str, Any], Response, str, AsyncIterator[str]]:
+    """
+    Async version of ``llama``.
+
+    Returns:
+        Union[Dict[str, Any], str, AsyncIterator[str]]: The JSON response from the API, an async
+        iterator of text deltas if ``stream`` is set, or an error message.
+    """
+    url, headers, payload = llama_module.build_request(
+        message, model_name, image_url, temperature, max_tokens,
+        top_p, top_k, stop_sequences, stream, system
+    )
+    if stream:
+        return astream_deltas(url, model_name, "llama", json=payload, headers=headers)
+
+    try:
+        response = await get_async_transport().post(url, deployment=model_name, json=payload, headers=headers)
+        if response.status_code == 200:
+            return Response.from_http(response, "llama") if as_response else response_json(response)
+        else:
+            return f'Error: {response.status_code}, {response.text}'
+    except (httpx.HTTPError, HKBUAPIError) as e:
+        return f'Network Error: {str(e)}'
+
+
+async def AsyncDeepSeek(
+    message: str,
+    model_name: str = "deepseek-r1",
+    temperature: float = 0.0,
+    max_tokens: int = 255,
+    stream: bool = False,
+    frequency_penalty: float = 0.0,
+    presence_penalty: float = 0.0,
+    top_p: float = 1.0,
+    response_format: Optional[Dict[str, str]] = None,
+    stop: Optional[List[str]] = None,
+    seed: Optional[int] = None,
+    tools: Optional[List[Dict[str, Any]]] = None,
+    system_message: Optional[str] = None,
+    hedge: bool = False,
+    as_response: bool = False,
+) -> Union[Dict[str, Any], Response, str, AsyncIterator[str]]:
+    """
+    Async version of ``DeepSeek``.
+
+    Returns:
+        Union[Dict[str, Any], str, AsyncIterator[str]]: Response data from the API, an async
+        iterator of text deltas if ``stream`` is set, or error message.
+    """
+    try:
+        url, headers, payload = deepseek.build_request(
+            message, model_name, temperature, max_tokens, stream,
+            frequency_penalty, presence_penalty, top_p, response_format,
+            stop, seed, tools, system_message,
+        )
+        if stream:
+            return astream_deltas(url, model_name, "deepseek", json=payload, headers=headers, timeout=30)
+
+        logger.debug("Sending request to %s", model_name)
+        response = await get_async_transport().post(
+            url, deployment=model_name, json=payload, headers=headers, timeout=30, hedge=hedge
+        )
+        response.raise_for_status()
+
+        return Response.from_http(response, "deepseek") if as_response else response_json(response)
+
+    except (httpx.HTTPError, HKBUAPIError) as e:
+        logger.warning("DeepSeek request to %s failed: %s", model_name, e)
+        return f"Error: {str(e)}"
+    except HKBUClientError:
+        raise
+    except ValueError as ve:
+        logger.warning("DeepSeek request to %s failed: %s", model_name, ve)
+        return f"Error: {ve}"
+    except Exception as ex:
+        logger.exception("Unexpected error in DeepSeek request to %s", model_name)
+        return f"Unexpected error: {ex}"
+
+
+async def AsyncQwen(
+    model_name: str,
+    messages: List[Dict[str, str]],
+    temperature: Optional[float] = 0.7,
+    max_tokens: Optional[int] = 512,
+    top_p: Optional[float] = 1.0,
+    frequency_penalty: Optional[float] = 0.0,
+    presence_penalty: Optional[float] = 0.0,
+    as_response: bool = False,
+) -> Union[Dict[str, Any], Response]:
+    """
+    Async version of ``Qwen``.
+
+    Returns:
+        Union[Dict[str, Any], Response]: API response.
+
+    Raises:
+        ValueError: If the API request fails.
+    """
+    url, headers, data = qwen.build_request(
+        model_name, messages, temperature, max_tokens, top_p, frequency_penalty, presence_penalty
+    )
+
+    logger.debug("Sending request to %s", model_name)
+    response = await get_async_transport().post(url, deployment=model_name, headers=headers, json=data)
+
+    if response.status_code != 200:
+        logger.warning("Qwen request to %s failed with status code %s", model_name, response.status_code)
+        raise ValueError(f"Request failed with status code {response.status_code}: {response.text}")
+
+    return Response.from_http(response, "qwen") if as_response else response_json(response)
@@ -0,0 +1,405 @@
+import asyncio
+import logging
+import time
+import httpx
+from contextlib import asynccontextmanager
+from typing import Optional, Dict, List, Any, AsyncIterator, Awaitable, Callable, Tuple
+
+from .cache import get_cache, cache_key, is_deterministic
+from .codec import encode_request
+from .exceptions import error_for
+from .hedge import get_hedger, backup_target, observe_latency
+from .ratelimit import get_rate_limiter, retry_after_seconds
+from .retry import RetryPolicy, RetryState, DEFAULT_RETRY_POLICY
+from .singleflight import AsyncSingleFlight
+from .telemetry import RequestMetrics, hooks_enabled
+from .tokens import admit_request, admit_body
+from .usage import get_ledger
+
+logger = logging.getLogger(__name__)
+
+# Pool defaults for the shared async client. The per-deployment semaphore caps
+# how many requests a single deployment sees at once, independently of the pool.
+DEFAULT_MAX_CONNECTIONS: int = 100
+DEFAULT_MAX_KEEPALIVE_CONNECTIONS: int = 32
+DEFAULT_KEEPALIVE_EXPIRY: float = 30.0
+DEFAULT_MAX_CONCURRENCY: int = 16
+
+
+def _tracer(record: RequestMetrics, start: float) -> Callable[[str, Dict[str, Any]], Awaitable[None]]:
+    """Return an httpcore trace callback that fills in the connect time and TTFB of one attempt."""
+    connect_start = None
+
+    async def trace(event: str, info: Dict[str, Any]) -> None:
+        nonlocal connect_start
+        if event == "connection.connect_tcp.started":
+            connect_start = time.perf_counter()
+        elif event in ("connection.connect_tcp.complete", "connection.start_tls.complete") and connect_start:
+            record.connect = time.perf_counter() - connect_start
+        elif event.endswith(".receive_response_headers.complete"):
+            record.ttfb = time.perf_counter() - start
+
+    return trace
+
+
+class AsyncTransport:
+    """
+    Pooled asyncio HTTP transport shared by the async model wrappers.
+
+    Wraps a single ``httpx.AsyncClient`` and bounds in-flight requests per
+    deployment with an ``asyncio.Semaphore``, so one event loop can fan out
+    hundreds of calls without exhausting the gateway or the local pool.
+
+    The client is bound to the event loop it is first used on; create a new
+    transport (or call ``close_async_transport``) before reusing it from
+    another ``asyncio.run``.
+
+    Example:
+        async with AsyncTransport(max_concurrency=8) as transport:
+            set_async_transport(transport)
+            await asyncio.gather(*(AsyncOpenAI(m) for m in messages))
+    """
+
+    def __init__(
+        self,
+        max_connections: int = DEFAULT_MAX_CONNECTIONS,
+        max_keepalive_connections: int = DEFAULT_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry: float = DEFAULT_KEEPALIVE_EXPIRY,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        deployment_concurrency: Optional[Dict[str, int]] = None,
+        timeout: Optional[float] = None,
+        headers: Optional[Dict[str, str]] = None,
+        retry_policy: Optional[RetryPolicy] = DEFAULT_RETRY_POLICY,
+        coalesce: bool = True,
+    ) -> None:
+        """
+        Args:
+            max_connections (int): Maximum number of open connections.
+            max_keepalive_connections (int): Maximum number of idle connections kept alive.
+            keepalive_expiry (float): Seconds an idle connection is kept alive.
+            max_concurrency (int): Default number of in-flight requests allowed per deployment.
+            deployment_concurrency (Optional[Dict[str, int]]): Per-deployment overrides of ``max_concurrency``.
+            timeout (Optional[float]): Default timeout in seconds; ``None`` disables it.
+            headers (Optional[Dict[str, str]]): Extra headers sent with every request.
+            retry_policy (Optional[RetryPolicy]): Retry policy for transient failures; None disables retries.
+            coalesce (bool): Share one upstream call between concurrent identical deterministic requests.
+        """
+        self.retry_policy = retry_policy
+        self.coalesce = coalesce
+        self._inflight = AsyncSingleFlight()
+        self.max_concurrency = max_concurrency
+        self.deployment_concurrency: Dict[str, int] = dict(deployment_concurrency or {})
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self.client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive_connections,
+                keepalive_expiry=keepalive_expiry,
+            ),
+            timeout=timeout,
+            headers=headers,
+        )
+
+    def _semaphore(self, deployment: str) -> asyncio.Semaphore:
+        semaphore = self._semaphores.get(deployment)
+        if semaphore is None:
+            limit = self.deployment_concurrency.get(deployment, self.max_concurrency)
+            semaphore = self._semaphores[deployment] = asyncio.Semaphore(limit)
+        return semaphore
+
+    async def _send(
+        self,
+        url: str,
+        deployment: Optional[str],
+        stream: bool,
+        kwargs: Dict[str, Any],
+        tokens: int = 0,
+        record: Optional[RequestMetrics] = None,
+    ) -> httpx.Response:
+        limiter = get_rate_limiter() if deployment is not None else None
+        policy = self.retry_policy
+        state = RetryState(policy) if policy is not None else None
+
+        while True:
+            if limiter is not None:
+                await limiter.acquire_async(deployment, tokens)
+            response = None
+            retry_after = None
+            start = time.monotonic()
+            try:
+                request = self.client.build_request("POST", url, **kwargs)
+                if record is not None:
+                    request.extensions["trace"] = _tracer(record, record.begin_attempt())
+                    record.request_bytes = len(request.content)
+                response = await self.client.send(request, stream=stream)
+            except httpx.TimeoutException as e:
+                if state is None:
+                    raise
+                kind, cause = "timeout", e
+            except httpx.TransportError as e:
+                if state is None:
+                    raise
+                kind, cause = "connection", e
+            else:
+                if limiter is not None and response.status_code == 429:
+                    limiter.pause(deployment, retry_after_seconds(response.headers))
+                kind = policy.classify(response.status_code) if policy is not None else None
+                if kind is None:
+                    if deployment is not None and not stream:
+                        observe_latency(deployment, time.monotonic() - start)
+                    return response
+                cause = None
+                retry_after = retry_after_seconds(response.headers, default=None)
+
+            delay = state.next_delay(kind, retry_after)
+            if delay is None:
+                if response is not None:
+                    await response.aread()
+                raise error_for(kind, response, cause) from cause
+            if response is not None:
+                await response.aclose()
+            logger.debug("Retrying request to %s in %.2fs after a %s failure", deployment or url, delay, kind)
+            await asyncio.sleep(delay)
+
+    async def post(self, url: str, deployment: Optional[str] = None, hedge: bool = False, **kwargs: Any) -> httpx.Response:
+        """
+        Send a POST request through the pooled client.
+
+        Requests over a usage budget are rejected or downgraded first (see
+        ``usage.Budget``). The payload is then checked against the deployment's
+        context window and output limit (see ``tokens.configure_context_checks``).
+        A ``content`` body passed with its ``json`` payload, as a ``prepared.PromptTemplate``
+        does, is sent without re-serializing the payload.
+        If a response cache is enabled, cacheable requests are answered from it.
+        Concurrent identical deterministic requests share one upstream call.
+        If rate limits are configured, each attempt first waits for the deployment's
+        quota, and a 429 answer pauses further requests to it. Transient failures
+        are retried according to ``retry_policy``. With ``hedge``, a backup request
+        is sent if the first is slower than the shared hedger's latency percentile,
+        and whichever answers second is cancelled. If telemetry hooks are
+        installed, each call is measured and reported to them (see
+        ``telemetry.add_hook``).
+
+        Args:
+            url (str): Request URL.
+            deployment (Optional[str]): Deployment name used to bound concurrency and for rate limiting.
+            hedge (bool): Hedge the request (see ``hedge.HedgePolicy``).
+            **kwargs: Passed through to ``httpx.AsyncClient.build_request``.
+
+        Returns:
+            httpx.Response: The HTTP response.
+
+        Raises:
+            BudgetExceededError: If a hard usage budget for the request is used up.
+            ContextWindowExceededError: If the prompt cannot fit the deployment's context window.
+            HKBUAPIError: A typed error once the retry policy gives up.
+        """
+        if not hooks_enabled():
+            return await self._post(url, deployment, hedge, kwargs)
+        record = RequestMetrics(deployment, url)
+        try:
+            response = await self._post(url, deployment, hedge, kwargs, record)
+        except Exception as e:
+            record.finish(error=e)
+            raise
+        record.finish(response)
+        return response
+
+    async def _post(
+        self,
+        url: str,
+        deployment: Optional[str],
+        hedge: bool,
+        kwargs: Dict[str, Any],
+        record: Optional[RequestMetrics] = None,
+    ) -> httpx.Response:
+        ledger = get_ledger()
+        if ledger is not None and ledger.budgets and deployment:
+            url, deployment, kwargs = ledger.admit(url, deployment, kwargs, "content")
+            if record is not None:
+                record.deployment = deployment
+        payload = kwargs.get("json")
+        tokens, kwargs, body = admit_body(kwargs, "content", deployment, get_rate_limiter() is not None)
+        cache = get_cache()
+        key = cache.key_for(url, payload, body) if cache is not None else None
+        if key is not None:
+            cached = cache.get(key)
+            if cached is not None:
+                if record is not None:
+                    record.cache_hit = True
+                return httpx.Response(
+                    200,
+                    content=cached,
+                    headers={"Content-Type": "application/json"},
+                    request=httpx.Request("POST", url),
+                )
+
+        async def send_to(
+            target_url: str, target: Optional[str], arm: Optional[RequestMetrics] = record
+        ) -> httpx.Response:
+            if target is None:
+                return await self._send(target_url, None, False, kwargs, 0, arm)
+            async with self._semaphore(target):
+                return await self._send(target_url, target, False, kwargs, tokens, arm)
+
+        async def send() -> httpx.Response:
+            if not hedge or deployment is None:
+                return await send_to(url, deployment)
+            hedger = get_hedger()
+            backup_url, backup_deployment = backup_target(url, deployment, hedger.policy.siblings)
+            if record is None:
+                return await hedger.arun(
+                    deployment,
+                    lambda: send_to(url, deployment),
+                    lambda: send_to(backup_url, backup_deployment),
+                )
+            # Each arm gets its own record, so concurrent attempts don't overwrite each other's timings
+            arms = (record.fork(url, deployment), record.fork(backup_url, backup_deployment))
+            returned: List[Tuple[httpx.Response, RequestMetrics]] = []
+
+            async def send_arm(arm: RequestMetrics) -> httpx.Response:
+                response = await send_to(arm.url, arm.deployment, arm)
+                returned.append((response, arm))
+                return response
+
+            response = None
+            try:
+                response = await hedger.arun(deployment, lambda: send_arm(arms[0]), lambda: send_arm(arms[1]))
+                return response
+            finally:
+                record.join(arms, next((arm for sent, arm in returned if sent is response), None))
+
+        kwargs = encode_request(kwargs, "content")
+        if key is None and self.coalesce and payload is not None and is_deterministic(payload):
+            # Only compared within this process, so the encoded body can be hashed as is
+            flight_key = cache_key(url, payload, kwargs["content"])
+        else:
+            flight_key = key
+        if flight_key is None:
+            return await send()
+
+        response, shared = await self._inflight.do(flight_key, send)
+        if shared:
+            if record is not None:
+                record.coalesced = True
+            return httpx.Response(
+                response.status_code,
+                headers=response.headers,
+                content=response.content,
+                request=response.request,
+            )
+        if key is not None and response.status_code == 200:
+            cache.set(key, response.content)
+        return response
+
+    @asynccontextmanager
+    async def stream(self, url: str, deployment: Optional[str] = None, **kwargs: Any) -> AsyncIterator[httpx.Response]:
+        """
+        Send a POST request and yield the response before its body is read.
+
+        Usage budgets, rate limiting and retries apply as in ``post`` until the response headers
+        arrive. The deployment's concurrency slot is held until the block exits.
+        Telemetry hooks are called once the headers have arrived.
+
+        Args:
+            url (str): Request URL.
+            deployment (Optional[str]): Deployment name used to bound concurrency and for rate limiting.
+            **kwargs: Passed through to ``httpx.AsyncClient.build_request``.
+
+        Yields:
+            httpx.Response: The streaming HTTP response.
+        """
+        record = RequestMetrics(deployment, url, stream=True) if hooks_enabled() else None
+        try:
+            ledger = get_ledger()
+            if ledger is not None and ledger.budgets and deployment:
+                url, deployment, kwargs = ledger.admit(url, deployment, kwargs, "content")
+                if record is not None:
+                    record.deployment = deployment
+            semaphore = self._semaphore(deployment) if deployment is not None else None
+            tokens = admit_request(kwargs.get("json"), deployment, get_rate_limiter() is not None)
+            kwargs = encode_request(kwargs, "content")
+            if semaphore is not None:
+                await semaphore.acquire()
+            try:
+                response = await self._send(url, deployment, True, kwargs, tokens, record)
+            except BaseException:
+                if semaphore is not None:
+                    semaphore.release()
+                raise
+        except Exception as e:
+            if record is not None:
+                record.finish(error=e)
+            raise
+        if record is not None:
+            record.finish(response)
+        try:
+            yield response
+        finally:
+            await response.aclose()
+            if semaphore is not None:
+                semaphore.release()
+
+    async def aclose(self) -> None:
+        """Close the client and release all pooled connections."""
+        await self.client.aclose()
+
+    async def __aenter__(self) -> "AsyncTransport":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.aclose()
+
+
+_async_transport: Optional[AsyncTransport] = None
+
+
+def get_async_transport() -> AsyncTransport:
+    """
+    Return the shared async transport, creating it with default settings on first use.
+
+    Returns:
+        AsyncTransport: The process-wide async transport.
+    """
+    global _async_transport
+    if _async_transport is None:
+        _async_transport = AsyncTransport()
+    return _async_transport
+
+
+def set_async_transport(transport: AsyncTransport) -> None:
+    """
+    Replace the shared async transport used by the async wrappers.
+
+    The previous transport is not closed; the caller owns its lifecycle.
+
+    Args:
+        transport (AsyncTransport): The transport to install.
+    """
+    global _async_transport
+    _async_transport = transport
+
+
+async def configure_async_transport(**kwargs: Any) -> AsyncTransport:
+    """
+    Close the shared async transport and replace it with a newly configured one.
+
+    Args:
+        **kwargs: Passed to ``AsyncTransport``.
+
+    Returns:
+        AsyncTransport: The new shared async transport.
+    """
+    global _async_transport
+    if _async_transport is not None:
+        await _async_transport.aclose()
+    _async_transport = AsyncTransport(**kwargs)
+    return _async_transport
+
+
+async def close_async_transport() -> None:
+    """Close the shared async transport. A fresh one is created on next use."""
+    global _async_transport
+    if _async_transport is not None:
+        await _async_transport.aclose()
+        _async_transport = None
@@ -0,0 +1,223 @@
+import argparse
+import contextvars
+import json
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, Future, as_completed, wait, FIRST_COMPLETED
+from typing import Optional, Dict, List, Any, Callable, Iterator, NamedTuple, Set, TextIO, Union
+
+from .openai import OpenAI
+from .claude import Claude
+from .gemini import Gemini
+from .llama import llama
+from .deepseek import DeepSeek
+from .jsonl import truncate_partial_line
+from .qwen import Qwen, build_conversation
+from .registry import get_model
+
+
+def _qwen(message: str, model_name: str, system_message: Optional[str] = None, **parameters: Any) -> Dict[str, Any]:
+    return Qwen(model_name, build_conversation(message, system_message), **parameters)
+
+
+# Model family -> wrapper; the family of a model comes from the model registry
+WRAPPERS: Dict[str, Callable[..., Any]] = {
+    "openai": OpenAI,
+    "claude": Claude,
+    "gemini": Gemini,
+    "llama": llama,
+    "deepseek": DeepSeek,
+    "qwen": _qwen,
+}
+
+
+class InvalidRecord(NamedTuple):
+    """An input line that is not a JSON object; written as an error under its line number."""
+    id: int
+    error: str
+
+
+# Wrapper parameters whose results cannot be written as a JSON line
+UNSUPPORTED_PARAMETERS = frozenset({"stream", "as_response"})
+
+
+def run_request(record: Union[Dict[str, Any], InvalidRecord]) -> Dict[str, Any]:
+    """
+    Send one batch record through the matching wrapper.
+
+    Args:
+        record (Union[Dict[str, Any], InvalidRecord]): A record with ``id``, ``model``, ``message``
+            and optional ``parameters``, or an input line that could not be parsed.
+
+    Returns:
+        Dict[str, Any]: The output record, with either ``response`` or ``error`` set.
+    """
+    if isinstance(record, InvalidRecord):
+        return {"id": record.id, "model": None, "error": record.error}
+    result: Dict[str, Any] = {"id": record.get("id"), "model": record.get("model")}
+    try:
+        parameters = dict(record.get("parameters") or {})
+        unsupported = sorted(UNSUPPORTED_PARAMETERS.intersection(parameters))
+        if unsupported:
+            raise ValueError(f"Unsupported batch parameters: {', '.join(unsupported)}")
+        spec = get_model(record["model"])
+        wrapper = WRAPPERS.get(spec.family) if spec is not None else None
+        if wrapper is None:
+            raise ValueError(f"Model {record['model']} not found")
+        result["response"] = wrapper(record["message"], model_name=record["model"], **parameters)
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+    return result
+
+
+def read_done_ids(output_path: str) -> Set[Any]:
+    """
+    Collect the IDs already present in an output file.
+
+    Lines that don't parse (e.g. truncated by a crash) are ignored so they get re-run.
+
+    Args:
+        output_path (str): Path of the output JSONL file.
+
+    Returns:
+        Set[Any]: IDs of the records already written.
+    """
+    done: Set[Any] = set()
+    if not os.path.exists(output_path):
+        return done
+    with open(output_path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                done.add(json.loads(line)["id"])
+            except (ValueError, KeyError, TypeError):
+                continue
+    return done
+
+
+def iter_records(lines: TextIO, skip_ids: Set[Any]) -> Iterator[Union[Dict[str, Any], InvalidRecord]]:
+    """
+    Lazily parse request records from a JSONL stream.
+
+    Records without an ``id`` get their 1-based line number as ID. A line
+    that is not a JSON object is yielded as an ``InvalidRecord`` with its line
+    number as ID, so it is written as an error and skipped on resume instead
+    of stopping every run at the same line.
+
+    Args:
+        lines (TextIO): The open input file.
+        skip_ids (Set[Any]): IDs to skip.
+
+    Yields:
+        Union[Dict[str, Any], InvalidRecord]: Each pending record.
+    """
+    for line_number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            record = InvalidRecord(line_number, f"Invalid JSON on line {line_number}: {e}")
+        if isinstance(record, dict):
+            record.setdefault("id", line_number)
+            if isinstance(record["id"], (dict, list)):
+                record = InvalidRecord(line_number, f"Line {line_number} has an object or array as id")
+        elif not isinstance(record, InvalidRecord):
+            record = InvalidRecord(line_number, f"Line {line_number} is not a JSON object")
+        record_id = record.id if isinstance(record, InvalidRecord) else record["id"]
+        if record_id not in skip_ids:
+            yield record
+
+
+def run_batch(
+    input_path: str,
+    output_path: str,
+    max_workers: int = 8,
+    ordered: bool = True,
+    resume: bool = True,
+    max_pending: Optional[int] = None,
+) -> int:
+    """
+    Stream a JSONL file of requests through the wrappers and write results to a JSONL file.
+
+    Only ``max_pending`` requests are held in memory at a time, so input size is
+    unbounded. Each result is flushed as soon as it is written; with ``resume``
+    the output is appended to and IDs already present are skipped.
+
+    Args:
+        input_path (str): Path of the input JSONL file.
+        output_path (str): Path of the output JSONL file.
+        max_workers (int): Number of requests sent in parallel.
+        ordered (bool): Write results in input order instead of completion order.
+        resume (bool): Skip IDs already in the output file instead of overwriting it.
+        max_pending (Optional[int]): Maximum number of submitted but unwritten requests
+            (default: ``4 * max_workers``).
+
+    Returns:
+        int: Number of records written by this run.
+    """
+    window = max_pending or 4 * max_workers
+    done_ids: Set[Any] = set()
+    if resume:
+        truncate_partial_line(output_path)
+        done_ids = read_done_ids(output_path)
+    written = 0
+
+    def write(out: TextIO, future: Future) -> None:
+        nonlocal written
+        result = future.result()
+        try:
+            line = json.dumps(result, ensure_ascii=False)
+        except (TypeError, ValueError) as e:
+            error = {"id": result.get("id"), "model": result.get("model"), "error": f"{type(e).__name__}: {e}"}
+            line = json.dumps(error, ensure_ascii=False)
+        out.write(line + "\n")
+        out.flush()
+        written += 1
+
+    with open(input_path, "r", encoding="utf-8") as src, \
+            open(output_path, "a" if resume else "w", encoding="utf-8") as out, \
+            ThreadPoolExecutor(max_workers=max_workers) as pool:
+        if ordered:
+            queue: deque = deque()
+            for record in iter_records(src, done_ids):
+                queue.append(pool.submit(contextvars.copy_context().run, run_request, record))
+                # Write every finished head-of-line result; block on the head when the window is full
+                while queue and (len(queue) >= window or queue[0].done()):
+                    write(out, queue.popleft())
+            while queue:
+                write(out, queue.popleft())
+        else:
+            pending: Set[Future] = set()
+            for record in iter_records(src, done_ids):
+                pending.add(pool.submit(contextvars.copy_context().run, run_request, record))
+                if len(pending) >= window:
+                    finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        write(out, future)
+            for future in as_completed(pending):
+                write(out, future)
+
+    return written
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Run a JSONL file of requests through the HKBU GenAI wrappers.")
+    parser.add_argument("input", help="input JSONL file with id, model, message and parameters per line")
+    parser.add_argument("output", help="output JSONL file")
+    parser.add_argument("--workers", type=int, default=8, help="number of parallel requests (default: 8)")
+    parser.add_argument("--unordered", action="store_true", help="write results in completion order")
+    parser.add_argument("--no-resume", action="store_true", help="overwrite the output instead of resuming")
+    args = parser.parse_args(argv)
+
+    written = run_batch(
+        args.input,
+        args.output,
+        max_workers=args.workers,
+        ordered=not args.unordered,
+        resume=not args.no_resume,
+    )
+    print(f"Wrote {written} results to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
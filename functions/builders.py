@@ -0,0 +1,45 @@
+from typing import Optional, Dict, Any, Callable, Tuple
+
+from . import openai, claude, gemini, llama as llama_module, deepseek, qwen
+
+
+def _openai(message: str, model: str, system_message: Optional[str], temperature: float, max_tokens: int):
+    return openai.build_request(message, model, None, temperature, max_tokens, system_message=system_message)
+
+
+def _claude(message: str, model: str, system_message: Optional[str], temperature: float, max_tokens: int):
+    url, headers, payload = claude.build_request(message, model, None, temperature, max_tokens)
+    if system_message:
+        payload["system"] = system_message
+    return url, headers, payload
+
+
+def _gemini(message: str, model: str, system_message: Optional[str], temperature: float, max_tokens: int):
+    url, headers, payload = gemini.build_request(message, model, temperature, max_tokens, "text/plain")
+    if system_message:
+        payload["systemInstruction"] = {"parts": [{"text": system_message}]}
+    return url, headers, payload
+
+
+def _llama(message: str, model: str, system_message: Optional[str], temperature: float, max_tokens: int):
+    return llama_module.build_request(message, model, None, temperature, max_tokens, system=system_message)
+
+
+def _deepseek(message: str, model: str, system_message: Optional[str], temperature: float, max_tokens: int):
+    return deepseek.build_request(message, model, temperature, max_tokens, system_message=system_message)
+
+
+def _qwen(message: str, model: str, system_message: Optional[str], temperature: float, max_tokens: int):
+    return qwen.build_request(model, qwen.build_conversation(message, system_message), temperature, max_tokens)
+
+
+# Model family -> builder of a request from common parameters (message, model,
+# system message, temperature, max tokens)
+REQUEST_BUILDERS: Dict[str, Callable[..., Tuple[str, Dict[str, str], Dict[str, Any]]]] = {
+    "openai": _openai,
+    "claude": _claude,
+    "gemini": _gemini,
+    "llama": _llama,
+    "deepseek": _deepseek,
+    "qwen": _qwen,
+}
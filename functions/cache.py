@@ -0,0 +1,288 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Dict, Any, Tuple
+
+
+def cache_key(url: str, payload: Dict[str, Any], body: Optional[bytes] = None) -> str:
+    """
+    Stable hash of a request.
+
+    The URL carries the deployment name and api-version; the payload is
+    canonicalized (sorted keys, compact separators) so dict ordering doesn't
+    change the key. A body pre-serialized by a ``prepared.PromptTemplate`` is
+    hashed as is instead, since templates always serialize the same way.
+
+    Args:
+        url (str): Request URL.
+        payload (Dict[str, Any]): JSON payload.
+        body (Optional[bytes]): The payload already serialized, if any.
+
+    Returns:
+        str: Hex SHA-256 digest.
+    """
+    if body is not None:
+        return hashlib.sha256(url.encode("utf-8") + b"\n" + body).hexdigest()
+    canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(f"{url}\n{canonical}".encode("utf-8")).hexdigest()
+
+
+def is_deterministic(payload: Dict[str, Any]) -> bool:
+    """
+    Whether a payload asks for a reproducible, non-streamed answer (temperature 0).
+
+    Args:
+        payload (Dict[str, Any]): JSON payload.
+
+    Returns:
+        bool: True if the response can be replayed.
+    """
+    if payload.get("stream"):
+        return False
+    temperature = payload.get("temperature")
+    if temperature is None:
+        temperature = (payload.get("generationConfig") or {}).get("temperature")
+    return temperature is not None and temperature <= 0
+
+
+class LRUCache:
+    """Thread-safe in-memory LRU of response bodies with optional TTL."""
+
+    def __init__(self, max_entries: int = 1024, ttl: Optional[float] = None) -> None:
+        """
+        Args:
+            max_entries (int): Maximum number of cached responses.
+            ttl (Optional[float]): Seconds an entry stays valid; None keeps it until evicted.
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[bytes, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            body, created = entry
+            if self.ttl is not None and time.time() - created > self.ttl:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return body
+
+    def set(self, key: str, body: bytes, created: Optional[float] = None) -> None:
+        with self._lock:
+            self._entries[key] = (body, created if created is not None else time.time())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class SQLiteCache:
+    """
+    On-disk response cache in a single SQLite file.
+
+    Entries expire after ``ttl`` seconds; once the stored bodies exceed
+    ``max_bytes`` the least recently used ones are evicted.
+    """
+
+    def __init__(self, path: str, ttl: Optional[float] = None, max_bytes: int = 512 * 1024 * 1024) -> None:
+        """
+        Args:
+            path (str): Database file path.
+            ttl (Optional[float]): Seconds an entry stays valid; None keeps it until evicted.
+            max_bytes (int): Maximum total size of stored bodies.
+        """
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, body BLOB NOT NULL, size INTEGER NOT NULL, "
+            "created REAL NOT NULL, accessed REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)")
+        self._size: int = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    def get(self, key: str) -> Optional[Tuple[bytes, float]]:
+        """
+        Return the body and creation time stored under ``key``, if still valid.
+        """
+        now = time.time()
+        with self._lock:
+            row = self._db.execute("SELECT body, size, created FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            body, size, created = row
+            if self.ttl is not None and now - created > self.ttl:
+                self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._size -= size
+                return None
+            self._db.execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, key))
+            return bytes(body), created
+
+    def set(self, key: str, body: bytes) -> None:
+        now = time.time()
+        with self._lock:
+            row = self._db.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                self._size -= row[0]
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses (key, body, size, created, accessed) VALUES (?, ?, ?, ?, ?)",
+                (key, sqlite3.Binary(body), len(body), now, now),
+            )
+            self._size += len(body)
+            if self._size > self.max_bytes:
+                self._evict(now)
+
+    def _evict(self, now: float) -> None:
+        if self.ttl is not None:
+            self._db.execute("DELETE FROM responses WHERE created < ?", (now - self.ttl,))
+        # Shrink to 90% of the budget so eviction doesn't run on every insert
+        target = int(self.max_bytes * 0.9)
+        self._size = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        while self._size > target:
+            rows = self._db.execute(
+                "SELECT key, size FROM responses ORDER BY accessed ASC LIMIT 256"
+            ).fetchall()
+            if not rows:
+                break
+            self._db.executemany("DELETE FROM responses WHERE key = ?", [(key,) for key, _ in rows])
+            self._size -= sum(size for _, size in rows)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._db.execute("DELETE FROM responses")
+            self._size = 0
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+class ResponseCache:
+    """
+    Two-tier response cache: an in-memory LRU in front of an optional SQLite file.
+
+    By default only deterministic requests (``temperature`` 0, not streamed)
+    are cached, since other requests are expected to return a new sample.
+
+    Example:
+        configure_cache(path=".cache/responses.sqlite", ttl=7 * 24 * 3600)
+    """
+
+    def __init__(
+        self,
+        memory_entries: int = 1024,
+        path: Optional[str] = None,
+        ttl: Optional[float] = None,
+        max_bytes: int = 512 * 1024 * 1024,
+        cache_nondeterministic: bool = False,
+    ) -> None:
+        """
+        Args:
+            memory_entries (int): Size of the in-memory LRU tier.
+            path (Optional[str]): SQLite file for the on-disk tier; memory only if None.
+            ttl (Optional[float]): Seconds an entry stays valid in both tiers.
+            max_bytes (int): Size budget of the on-disk tier.
+            cache_nondeterministic (bool): Also cache requests with ``temperature > 0``.
+        """
+        self.memory = LRUCache(memory_entries, ttl)
+        self.disk = SQLiteCache(path, ttl, max_bytes) if path else None
+        self.cache_nondeterministic = cache_nondeterministic
+
+    def key_for(self, url: str, payload: Optional[Dict[str, Any]], body: Optional[bytes] = None) -> Optional[str]:
+        """
+        Return the cache key of a request, or None if it should bypass the cache.
+
+        Args:
+            url (str): Request URL.
+            payload (Optional[Dict[str, Any]]): JSON payload.
+            body (Optional[bytes]): The payload already serialized, if any.
+
+        Returns:
+            Optional[str]: The cache key.
+        """
+        if payload is None or payload.get("stream"):
+            return None
+        if not self.cache_nondeterministic and not is_deterministic(payload):
+            return None
+        return cache_key(url, payload, body)
+
+    def get(self, key: str) -> Optional[bytes]:
+        body = self.memory.get(key)
+        if body is not None or self.disk is None:
+            return body
+        entry = self.disk.get(key)
+        if entry is None:
+            return None
+        body, created = entry
+        self.memory.set(key, body, created)
+        return body
+
+    def set(self, key: str, body: bytes) -> None:
+        self.memory.set(key, body)
+        if self.disk is not None:
+            self.disk.set(key, body)
+
+    def clear(self) -> None:
+        self.memory.clear()
+        if self.disk is not None:
+            self.disk.clear()
+
+    def close(self) -> None:
+        if self.disk is not None:
+            self.disk.close()
+
+
+_cache: Optional[ResponseCache] = None
+
+
+def get_cache() -> Optional[ResponseCache]:
+    """
+    Return the shared response cache, or None if caching is not enabled.
+
+    Returns:
+        Optional[ResponseCache]: The process-wide cache.
+    """
+    return _cache
+
+
+def configure_cache(**kwargs: Any) -> ResponseCache:
+    """
+    Enable the shared response cache used by both transports.
+
+    Args:
+        **kwargs: Passed to ``ResponseCache``.
+
+    Returns:
+        ResponseCache: The new shared cache.
+    """
+    global _cache
+    if _cache is not None:
+        _cache.close()
+    _cache = ResponseCache(**kwargs)
+    return _cache
+
+
+def disable_cache() -> None:
+    """Disable and close the shared response cache."""
+    global _cache
+    if _cache is not None:
+        _cache.close()
+        _cache = None
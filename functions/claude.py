@@ -1,25 +1,13 @@
-import os
-from dotenv import load_dotenv
-import requests
-from typing import Optional, Dict, List, Union, Any
+from typing import Optional, Dict, List, Union, Any, Tuple, Iterator
 
-# Load environment variables
-load_dotenv()
+from .codec import response_json
+from .config import get_config
+from .registry import REGISTRY, ModelSpec, get_model
+from .responses import Response
+from .streaming import iter_deltas
 
-# Retrieve API key and base URL from environment variables
-API_KEY: Optional[str] = os.getenv("HKBU_API_KEY")
-BASE_URL: Optional[str] = os.getenv("HKBU_BASIC_URL")
-
-if API_KEY is None:
-    raise ValueError("HKBU_API_KEY not found in environment variables")
-if BASE_URL is None:
-    raise ValueError("HKBU_BASIC_URL not found in environment variables")
-
-# Define the list of Claude models
-CLAUDE_MODELS: List[Dict[str, str]] = [
-    {"model": "claude-3-5-sonnet", "api-version": "20240620"},
-    {"model": "claude-3-haiku", "api-version": "20240307"}
-]
+# Claude deployments from the model registry
+CLAUDE_MODELS: List[Dict[str, str]] = REGISTRY.model_list("claude")
 
 def find_model_info(model_name: str) -> Optional[Dict[str, str]]:
     """
@@ -31,17 +19,19 @@ def find_model_info(model_name: str) -> Optional[Dict[str, str]]:
     Returns:
         Optional[Dict[str, str]]: The model information if found, otherwise None.
     """
-    return next((model for model in CLAUDE_MODELS if model["model"] == model_name), None)
+    spec: Optional[ModelSpec] = get_model(model_name, "claude")
+    return spec.info() if spec else None
 
-def Claude(
+def build_request(
     message: str,
     model_name: str = "claude-3-5-sonnet",
     image_url: Optional[str] = None,
     temperature: float = 0.0,
-    max_tokens: int = 100
-) -> Union[Dict[str, Any], str]:
+    max_tokens: int = 100,
+    stream: bool = False
+) -> Tuple[str, Dict[str, str], Dict[str, Any]]:
     """
-    Sends a request to the Claude API with the specified parameters.
+    Builds the URL, headers and payload for a Claude API request.
     
     Args:
         message (str): The text message to send to the model.
@@ -49,17 +39,19 @@ def Claude(
         image_url (Optional[str]): The URL of an image to include in the request (optional).
         temperature (float): The sampling temperature for the model (default: 0.0).
         max_tokens (int): The maximum number of tokens to generate (default: 100).
+        stream (bool): Whether to stream the response (default: False).
     
     Returns:
-        Union[Dict[str, Any], str]: The JSON response from the API or an error message.
+        Tuple[str, Dict[str, str], Dict[str, Any]]: The request URL, headers and payload.
+    
+    Raises:
+        ValueError: If the model is not found in CLAUDE_MODELS.
     """
     # Validate model name
-    model_info: Optional[Dict[str, str]] = find_model_info(model_name)
-    if not model_info:
+    spec: Optional[ModelSpec] = get_model(model_name, "claude")
+    if spec is None:
         raise ValueError(f"Model {model_name} not found in CLAUDE_MODELS list")
     
-    api_version: str = model_info["api-version"]
-    
     # Construct the conversation payload
     conversation: List[Dict[str, Any]] = [{"role": "user", "content": message}]
     
@@ -70,11 +62,9 @@ def Claude(
         ]
     
     # Construct the API URL and headers
-    url: str = f"{BASE_URL}/deployments/{model_name}/messages/?api-version={api_version}"
-    headers: Dict[str, str] = {
-        "Content-Type": "application/json",
-        "api-key": API_KEY
-    }
+    config = get_config()
+    url: str = spec.url(config.base_url)
+    headers: Dict[str, str] = spec.headers(config.api_key)
     
     # Construct the payload
     payload: Dict[str, Any] = {
@@ -82,11 +72,49 @@ def Claude(
         "temperature": temperature,
         "max_tokens": max_tokens
     }
+    if stream:
+        payload["stream"] = True
+    
+    return url, headers, payload
+
+def Claude(
+    message: str,
+    model_name: str = "claude-3-5-sonnet",
+    image_url: Optional[str] = None,
+    temperature: float = 0.0,
+    max_tokens: int = 100,
+    stream: bool = False,
+    hedge: bool = False,
+    as_response: bool = False
+) -> Union[Dict[str, Any], Response, str, Iterator[str]]:
+    """
+    Sends a request to the Claude API with the specified parameters.
+    
+    Args:
+        message (str): The text message to send to the model.
+        model_name (str): The name of the model to use (default: "claude-3-5-sonnet").
+        image_url (Optional[str]): The URL of an image to include in the request (optional).
+        temperature (float): The sampling temperature for the model (default: 0.0).
+        max_tokens (int): The maximum number of tokens to generate (default: 100).
+        stream (bool): Whether to stream the response (default: False).
+        hedge (bool): Send a backup request if this one is slow (default: False).
+        as_response (bool): Return a normalized ``responses.Response`` instead of the raw dict (default: False).
+    
+    Returns:
+        Union[Dict[str, Any], Response, str, Iterator[str]]: The JSON response from the API, an iterator
+        of text deltas if ``stream`` is set, or an error message.
+    """
+    import requests
+    from .transport import get_transport
+
+    url, headers, payload = build_request(message, model_name, image_url, temperature, max_tokens, stream)
     
     # Send the request
     try:
-        response = requests.post(url, json=payload, headers=headers)
+        response = get_transport().post(url, deployment=model_name, json=payload, headers=headers, stream=stream, hedge=hedge)
         response.raise_for_status()  # Raise an exception for HTTP errors
-        return response.json()
+        if stream:
+            return iter_deltas(response, "claude")
+        return Response.from_http(response, "claude") if as_response else response_json(response)
     except requests.exceptions.RequestException as e:
         return f"Error: {e}"
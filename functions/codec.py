@@ -0,0 +1,155 @@
+import gzip
+import json
+from typing import Optional, Dict, Any, Union
+
+# JSON backends configure_codec accepts; "auto" picks orjson when installed
+JSON_BACKENDS = ("auto", "orjson", "json")
+
+# Compressed request bodies must be at least this large once compression is on;
+# below it gzip's CPU cost outweighs the bytes saved
+DEFAULT_COMPRESS_THRESHOLD: int = 16 * 1024
+
+
+def _load_orjson() -> Any:
+    try:
+        import orjson
+        return orjson
+    except ImportError:
+        return None
+
+
+_orjson: Any = _load_orjson()
+_compress_threshold: Optional[int] = None
+_compress_level: int = 6
+
+
+def configure_codec(
+    json_backend: str = "auto",
+    compress: bool = False,
+    compress_threshold: int = DEFAULT_COMPRESS_THRESHOLD,
+    compress_level: int = 6,
+) -> None:
+    """
+    Choose how request payloads are encoded and responses decoded.
+
+    By default orjson is used when installed and request bodies are sent
+    uncompressed. Only enable ``compress`` for gateways that accept
+    ``Content-Encoding: gzip`` request bodies; others answer 415 or 400.
+
+    Args:
+        json_backend (str): ``"auto"``, ``"orjson"`` (must be installed) or ``"json"`` for the stdlib.
+        compress (bool): Gzip request bodies of at least ``compress_threshold`` bytes.
+        compress_threshold (int): Smallest body in bytes that is compressed.
+        compress_level (int): Gzip level from 1 (fastest) to 9 (smallest).
+
+    Raises:
+        ValueError: If the backend is unknown or orjson is requested but not installed.
+    """
+    global _orjson, _compress_threshold, _compress_level
+    if json_backend not in JSON_BACKENDS:
+        raise ValueError(f"Unknown JSON backend {json_backend!r}; expected one of {JSON_BACKENDS}")
+    if json_backend == "json":
+        _orjson = None
+    else:
+        _orjson = _load_orjson()
+        if _orjson is None and json_backend == "orjson":
+            raise ValueError("orjson is not installed; run pip install orjson")
+    _compress_threshold = compress_threshold if compress else None
+    _compress_level = compress_level
+
+
+def json_backend() -> str:
+    """Return the name of the JSON backend in use, ``"orjson"`` or ``"json"``."""
+    return "orjson" if _orjson is not None else "json"
+
+
+def dumps(value: Any) -> bytes:
+    """
+    Serialize ``value`` to compact UTF-8 JSON.
+
+    Args:
+        value (Any): A JSON-serializable value.
+
+    Returns:
+        bytes: The encoded JSON.
+    """
+    if _orjson is not None:
+        try:
+            return _orjson.dumps(value, option=_orjson.OPT_NON_STR_KEYS)
+        except TypeError:
+            # e.g. integers beyond 64 bits, which the stdlib encodes
+            pass
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def loads(data: Union[bytes, str]) -> Any:
+    """
+    Parse a JSON document.
+
+    Args:
+        data (Union[bytes, str]): The encoded JSON.
+
+    Returns:
+        Any: The decoded value.
+
+    Raises:
+        ValueError: If ``data`` is not valid JSON.
+    """
+    if _orjson is not None:
+        return _orjson.loads(data)
+    return json.loads(data)
+
+
+def response_json(response: Any) -> Any:
+    """
+    Decode the JSON body of a ``requests`` or ``httpx`` response.
+
+    Falls back to ``response.json()`` when the fast backend cannot parse the
+    body, so invalid bodies raise the same errors as before (``requests``'
+    is a ``RequestException``).
+
+    Args:
+        response (Any): The HTTP response.
+
+    Returns:
+        Any: The decoded body.
+    """
+    if _orjson is not None:
+        try:
+            return _orjson.loads(response.content)
+        except ValueError:
+            pass
+    return response.json()
+
+
+def encode_request(kwargs: Dict[str, Any], body_key: str) -> Dict[str, Any]:
+    """
+    Serialize the ``json`` payload of a transport call and compress large bodies.
+
+    A body that is already set under ``body_key`` (e.g. by a
+    ``prepared.PromptTemplate``) is kept. Once compression is on, bodies of at
+    least the threshold are gzipped and ``Content-Encoding: gzip`` is added.
+
+    Args:
+        kwargs (Dict[str, Any]): Keyword arguments of the transport call.
+        body_key (str): Keyword of the body for the HTTP library (``data`` or ``content``).
+
+    Returns:
+        Dict[str, Any]: The keyword arguments to send; ``kwargs`` itself is not modified.
+    """
+    payload = kwargs.get("json")
+    body = kwargs.get(body_key)
+    if body is None and payload is None:
+        return kwargs
+    kwargs = dict(kwargs)
+    headers = kwargs.get("headers")
+    if body is None:
+        body = kwargs[body_key] = dumps(kwargs.pop("json"))
+        if not headers or "Content-Type" not in headers:
+            headers = {**(headers or {}), "Content-Type": "application/json"}
+    if _compress_threshold is not None and isinstance(body, bytes) and len(body) >= _compress_threshold:
+        kwargs[body_key] = gzip.compress(body, compresslevel=_compress_level, mtime=0)
+        headers = {**(headers or {}), "Content-Encoding": "gzip"}
+    if headers is not None:
+        kwargs["headers"] = headers
+    return kwargs
@@ -0,0 +1,76 @@
+import os
+import threading
+from typing import Optional, NamedTuple
+
+
+class Config(NamedTuple):
+    """Credentials and gateway URL used by every wrapper."""
+    api_key: str
+    base_url: str
+
+
+_config: Optional[Config] = None
+_config_lock = threading.Lock()
+
+
+def get_config() -> Config:
+    """
+    Return the shared configuration, reading it from the environment on first use.
+
+    ``.env`` is loaded with ``python-dotenv`` the first time this is called, so
+    importing the wrappers has no side effects and works without credentials.
+
+    Returns:
+        Config: The API key and base URL.
+
+    Raises:
+        ValueError: If HKBU_API_KEY or HKBU_BASIC_URL is not set.
+    """
+    global _config
+    if _config is None:
+        with _config_lock:
+            if _config is None:
+                from dotenv import load_dotenv
+
+                load_dotenv()
+                api_key = os.getenv("HKBU_API_KEY")
+                base_url = os.getenv("HKBU_BASIC_URL")
+                if api_key is None:
+                    raise ValueError("HKBU_API_KEY not found in environment variables")
+                if base_url is None:
+                    raise ValueError("HKBU_BASIC_URL not found in environment variables")
+                _config = Config(api_key, base_url)
+    return _config
+
+
+def configure(api_key: Optional[str] = None, base_url: Optional[str] = None) -> Config:
+    """
+    Set the shared configuration explicitly instead of reading the environment.
+
+    Values left as None fall back to HKBU_API_KEY / HKBU_BASIC_URL.
+
+    Args:
+        api_key (Optional[str]): HKBU GenAI Platform API key.
+        base_url (Optional[str]): Gateway base URL.
+
+    Returns:
+        Config: The new shared configuration.
+
+    Raises:
+        ValueError: If a value is neither given nor set in the environment.
+    """
+    global _config
+    if api_key is None or base_url is None:
+        defaults = get_config()
+        api_key = api_key if api_key is not None else defaults.api_key
+        base_url = base_url if base_url is not None else defaults.base_url
+    with _config_lock:
+        _config = Config(api_key, base_url)
+    return _config
+
+
+def reset_config() -> None:
+    """Forget the shared configuration; it is read from the environment again on next use."""
+    global _config
+    with _config_lock:
+        _config = None
@@ -0,0 +1,345 @@
+from typing import Optional, Dict, List, Any, Callable, Iterator, Tuple
+
+from .codec import response_json
+from .config import get_config
+from .registry import ModelSpec, get_model
+from .responses import response_text
+from .streaming import iter_deltas
+from .tokens import MESSAGE_OVERHEAD, count_tokens
+
+# Families that send the system message as the first chat message rather
+# than as a separate payload field
+_INLINE_SYSTEM = {"openai", "deepseek", "qwen"}
+
+
+class Turn:
+    """One message of a conversation in provider-neutral form."""
+
+    __slots__ = ("role", "content", "image_url", "tokens")
+
+    def __init__(self, role: str, content: str, image_url: Optional[str] = None, tokens: int = 0) -> None:
+        self.role = role
+        self.content = content
+        self.image_url = image_url
+        self.tokens = tokens
+
+    def __repr__(self) -> str:
+        return f"Turn({self.role!r}, {self.content!r})"
+
+
+def _chat_message(turn: Turn) -> Dict[str, Any]:
+    if turn.image_url:
+        return {
+            "role": turn.role,
+            "content": [
+                {"type": "text", "text": turn.content},
+                {"type": "image_url", "image_url": {"url": turn.image_url, "detail": "low"}},
+            ],
+        }
+    return {"role": turn.role, "content": turn.content}
+
+
+def _gemini_content(turn: Turn) -> Dict[str, Any]:
+    if turn.image_url:
+        raise ValueError("Image turns are not supported for gemini conversations")
+    return {"role": "model" if turn.role == "assistant" else "user", "parts": [{"text": turn.content}]}
+
+
+# Model family -> renderer of one turn in that family's wire format
+TURN_RENDERERS: Dict[str, Callable[[Turn], Dict[str, Any]]] = {
+    "openai": _chat_message,
+    "deepseek": _chat_message,
+    "qwen": _chat_message,
+    "claude": _chat_message,
+    "llama": _chat_message,
+    "gemini": _gemini_content,
+}
+
+
+class Conversation:
+    """
+    A multi-turn chat history that renders each family's wire format incrementally.
+
+    Turns are kept once in provider-neutral form. The rendered message list of
+    each family is cached, and only turns added since the last render are
+    converted, so a long chat costs O(new turns) per request rather than a
+    rebuild of the whole history. With ``max_context_tokens`` set, the oldest
+    turns are dropped once the estimated prompt size exceeds the budget.
+
+    The list returned by ``messages`` is the cache itself and is updated in
+    place as the conversation grows; copy it if you need a snapshot.
+
+    Example:
+        chat = Conversation("gpt-4-o-mini", system_message="Be brief.", max_context_tokens=4000)
+        chat.send("What is the capital of France?")
+        chat.send("And of Italy?")
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        system_message: Optional[str] = None,
+        max_context_tokens: Optional[int] = None,
+        token_counter: Optional[Callable[[str], int]] = None,
+    ) -> None:
+        """
+        Args:
+            model_name (str): Deployment that ``send`` talks to.
+            system_message (Optional[str]): Optional system message to set context.
+            max_context_tokens (Optional[int]): Prompt token budget; older turns are trimmed beyond it.
+            token_counter (Optional[Callable[[str], int]]): Counts the tokens of a text
+                (default: ``tokens.count_tokens`` for the model).
+
+        Raises:
+            ValueError: If the model is not in the model registry.
+        """
+        spec = get_model(model_name)
+        if spec is None or spec.family not in TURN_RENDERERS:
+            raise ValueError(f"Model {model_name} not found in model registry")
+        self.spec: ModelSpec = spec
+        self.model_name = model_name
+        self.max_context_tokens = max_context_tokens
+        self.token_counter = token_counter or (lambda text: count_tokens(text, model_name))
+        self.turns: List[Turn] = []
+        self.tokens = 0
+        self.last_response: Optional[Dict[str, Any]] = None
+        self._rendered: Dict[str, List[Dict[str, Any]]] = {}
+        self._system: Optional[str] = None
+        self._system_tokens = 0
+        self.system_message = system_message
+
+    @property
+    def system_message(self) -> Optional[str]:
+        return self._system
+
+    @system_message.setter
+    def system_message(self, value: Optional[str]) -> None:
+        self._system = value
+        self._system_tokens = self.token_counter(value) + MESSAGE_OVERHEAD if value else 0
+        # Only the families with an inline system message need re-rendering
+        for family in _INLINE_SYSTEM:
+            self._rendered.pop(family, None)
+        self.trim()
+
+    def __len__(self) -> int:
+        return len(self.turns)
+
+    @property
+    def prompt_tokens(self) -> int:
+        """Estimated tokens of the system message and all turns."""
+        return self._system_tokens + self.tokens
+
+    def append(self, role: str, content: str, image_url: Optional[str] = None) -> Turn:
+        """
+        Add a turn to the end of the conversation.
+
+        Args:
+            role (str): "user" or "assistant".
+            content (str): Message text.
+            image_url (Optional[str]): Optional image to attach.
+
+        Returns:
+            Turn: The new turn.
+        """
+        if role not in ("user", "assistant"):
+            raise ValueError(f"Unsupported role {role!r}; use the system_message attribute for system prompts")
+        turn = Turn(role, content, image_url, self.token_counter(content) + MESSAGE_OVERHEAD)
+        self.turns.append(turn)
+        self.tokens += turn.tokens
+        self.trim()
+        return turn
+
+    def add_user(self, content: str, image_url: Optional[str] = None) -> Turn:
+        return self.append("user", content, image_url)
+
+    def add_assistant(self, content: str) -> Turn:
+        return self.append("assistant", content)
+
+    def trim(self, max_tokens: Optional[int] = None) -> int:
+        """
+        Drop the oldest turns until the prompt fits ``max_tokens``.
+
+        The newest turn is always kept, and the history is cut so that it
+        starts with a user turn, as Claude and Gemini require.
+
+        Args:
+            max_tokens (Optional[int]): Token budget (default: ``max_context_tokens``).
+
+        Returns:
+            int: Number of turns dropped.
+        """
+        budget = self.max_context_tokens if max_tokens is None else max_tokens
+        if budget is None:
+            return 0
+        turns = self.turns
+        excess = self._system_tokens + self.tokens - budget
+        drop = 0
+        while drop < len(turns) - 1 and (excess > 0 or turns[drop].role != "user"):
+            excess -= turns[drop].tokens
+            self.tokens -= turns[drop].tokens
+            drop += 1
+        if drop:
+            del turns[:drop]
+            for family, rendered in self._rendered.items():
+                offset = self._offset(family)
+                # A cache that lags behind may not hold all dropped turns yet
+                del rendered[offset:offset + min(drop, len(rendered) - offset)]
+        return drop
+
+    def clear(self) -> None:
+        """Remove all turns, keeping the system message."""
+        self.turns.clear()
+        self.tokens = 0
+        self._rendered.clear()
+
+    def _offset(self, family: str) -> int:
+        return 1 if self._system and family in _INLINE_SYSTEM else 0
+
+    def messages(self, family: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Return the history in a family's wire format, rendering only new turns.
+
+        For the OpenAI, DeepSeek and Qwen families the system message is the
+        first entry; the others carry it separately (see ``payload``).
+
+        Args:
+            family (Optional[str]): Model family (default: the conversation model's).
+
+        Returns:
+            List[Dict[str, Any]]: The cached message list (``contents`` for Gemini).
+        """
+        family = family or self.spec.family
+        rendered = self._rendered.get(family)
+        if rendered is None:
+            rendered = self._rendered[family] = []
+            if self._offset(family):
+                rendered.append({"role": "system", "content": self._system})
+        done = len(rendered) - self._offset(family)
+        if done < len(self.turns):
+            render = TURN_RENDERERS[family]
+            rendered.extend(render(turn) for turn in self.turns[done:])
+        return rendered
+
+    def payload(self, temperature: float = 0.0, max_tokens: int = 100, stream: bool = False) -> Dict[str, Any]:
+        """
+        Build the JSON payload of a request for the conversation model.
+
+        Args:
+            temperature (float): Sampling temperature.
+            max_tokens (int): Maximum tokens in the response.
+            stream (bool): Whether to stream the response.
+
+        Returns:
+            Dict[str, Any]: Request payload in the model family's format.
+        """
+        family = self.spec.family
+        messages = self.messages(family)
+        if family == "gemini":
+            payload: Dict[str, Any] = {
+                "contents": messages,
+                "generationConfig": {"maxOutputTokens": max_tokens, "temperature": temperature},
+                "stream": stream,
+            }
+            if self._system:
+                payload["systemInstruction"] = {"parts": [{"text": self._system}]}
+            return payload
+        payload = {"messages": messages, "temperature": temperature, "max_tokens": max_tokens}
+        if stream:
+            payload["stream"] = True
+        if family == "qwen":
+            payload["model"] = self.model_name
+        elif family in ("claude", "llama") and self._system:
+            payload["system"] = self._system
+        return payload
+
+    def build_request(
+        self, temperature: float = 0.0, max_tokens: int = 100, stream: bool = False
+    ) -> Tuple[str, Dict[str, str], Dict[str, Any]]:
+        """
+        Build the URL, headers and payload of a request for the conversation model.
+
+        Args:
+            Same as ``payload``.
+
+        Returns:
+            Tuple[str, Dict[str, str], Dict[str, Any]]: The request URL, headers and payload.
+        """
+        config = get_config()
+        return self.spec.url(config.base_url), self.spec.headers(config.api_key), self.payload(temperature, max_tokens, stream)
+
+    def send(
+        self,
+        message: str,
+        image_url: Optional[str] = None,
+        temperature: float = 0.0,
+        max_tokens: int = 100,
+        stream: bool = False,
+        timeout: Optional[float] = 30,
+    ) -> Any:
+        """
+        Add a user turn, send the conversation and record the reply as an assistant turn.
+
+        If the request fails, the user turn is removed again and the error is
+        raised, so the history stays consistent. A reply without text (e.g.
+        filtered content) also removes the user turn, so that user and
+        assistant turns keep alternating, as Claude requires; None is returned.
+
+        Args:
+            message (str): User message content.
+            image_url (Optional[str]): Optional image to attach.
+            temperature (float): Sampling temperature.
+            max_tokens (int): Maximum tokens in the response.
+            stream (bool): Return an iterator of text deltas; the reply is recorded once it is exhausted,
+                and the user turn is removed if the stream fails, is closed early or yields no text.
+            timeout (Optional[float]): Request timeout in seconds.
+
+        Returns:
+            Union[Optional[str], Iterator[str]]: The reply text, or an iterator of text deltas if streaming.
+
+        Raises:
+            requests.exceptions.RequestException: If the request fails.
+        """
+        from .transport import get_transport
+
+        self.append("user", message, image_url)
+        try:
+            url, headers, payload = self.build_request(temperature, max_tokens, stream)
+            response = get_transport().post(
+                url, deployment=self.model_name, json=payload, headers=headers, timeout=timeout, stream=stream
+            )
+            response.raise_for_status()
+        except Exception:
+            self._pop_user()
+            raise
+        if stream:
+            return self._record_stream(iter_deltas(response, self.spec.family))
+        self.last_response = response_json(response)
+        text = response_text(self.last_response, self.spec.family)
+        if text:
+            self.append("assistant", text)
+        else:
+            self._pop_user()
+        return text
+
+    def _record_stream(self, deltas: Iterator[str]) -> Iterator[str]:
+        parts: List[str] = []
+        complete = False
+        try:
+            for delta in deltas:
+                parts.append(delta)
+                yield delta
+            complete = True
+        finally:
+            if complete and any(parts):
+                self.append("assistant", "".join(parts))
+            else:
+                self._pop_user()
+
+    def _pop_user(self) -> None:
+        if not self.turns or self.turns[-1].role != "user":
+            return
+        turn = self.turns.pop()
+        self.tokens -= turn.tokens
+        for family, rendered in self._rendered.items():
+            if len(rendered) - self._offset(family) > len(self.turns):
+                rendered.pop()
@@ -1,29 +1,35 @@
-import requests
-import os
-from dotenv import load_dotenv
-from typing import Optional, Dict, List, Union, Any
+import logging
+from typing import Optional, Dict, List, Union, Any, Tuple, Iterator
 
-# Load environment variables
-load_dotenv()
+from .codec import response_json
+from .config import get_config
+from .registry import REGISTRY, ModelSpec, get_model
+from .responses import Response
+from .streaming import iter_deltas
 
-# Validate environment variables
-def validate_env_vars() -> None:
-    required_vars = ["HKBU_API_KEY", "HKBU_BASIC_URL"]
-    missing_vars = [var for var in required_vars if not os.getenv(var)]
-    if missing_vars:
-        raise ValueError(f"Missing environment variables: {', '.join(missing_vars)}")
+logger = logging.getLogger(__name__)
 
-validate_env_vars()
+# Model configurations from the model registry
+DEEPSEEK_MODELS: List[Dict[str, str]] = REGISTRY.model_list("deepseek")
 
-# Constants
-API_KEY: str = os.getenv("HKBU_API_KEY")  # type: ignore
-BASE_URL: str = os.getenv("HKBU_BASIC_URL")  # type: ignore
+def get_model_spec(model_name: str) -> ModelSpec:
+    """
+    Retrieve a DeepSeek deployment from the model registry.
+    
+    Args:
+        model_name (str): Name of the model to retrieve.
+        
+    Returns:
+        ModelSpec: Model configuration.
+        
+    Raises:
+        ValueError: If the model is not found.
+    """
+    spec = get_model(model_name, "deepseek")
+    if spec is None:
+        raise ValueError(f"Model '{model_name}' not found in DEEPSEEK_MODELS list")
+    return spec
 
-# Model configurations
-DEEPSEEK_MODELS: List[Dict[str, str]] = [
-    {"model": "deepseek-r1", "api-version": "2024-05-01-preview"},
-    {"model": "deepseek-v3", "api-version": "2024-05-01-preview"},
-]
 
 def get_model_info(model_name: str) -> Dict[str, str]:
     """
@@ -38,10 +44,7 @@ def get_model_info(model_name: str) -> Dict[str, str]:
     Raises:
         ValueError: If the model is not found.
     """
-    model_info = next((model for model in DEEPSEEK_MODELS if model["model"] == model_name), None)
-    if not model_info:
-        raise ValueError(f"Model '{model_name}' not found in DEEPSEEK_MODELS list")
-    return model_info
+    return get_model_spec(model_name).info()
 
 
 def build_conversation(message: str, system_message: Optional[str] = None) -> List[Dict[str, str]]:
@@ -62,6 +65,68 @@ def build_conversation(message: str, system_message: Optional[str] = None) -> Li
     return conversation
 
 
+def build_request(
+    message: str,
+    model_name: str = "deepseek-r1",
+    temperature: float = 0.0,
+    max_tokens: int = 255,
+    stream: bool = False,
+    frequency_penalty: float = 0.0,
+    presence_penalty: float = 0.0,
+    top_p: float = 1.0,
+    response_format: Optional[Dict[str, str]] = None,
+    stop: Optional[List[str]] = None,
+    seed: Optional[int] = None,
+    tools: Optional[List[Dict[str, Any]]] = None,
+    system_message: Optional[str] = None,
+) -> Tuple[str, Dict[str, str], Dict[str, Any]]:
+    """
+    Build the URL, headers and payload for an Azure DeepSeek request.
+    
+    Args:
+        Same as ``DeepSeek``.
+        
+    Returns:
+        Tuple[str, Dict[str, str], Dict[str, Any]]: Request URL, headers and payload.
+        
+    Raises:
+        ValueError: If the model is not found.
+    """
+    # Get model info
+    spec = get_model_spec(model_name)
+
+    # Build conversation
+    conversation = build_conversation(message, system_message)
+
+    # Construct URL and headers
+    config = get_config()
+    url = spec.url(config.base_url)
+    headers = spec.headers(config.api_key)
+
+    # Prepare payload
+    payload: Dict[str, Any] = {
+        "messages": conversation,
+        "temperature": temperature,
+        "max_tokens": max_tokens,
+        "stream": stream,
+        "frequency_penalty": frequency_penalty,
+        "presence_penalty": presence_penalty,
+        "top_p": top_p,
+    }
+
+    # Add optional parameters if provided
+    if response_format:
+        payload["response_format"] = response_format
+    if stop:
+        payload["stop"] = stop
+    if seed is not None:
+        payload["seed"] = seed
+    if tools:
+        payload["tools"] = tools
+
+    return url, headers, payload
+
+
 def DeepSeek(
     message: str,
     model_name: str = "deepseek-r1",
@@ -76,7 +141,9 @@ def DeepSeek(
     seed: Optional[int] = None,
     tools: Optional[List[Dict[str, Any]]] = None,
     system_message: Optional[str] = None,
-) -> Union[Dict[str, Any], str]:
+    hedge: bool = False,
+    as_response: bool = False,
+) -> Union[Dict[str, Any], Response, str, Iterator[str]]:
     """
     Send a request to Azure DeepSeek service.
     
@@ -94,57 +161,43 @@ def DeepSeek(
         seed (Optional[int]): Random seed for reproducibility.
         tools (Optional[List[Dict[str, Any]]]): Optional list of tools.
         system_message (Optional[str]): Optional system message to set context.
+        hedge (bool): Send a backup request if this one is slow.
+        as_response (bool): Return a normalized ``responses.Response`` instead of the raw dict.
         
     Returns:
-        Union[Dict[str, Any], str]: Response data from the API or error message.
+        Union[Dict[str, Any], Response, str, Iterator[str]]: Response data from the API, an iterator
+        of text deltas if ``stream`` is set, or error message.
     """
+    import requests
+    from .exceptions import HKBUClientError
+    from .transport import get_transport
+
     try:
-        # Get model info
-        model_info = get_model_info(model_name)
-        api_version = model_info["api-version"]
-
-        # Build conversation
-        conversation = build_conversation(message, system_message)
-
-        # Construct URL and headers
-        url = f"{BASE_URL}/deployments/{model_name}/chat/completions/?api-version={api_version}"
-        headers = {"Content-Type": "application/json", "api-key": API_KEY}
-
-        # Prepare payload
-        payload: Dict[str, Any] = {
-            "messages": conversation,
-            "temperature": temperature,
-            "max_tokens": max_tokens,
-            "stream": stream,
-            "frequency_penalty": frequency_penalty,
-            "presence_penalty": presence_penalty,
-            "top_p": top_p,
-        }
-
-        # Add optional parameters if provided
-        if response_format:
-            payload["response_format"] = response_format
-        if stop:
-            payload["stop"] = stop
-        if seed is not None:
-            payload["seed"] = seed
-        if tools:
-            payload["tools"] = tools
+        # Build request
+        url, headers, payload = build_request(
+            message, model_name, temperature, max_tokens, stream,
+            frequency_penalty, presence_penalty, top_p, response_format,
+            stop, seed, tools, system_message,
+        )
 
         # Make API request
-        print(f"Sending request to {url} with payload: {payload}")
-        response = requests.post(url, json=payload, headers=headers, timeout=30)
+        logger.debug("Sending request to %s", model_name)
+        response = get_transport().post(url, deployment=model_name, json=payload, headers=headers, timeout=30, stream=stream, hedge=hedge)
         response.raise_for_status()
 
-        # Return parsed JSON response
-        return response.json()
+        # Return a delta iterator when streaming, otherwise the parsed JSON response
+        if stream:
+            return iter_deltas(response, "deepseek")
+        return Response.from_http(response, "deepseek") if as_response else response_json(response)
 
     except requests.exceptions.RequestException as e:
-        print(f"Request failed: {e}")
+        logger.warning("DeepSeek request to %s failed: %s", model_name, e)
         return f"Error: {str(e)}"
+    except HKBUClientError:
+        raise
     except ValueError as ve:
-        print(f"ValueError: {ve}")
+        logger.warning("DeepSeek request to %s failed: %s", model_name, ve)
         return f"Error: {ve}"
     except Exception as ex:
-        print(f"Unexpected error: {ex}")
+        logger.exception("Unexpected error in DeepSeek request to %s", model_name)
         return f"Unexpected error: {ex}"
\ No newline at end of file
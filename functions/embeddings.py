@@ -0,0 +1,214 @@
+import base64
+import contextvars
+from concurrent.futures import ThreadPoolExecutor, Future, wait, ALL_COMPLETED, FIRST_COMPLETED
+from typing import Optional, Dict, List, Any, Iterable, Iterator, Set, BinaryIO, TYPE_CHECKING
+
+from .codec import response_json
+from .openai import build_embeddings_request
+from .tokens import heuristic_tokens
+
+if TYPE_CHECKING:
+    import numpy
+
+# Azure OpenAI accepts at most 2048 inputs per embeddings request. The token
+# budget stays well under the per-request limit because token counts are
+# estimated from character length, which undercounts non-English text.
+MAX_BATCH_SIZE: int = 2048
+DEFAULT_BATCH_TOKENS: int = 100_000
+
+
+def _import_numpy() -> Any:
+    try:
+        import numpy
+    except ImportError as e:
+        raise ImportError("Embeddings requires numpy: pip install numpy") from e
+    return numpy
+
+
+def iter_batches(
+    texts: Iterable[str],
+    batch_size: int = MAX_BATCH_SIZE,
+    max_batch_tokens: int = DEFAULT_BATCH_TOKENS,
+) -> Iterator[List[str]]:
+    """
+    Pack texts into request-sized batches, preserving order.
+
+    A batch is closed when adding the next text would exceed ``batch_size``
+    inputs or ``max_batch_tokens`` estimated tokens. A text larger than the
+    token budget on its own is sent as a batch of one.
+
+    Args:
+        texts (Iterable[str]): Input texts; consumed lazily.
+        batch_size (int): Maximum number of inputs per request.
+        max_batch_tokens (int): Maximum estimated tokens per request.
+
+    Yields:
+        List[str]: Each batch.
+    """
+    batch: List[str] = []
+    tokens = 0
+    for text in texts:
+        cost = heuristic_tokens(text)
+        if batch and (len(batch) >= batch_size or tokens + cost > max_batch_tokens):
+            yield batch
+            batch, tokens = [], 0
+        batch.append(text)
+        tokens += cost
+    if batch:
+        yield batch
+
+
+def decode_embeddings(data: Dict[str, Any]) -> "numpy.ndarray":
+    """
+    Convert an embeddings response into a float32 matrix, one row per input.
+
+    Accepts both ``float`` and ``base64`` encoded embeddings.
+
+    Args:
+        data (Dict[str, Any]): Parsed JSON response.
+
+    Returns:
+        numpy.ndarray: ``(len(data["data"]), dim)`` float32 array.
+    """
+    np = _import_numpy()
+    items = sorted(data["data"], key=lambda item: item["index"])
+    if items and isinstance(items[0]["embedding"], str):
+        return np.stack([np.frombuffer(base64.b64decode(item["embedding"]), dtype=np.float32) for item in items])
+    return np.asarray([item["embedding"] for item in items], dtype=np.float32)
+
+
+class _MatrixWriter:
+    """
+    Collects batch results into one contiguous float32 matrix.
+
+    Rows are written at their input offset as batches complete, in any order:
+    into a preallocated array when the number of texts is known, else into a
+    list of blocks joined at the end, or straight into a raw file when
+    ``out_path`` is set, which is then memory-mapped.
+    """
+
+    def __init__(self, total: Optional[int], out_path: Optional[str]) -> None:
+        self.np = _import_numpy()
+        self.total = total
+        self.out_path = out_path
+        self.dim: Optional[int] = None
+        self.rows = 0
+        self.matrix: Optional["numpy.ndarray"] = None
+        self.blocks: Dict[int, "numpy.ndarray"] = {}
+        self.file: Optional[BinaryIO] = open(out_path, "wb") if out_path else None
+
+    def write(self, start: int, block: "numpy.ndarray") -> None:
+        if self.dim is None:
+            self.dim = block.shape[1]
+        elif block.shape[1] != self.dim:
+            raise ValueError(f"Embedding dimension changed from {self.dim} to {block.shape[1]}")
+        self.rows = max(self.rows, start + block.shape[0])
+        if self.file is not None:
+            self.file.seek(start * self.dim * block.itemsize)
+            self.file.write(block.tobytes())
+        elif self.total is not None:
+            if self.matrix is None:
+                self.matrix = self.np.empty((self.total, self.dim), dtype=self.np.float32)
+            self.matrix[start:start + block.shape[0]] = block
+        else:
+            self.blocks[start] = block
+
+    def result(self) -> "numpy.ndarray":
+        np = self.np
+        dim = self.dim or 0
+        if self.file is not None:
+            self.file.close()
+            if self.rows == 0:
+                return np.empty((0, dim), dtype=np.float32)
+            return np.memmap(self.out_path, dtype=np.float32, mode="r+", shape=(self.rows, dim))
+        if self.matrix is not None:
+            return self.matrix
+        if not self.blocks:
+            return np.empty((0, dim), dtype=np.float32)
+        return np.concatenate([self.blocks[start] for start in sorted(self.blocks)])
+
+    def close(self) -> None:
+        if self.file is not None and not self.file.closed:
+            self.file.close()
+
+
+def _embed_batch(texts: List[str], model_name: str, dimensions: Optional[int], encoding_format: str) -> "numpy.ndarray":
+    from .transport import get_transport
+
+    url, headers, payload = build_embeddings_request(texts, model_name, dimensions, encoding_format)
+    response = get_transport().post(url, deployment=model_name, json=payload, headers=headers, timeout=60)
+    response.raise_for_status()
+    block = decode_embeddings(response_json(response))
+    if block.shape[0] != len(texts):
+        raise ValueError(f"Expected {len(texts)} embeddings, got {block.shape[0]}")
+    return block
+
+
+def Embeddings(
+    texts: Iterable[str],
+    model_name: str = "text-embedding-3-small",
+    dimensions: Optional[int] = None,
+    batch_size: int = MAX_BATCH_SIZE,
+    max_batch_tokens: int = DEFAULT_BATCH_TOKENS,
+    max_workers: int = 8,
+    out_path: Optional[str] = None,
+    encoding_format: str = "float",
+) -> "numpy.ndarray":
+    """
+    Embed any number of texts with a text-embedding-3 deployment.
+
+    Texts are packed into size- and token-bounded batches which are sent
+    concurrently through the shared transport (and its rate limits and
+    retries). Only ``2 * max_workers`` batches are in flight at a time, so
+    ``texts`` may be a generator over millions of documents.
+
+    Args:
+        texts (Iterable[str]): Input texts.
+        model_name (str): Embeddings deployment to use.
+        dimensions (Optional[int]): Optional output dimensionality.
+        batch_size (int): Maximum number of inputs per request.
+        max_batch_tokens (int): Maximum estimated tokens per request.
+        max_workers (int): Number of requests sent in parallel.
+        out_path (Optional[str]): If set, rows are written to this raw float32 file and
+            a ``numpy.memmap`` over it is returned.
+        encoding_format (str): ``"float"``, or ``"base64"`` for smaller responses if the
+            deployment supports it.
+
+    Returns:
+        numpy.ndarray: ``(len(texts), dim)`` float32 matrix in input order.
+
+    Raises:
+        ValueError: If the model is not an embeddings deployment.
+        requests.exceptions.RequestException: If a batch fails.
+    """
+    total = len(texts) if hasattr(texts, "__len__") else None  # type: ignore[arg-type]
+    writer = _MatrixWriter(total, out_path)
+    window = 2 * max_workers
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            pending: Set[Future] = set()
+            starts: Dict[Future, int] = {}
+            offset = 0
+
+            def drain(return_when: str) -> None:
+                nonlocal pending
+                finished, pending = wait(pending, return_when=return_when)
+                for future in finished:
+                    writer.write(starts.pop(future), future.result())
+
+            try:
+                for batch in iter_batches(texts, batch_size, max_batch_tokens):
+                    future = pool.submit(contextvars.copy_context().run, _embed_batch, batch, model_name, dimensions, encoding_format)
+                    pending.add(future)
+                    starts[future] = offset
+                    offset += len(batch)
+                    if len(pending) >= window:
+                        drain(FIRST_COMPLETED)
+                drain(ALL_COMPLETED)
+            except BaseException:
+                for future in pending:
+                    future.cancel()
+                raise
+        return writer.result()
+    finally:
+        writer.close()
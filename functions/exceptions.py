@@ -0,0 +1,108 @@
+import requests
+from typing import Optional, Dict, List, Any
+
+# Typed errors raised by the transports once the retry policy gives up. They
+# derive from requests' RequestException so existing ``except
+# requests.exceptions.RequestException`` handlers in the wrappers keep working.
+
+
+class HKBUAPIError(requests.exceptions.RequestException):
+    """Base class for errors raised by the HKBU GenAI transports."""
+
+
+class APIStatusError(HKBUAPIError):
+    """The gateway answered with a retryable error status."""
+
+    @property
+    def status_code(self) -> Optional[int]:
+        return getattr(self.response, "status_code", None)
+
+
+class RateLimitError(APIStatusError):
+    """The deployment kept answering 429 Too Many Requests."""
+
+
+class ServerError(APIStatusError):
+    """The gateway kept answering with a 5xx status."""
+
+
+class APITimeoutError(HKBUAPIError):
+    """The request kept timing out."""
+
+
+class APIConnectionError(HKBUAPIError):
+    """The gateway could not be reached."""
+
+
+class DeadlineExceededError(HKBUAPIError):
+    """Retrying would exceed the policy's overall deadline."""
+
+
+class HKBUClientError(Exception):
+    """
+    Base class for errors in the request itself, raised before anything is sent.
+
+    Not a ``RequestException``: the deployment is healthy and retrying or
+    failing over would not help, so the wrappers and the router let these
+    propagate instead of reporting a request failure.
+    """
+
+
+class ContextWindowExceededError(HKBUClientError):
+    """The prompt does not fit the model's context window; raised before sending."""
+
+    def __init__(self, message: str, prompt_tokens: int = 0, context_window: int = 0) -> None:
+        super().__init__(message)
+        self.prompt_tokens = prompt_tokens
+        self.context_window = context_window
+
+
+class BudgetExceededError(HKBUClientError):
+    """A usage budget is used up; raised before sending."""
+
+    def __init__(self, message: str, budget: Any = None) -> None:
+        super().__init__(message)
+        self.budget = budget
+
+
+class AllDeploymentsFailedError(HKBUAPIError):
+    """Every deployment in a router pool failed."""
+
+    def __init__(self, message: str, errors: Optional[Dict[str, BaseException]] = None) -> None:
+        super().__init__(message)
+        self.errors: Dict[str, BaseException] = errors or {}
+
+
+class StructuredOutputError(ValueError):
+    """
+    A model's structured output is not valid JSON or does not match its schema.
+
+    Raised after a successful request, so it is a ``ValueError`` rather than
+    an ``HKBUAPIError``.
+    """
+
+    def __init__(self, message: str, value: Any = None, errors: Optional[List[str]] = None) -> None:
+        super().__init__(message)
+        self.value = value
+        self.errors: List[str] = errors or []
+
+
+def error_for(kind: str, response: Any = None, cause: Optional[BaseException] = None) -> HKBUAPIError:
+    """
+    Build the typed error for a failure class reported by the retry policy.
+
+    Args:
+        kind (str): One of ``"rate_limit"``, ``"server_error"``, ``"timeout"`` or ``"connection"``.
+        response (Any): The last HTTP response, if any.
+        cause (Optional[BaseException]): The last underlying exception, if any.
+
+    Returns:
+        HKBUAPIError: The error to raise.
+    """
+    if kind == "rate_limit":
+        return RateLimitError(f"429 Too Many Requests: {response.text}", response=response)
+    if kind == "server_error":
+        return ServerError(f"{response.status_code} Server Error: {response.text}", response=response)
+    if kind == "timeout":
+        return APITimeoutError(f"Request timed out: {cause}")
+    return APIConnectionError(f"Connection failed: {cause}")
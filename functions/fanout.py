@@ -0,0 +1,300 @@
+import asyncio
+import contextvars
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, Future, wait, FIRST_COMPLETED
+from typing import Optional, Dict, List, Any, AsyncIterator, Callable, Hashable, Iterator, NamedTuple, Sequence
+
+from .builders import REQUEST_BUILDERS
+from .codec import response_json
+from .exceptions import APITimeoutError
+from .registry import get_model
+from .responses import response_text
+
+# Worker threads shared by all sync fan-outs; each model call occupies one
+MAX_WORKERS: int = 32
+
+
+class FanoutResult(NamedTuple):
+    """Answer of one deployment in a fan-out."""
+    model: str
+    text: Optional[str]
+    data: Optional[Dict[str, Any]]
+    latency: float
+    error: Optional[BaseException] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def normalize_answer(text: str) -> str:
+    """Default agreement key: the text lower-cased with whitespace collapsed."""
+    return " ".join(text.split()).lower()
+
+
+class _Tally:
+    """Decides when a fan-out may stop early."""
+
+    def __init__(self, first: Optional[int], quorum: Optional[int], key: Callable[[str], Hashable]) -> None:
+        self.first = first
+        self.quorum = quorum
+        self.key = key
+        self.successes = 0
+        self.votes: Counter = Counter()
+
+    def done(self, result: FanoutResult) -> bool:
+        if not result.ok:
+            return False
+        self.successes += 1
+        if self.first is not None and self.successes >= self.first:
+            return True
+        if self.quorum is not None and result.text is not None:
+            vote = self.key(result.text)
+            self.votes[vote] += 1
+            return self.votes[vote] >= self.quorum
+        return False
+
+
+def _families(models: Sequence[str]) -> Dict[str, str]:
+    families = {}
+    for model in models:
+        spec = get_model(model)
+        if spec is None or spec.family not in REQUEST_BUILDERS:
+            raise ValueError(f"Model {model} not found in model registry")
+        families[model] = spec.family
+    return families
+
+
+def _limits(models: Sequence[str], timeout: Optional[float], timeouts: Optional[Dict[str, float]]) -> Dict[str, Optional[float]]:
+    overrides = timeouts or {}
+    return {model: overrides.get(model, timeout) for model in models}
+
+
+def _timed_out(model: str, limit: Optional[float], latency: float) -> FanoutResult:
+    return FanoutResult(model, None, None, latency, APITimeoutError(f"{model} did not answer within {limit}s"))
+
+
+def _call(
+    model: str, family: str, message: str, system_message: Optional[str], temperature: float, max_tokens: int,
+    timeout: Optional[float],
+) -> FanoutResult:
+    import requests
+    from .transport import get_transport
+
+    start = time.monotonic()
+    try:
+        url, headers, payload = REQUEST_BUILDERS[family](message, model, system_message, temperature, max_tokens)
+        response = get_transport().post(url, deployment=model, json=payload, headers=headers, timeout=timeout)
+        response.raise_for_status()
+        data = response_json(response)
+    except (requests.exceptions.RequestException, ValueError) as e:
+        return FanoutResult(model, None, None, time.monotonic() - start, e)
+    return FanoutResult(model, response_text(data, family), data, time.monotonic() - start)
+
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="fanout")
+    return _executor
+
+
+def fan_out(
+    message: str,
+    models: Sequence[str],
+    system_message: Optional[str] = None,
+    temperature: float = 0,
+    max_tokens: int = 100,
+    first: Optional[int] = None,
+    quorum: Optional[int] = None,
+    key: Callable[[str], Hashable] = normalize_answer,
+    timeout: Optional[float] = 30.0,
+    timeouts: Optional[Dict[str, float]] = None,
+) -> Iterator[FanoutResult]:
+    """
+    Send one prompt to several deployments concurrently and yield their answers as they complete.
+
+    Every model's request starts at once, so the wall-clock time is that of
+    the slowest model still needed rather than the sum. A model that fails
+    yields a result with ``error`` set; one that exceeds its timeout yields
+    an ``APITimeoutError`` result and is no longer waited for. With ``first``
+    or ``quorum``, iteration stops as soon as enough answers are in, and so
+    does any consumer that breaks out of the loop: requests that have not
+    started are cancelled, and blocking ones already in flight are abandoned.
+
+    Example:
+        for result in fan_out("Is 2**31 - 1 prime? Answer yes or no.",
+                              ["gpt-4-o", "claude-3-5-sonnet", "gemini-1.5-pro"], quorum=2):
+            print(result.model, result.text)
+
+    Args:
+        message (str): User message content.
+        models (Sequence[str]): Deployments to ask, of any families in the model registry.
+        system_message (Optional[str]): Optional system message to set context.
+        temperature (float): Sampling temperature.
+        max_tokens (int): Maximum tokens in each response.
+        first (Optional[int]): Stop after this many successful answers.
+        quorum (Optional[int]): Stop once this many answers agree; the last result yielded has the agreed answer.
+        key (Callable[[str], Hashable]): Maps an answer to the value compared for agreement.
+        timeout (Optional[float]): Seconds to wait for each model; None waits indefinitely.
+        timeouts (Optional[Dict[str, float]]): Per-model overrides of ``timeout``.
+
+    Yields:
+        FanoutResult: Each model's answer, in completion order.
+
+    Raises:
+        ValueError: If a model is not in the model registry.
+        HKBUClientError: If a model rejects the request before sending it, e.g. over a hard usage budget.
+    """
+    families = _families(models)
+    limits = _limits(models, timeout, timeouts)
+    tally = _Tally(first, quorum, key)
+    pool = _get_executor()
+    start = time.monotonic()
+    pending: Dict[Future, str] = {
+        pool.submit(contextvars.copy_context().run, _call, model, families[model], message, system_message, temperature, max_tokens, limits[model]): model
+        for model in models
+    }
+    deadlines = {model: start + limit for model, limit in limits.items() if limit is not None}
+    try:
+        while pending:
+            waiting = [deadlines[model] for model in pending.values() if model in deadlines]
+            remaining = max(0.0, min(waiting) - time.monotonic()) if waiting else None
+            done, _ = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+            for future in done:
+                del pending[future]
+                result = future.result()
+                yield result
+                if tally.done(result):
+                    return
+            now = time.monotonic()
+            for future, model in list(pending.items()):
+                if model in deadlines and deadlines[model] <= now:
+                    del pending[future]
+                    future.cancel()
+                    yield _timed_out(model, limits[model], now - start)
+    finally:
+        for future in pending:
+            future.cancel()
+
+
+async def _acall(
+    model: str, family: str, message: str, system_message: Optional[str], temperature: float, max_tokens: int,
+    timeout: Optional[float],
+) -> FanoutResult:
+    import httpx
+    from .async_transport import get_async_transport
+    from .exceptions import HKBUAPIError
+
+    start = time.monotonic()
+    try:
+        url, headers, payload = REQUEST_BUILDERS[family](message, model, system_message, temperature, max_tokens)
+        response = await get_async_transport().post(url, deployment=model, json=payload, headers=headers, timeout=timeout)
+        response.raise_for_status()
+        data = response_json(response)
+    except (httpx.HTTPError, HKBUAPIError, ValueError) as e:
+        return FanoutResult(model, None, None, time.monotonic() - start, e)
+    return FanoutResult(model, response_text(data, family), data, time.monotonic() - start)
+
+
+async def afan_out(
+    message: str,
+    models: Sequence[str],
+    system_message: Optional[str] = None,
+    temperature: float = 0,
+    max_tokens: int = 100,
+    first: Optional[int] = None,
+    quorum: Optional[int] = None,
+    key: Callable[[str], Hashable] = normalize_answer,
+    timeout: Optional[float] = 30.0,
+    timeouts: Optional[Dict[str, float]] = None,
+) -> AsyncIterator[FanoutResult]:
+    """
+    Async version of ``fan_out``; requests still in flight when it stops are cancelled.
+
+    Args:
+        Same as ``fan_out``.
+
+    Yields:
+        FanoutResult: Each model's answer, in completion order.
+    """
+    families = _families(models)
+    limits = _limits(models, timeout, timeouts)
+    tally = _Tally(first, quorum, key)
+    start = time.monotonic()
+    pending: Dict[asyncio.Future, str] = {
+        asyncio.ensure_future(
+            _acall(model, families[model], message, system_message, temperature, max_tokens, limits[model])
+        ): model
+        for model in models
+    }
+    deadlines = {model: start + limit for model, limit in limits.items() if limit is not None}
+    expired: List[asyncio.Future] = []
+    try:
+        while pending:
+            waiting = [deadlines[model] for model in pending.values() if model in deadlines]
+            remaining = max(0.0, min(waiting) - time.monotonic()) if waiting else None
+            done, _ = await asyncio.wait(pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                del pending[task]
+                result = task.result()
+                yield result
+                if tally.done(result):
+                    return
+            now = time.monotonic()
+            for task, model in list(pending.items()):
+                if model in deadlines and deadlines[model] <= now:
+                    del pending[task]
+                    task.cancel()
+                    expired.append(task)
+                    yield _timed_out(model, limits[model], now - start)
+    finally:
+        for task in pending:
+            task.cancel()
+        # Wait for cancellations to finish so no request outlives the fan-out
+        expired.extend(pending)
+        if expired:
+            await asyncio.gather(*expired, return_exceptions=True)
+
+
+def compare(message: str, models: Sequence[str], **kwargs: Any) -> Dict[str, FanoutResult]:
+    """
+    Ask every model and return all answers.
+
+    Args:
+        message (str): User message content.
+        models (Sequence[str]): Deployments to ask.
+        **kwargs: Passed to ``fan_out``.
+
+    Returns:
+        Dict[str, FanoutResult]: Each model's result, in the order of ``models``.
+    """
+    results = {result.model: result for result in fan_out(message, models, **kwargs)}
+    return {model: results[model] for model in models if model in results}
+
+
+def consensus(results: Sequence[FanoutResult], key: Callable[[str], Hashable] = normalize_answer) -> Optional[str]:
+    """
+    Return the most common answer among successful results.
+
+    Args:
+        results (Sequence[FanoutResult]): Results of a fan-out.
+        key (Callable[[str], Hashable]): Maps an answer to the value compared for agreement.
+
+    Returns:
+        Optional[str]: The text of the first result with the most common key, or None if none succeeded.
+    """
+    answers: List[FanoutResult] = [result for result in results if result.ok and result.text is not None]
+    if not answers:
+        return None
+    votes = Counter(key(result.text) for result in answers)
+    winner = votes.most_common(1)[0][0]
+    return next(result.text for result in answers if key(result.text) == winner)
@@ -1,47 +1,33 @@
-import requests
-import os
-from dotenv import load_dotenv
-import json
+import logging
 
-load_dotenv()
-apiKey = os.getenv("HKBU_API_KEY")
-basicUrl = os.getenv("HKBU_BASIC_URL")
-if apiKey is None:
-    raise ValueError("HKBU_API_KEY not found in environment variables")
+from .codec import response_json
+from .config import get_config
+from .registry import REGISTRY, get_model
+from .responses import Response
+from .streaming import iter_deltas
 
-gemini_models = [
-    {
-        "model": "gemini-1.5-pro",
-        "api-version": "002"
-    },
-    {
-        "model": "gemini-1.5-flash",
-        "api-version": "002"
-    }
-]
+logger = logging.getLogger(__name__)
 
-def Gemini(
+gemini_models = REGISTRY.model_list("gemini")
+
+def build_request(
     message: str,
     model_name: str = "gemini-1.5-flash",
     temperature: float = 0.5,
     maxOutputTokens: int = 10,
     response_mime_type: str = "application/json", # "text/x.enum"
-    response_schema: dict = None
+    response_schema: dict = None,
+    stream: bool = False
 ):
-    # Find the model in the gemini_models list
-    model_info = next((model for model in gemini_models if model["model"] == model_name), None)
+    # Look up the deployment in the model registry
+    spec = get_model(model_name, "gemini")
     
-    if not model_info:
+    if spec is None:
         raise ValueError(f"Model {model_name} not found in gemini_models list")
     
-    api_version = model_info['api-version']
-    
-    url = f"{basicUrl}/deployments/{model_name}/generate_content?api-version={api_version}"
-    headers = {
-        'Content-Type': 'application/json',
-        'accept': 'application/json',
-        'api-key': apiKey
-    }
+    config = get_config()
+    url = spec.url(config.base_url)
+    headers = spec.headers(config.api_key)
     
     # Define the contents with the user's message
     contents = [{"role": "user", "parts": [{"text": message}]}]
@@ -54,21 +40,43 @@ def Gemini(
             'temperature': temperature,
             "response_mime_type": response_mime_type,
         },
-        'stream': False
+        'stream': stream
     }
     
     if response_schema:
         payload['generationConfig']['response_schema'] = response_schema
     
+    return url, headers, payload
+
+def Gemini(
+    message: str,
+    model_name: str = "gemini-1.5-flash",
+    temperature: float = 0.5,
+    maxOutputTokens: int = 10,
+    response_mime_type: str = "application/json", # "text/x.enum"
+    response_schema: dict = None,
+    stream: bool = False,
+    hedge: bool = False,
+    as_response: bool = False
+):
+    from .transport import get_transport
+
+    url, headers, payload = build_request(
+        message, model_name, temperature, maxOutputTokens, response_mime_type, response_schema, stream
+    )
+    
     # Make the POST request to the API
-    response = requests.post(url, json=payload, headers=headers)
+    response = get_transport().post(url, deployment=model_name, json=payload, headers=headers, stream=stream, hedge=hedge)
     
     # Check the response status code
     if response.status_code == 200:
-        data = response.json()
+        # Yield text deltas as chunks arrive when streaming
+        if stream:
+            return iter_deltas(response, "gemini")
+        if as_response:
+            return Response.from_http(response, "gemini")
+        data = response_json(response)
         return data
     else:
-        print(f"Error: {response.status_code}")
-        print(f"Response: {response.text}")
+        logger.warning("Gemini request to %s failed with status code %s: %s", model_name, response.status_code, response.text)
         return None
-    
\ No newline at end of file
@@ -0,0 +1,348 @@
+import asyncio
+import contextvars
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, Future, wait, FIRST_COMPLETED
+from typing import Optional, Dict, Any, Callable, Awaitable, Deque, Tuple, TypeVar
+
+from .registry import get_model
+
+T = TypeVar("T")
+
+# Latency samples kept per deployment for the hedge delay percentile
+WINDOW_SIZE: int = 512
+
+
+class LatencyTracker:
+    """Sliding window of recent response times per deployment."""
+
+    def __init__(self, window: int = WINDOW_SIZE) -> None:
+        """
+        Args:
+            window (int): Number of recent samples kept per deployment.
+        """
+        self.window = window
+        self._samples: Dict[str, Deque[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, deployment: str, seconds: float) -> None:
+        """
+        Record one response time.
+
+        Args:
+            deployment (str): Deployment name.
+            seconds (float): Time from sending the request to receiving the response.
+        """
+        with self._lock:
+            samples = self._samples.get(deployment)
+            if samples is None:
+                samples = self._samples[deployment] = deque(maxlen=self.window)
+            samples.append(seconds)
+
+    def percentile(self, deployment: str, q: float, min_samples: int = 1) -> Optional[float]:
+        """
+        Return the ``q``-th percentile of a deployment's recent response times.
+
+        Args:
+            deployment (str): Deployment name.
+            q (float): Percentile in [0, 100].
+            min_samples (int): Return None until this many samples were recorded.
+
+        Returns:
+            Optional[float]: Seconds, or None if there are too few samples.
+        """
+        with self._lock:
+            samples = sorted(self._samples.get(deployment, ()))
+        if len(samples) < max(1, min_samples):
+            return None
+        return samples[min(len(samples) - 1, int(len(samples) * q / 100))]
+
+
+class HedgePolicy:
+    """
+    When to send a backup request, and how much extra load that may add.
+
+    A backup is sent once the first request has been outstanding longer than
+    the ``percentile`` of the deployment's recent response times (clamped to
+    ``min_delay``/``max_delay``). Backups are paid from a budget that grows by
+    ``budget`` per request, so at most that fraction of requests are hedged.
+    """
+
+    def __init__(
+        self,
+        percentile: float = 95.0,
+        budget: float = 0.05,
+        min_delay: float = 0.01,
+        max_delay: Optional[float] = None,
+        initial_delay: Optional[float] = None,
+        min_samples: int = 20,
+        burst: float = 10.0,
+        siblings: Optional[Dict[str, str]] = None,
+    ) -> None:
+        """
+        Args:
+            percentile (float): Latency percentile after which a backup is sent.
+            budget (float): Maximum fraction of extra requests, e.g. 0.05 for 5%.
+            min_delay (float): Lower bound of the hedge delay in seconds.
+            max_delay (Optional[float]): Upper bound of the hedge delay in seconds.
+            initial_delay (Optional[float]): Delay used before ``min_samples`` latencies were seen;
+                None disables hedging until then.
+            min_samples (int): Samples needed before the percentile is trusted.
+            burst (float): Maximum number of backups that may be sent back to back.
+            siblings (Optional[Dict[str, str]]): Deployment -> deployment of the same family to send
+                backups to; backups go to the same deployment otherwise.
+        """
+        self.percentile = percentile
+        self.budget = budget
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.initial_delay = initial_delay
+        self.min_samples = min_samples
+        self.burst = burst
+        self.siblings = dict(siblings or {})
+
+
+class Hedger:
+    """
+    Runs a request with a delayed backup and returns whichever answers first.
+
+    On the async path the slower request is cancelled, closing its
+    connection. Blocking ``requests`` calls cannot be interrupted, so on the
+    sync path the slower request is abandoned and its response closed as
+    soon as it arrives.
+    """
+
+    def __init__(self, policy: Optional[HedgePolicy] = None, max_workers: int = 32) -> None:
+        """
+        Args:
+            policy (Optional[HedgePolicy]): Hedging policy (default: ``HedgePolicy()``).
+            max_workers (int): Threads available to run sync requests and their backups.
+        """
+        self.policy = policy or HedgePolicy()
+        self.latencies = LatencyTracker()
+        self.requests = 0
+        self.hedges = 0
+        self._tokens = min(1.0, self.policy.burst)
+        self._lock = threading.Lock()
+        self._max_workers = max_workers
+        self._pool: Optional[ThreadPoolExecutor] = None
+
+    def delay(self, deployment: str) -> Optional[float]:
+        """
+        Return how long to wait for the first request before sending a backup.
+
+        Args:
+            deployment (str): Deployment name.
+
+        Returns:
+            Optional[float]: Seconds, or None if no backup should be sent.
+        """
+        policy = self.policy
+        delay = self.latencies.percentile(deployment, policy.percentile, policy.min_samples)
+        if delay is None:
+            delay = policy.initial_delay
+            if delay is None:
+                return None
+        delay = max(delay, policy.min_delay)
+        if policy.max_delay is not None:
+            delay = min(delay, policy.max_delay)
+        return delay
+
+    def _start(self) -> None:
+        with self._lock:
+            self.requests += 1
+            self._tokens = min(self.policy.burst, self._tokens + self.policy.budget)
+
+    def _allow_hedge(self) -> bool:
+        with self._lock:
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            self.hedges += 1
+            return True
+
+    def _executor(self) -> ThreadPoolExecutor:
+        if self._pool is None:
+            with self._lock:
+                if self._pool is None:
+                    self._pool = ThreadPoolExecutor(max_workers=self._max_workers, thread_name_prefix="hedge")
+        return self._pool
+
+    def run(self, deployment: str, primary: Callable[[], T], backup: Callable[[], T]) -> T:
+        """
+        Call ``primary``; if it is slower than the hedge delay, race it against ``backup``.
+
+        The delay is measured from when ``primary`` starts running, so time
+        spent queued behind other requests in the worker pool does not
+        trigger backups.
+
+        Args:
+            deployment (str): Deployment of the primary request.
+            primary (Callable[[], T]): Sends the request.
+            backup (Callable[[], T]): Sends the backup request.
+
+        Returns:
+            T: The first successful result, or the primary's if both fail.
+        """
+        self._start()
+        delay = self.delay(deployment)
+        if delay is None:
+            return primary()
+
+        started = threading.Event()
+
+        def run_primary() -> T:
+            started.set()
+            return primary()
+
+        pool = self._executor()
+        first = pool.submit(contextvars.copy_context().run, run_primary)
+        started.wait()
+        done, _ = wait({first}, timeout=delay)
+        if done or not self._allow_hedge():
+            return first.result()
+
+        second = pool.submit(contextvars.copy_context().run, backup)
+        pending = {first, second}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    loser = second if future is first else first
+                    loser.add_done_callback(_close_result)
+                    return future.result()
+        return first.result()
+
+    async def arun(
+        self,
+        deployment: str,
+        primary: Callable[[], Awaitable[T]],
+        backup: Callable[[], Awaitable[T]],
+    ) -> T:
+        """
+        Async version of ``run``; the slower request is cancelled.
+
+        Args:
+            deployment (str): Deployment of the primary request.
+            primary (Callable[[], Awaitable[T]]): Sends the request.
+            backup (Callable[[], Awaitable[T]]): Sends the backup request.
+
+        Returns:
+            T: The first successful result, or the primary's if both fail.
+        """
+        self._start()
+        delay = self.delay(deployment)
+        if delay is None:
+            return await primary()
+
+        tasks = [asyncio.ensure_future(primary())]
+        winner = None
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if done or not self._allow_hedge():
+                winner = tasks[0]
+                return await winner
+
+            tasks.append(asyncio.ensure_future(backup()))
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        winner = task
+                        return task.result()
+            winner = tasks[0]
+            return winner.result()
+        finally:
+            for task in tasks:
+                if task is winner:
+                    continue
+                if not task.done():
+                    task.cancel()
+                elif not task.cancelled() and task.exception() is None:
+                    await task.result().aclose()
+
+    def close(self) -> None:
+        """Shut down the sync worker threads."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=False)
+            self._pool = None
+
+
+def backup_target(url: str, deployment: str, siblings: Dict[str, str]) -> Tuple[str, str]:
+    """
+    Return the URL and deployment a backup request should go to.
+
+    Args:
+        url (str): URL of the primary request.
+        deployment (str): Deployment of the primary request.
+        siblings (Dict[str, str]): Deployment -> sibling deployment of the same family.
+
+    Returns:
+        Tuple[str, str]: The sibling's URL and name, or the primary's if it has no usable sibling.
+    """
+    sibling = siblings.get(deployment)
+    if sibling is None:
+        return url, deployment
+    spec, other = get_model(deployment), get_model(sibling)
+    if spec is None or other is None or spec.family != other.family or not url.endswith(spec.endpoint):
+        return url, deployment
+    return other.url(url[:-len(spec.endpoint)]), sibling
+
+
+def observe_latency(deployment: str, seconds: float) -> None:
+    """
+    Record a response time for the shared hedger's percentiles, if hedging is in use.
+
+    Args:
+        deployment (str): Deployment name.
+        seconds (float): Response time.
+    """
+    if _hedger is not None:
+        _hedger.latencies.observe(deployment, seconds)
+
+
+def _close_result(future: Future) -> None:
+    if future.cancelled() or future.exception() is not None:
+        return
+    close = getattr(future.result(), "close", None)
+    if close is not None:
+        close()
+
+
+_hedger: Optional[Hedger] = None
+_hedger_lock = threading.Lock()
+
+
+def get_hedger() -> Hedger:
+    """
+    Return the shared hedger, creating it with the default policy on first use.
+
+    Returns:
+        Hedger: The process-wide hedger.
+    """
+    global _hedger
+    if _hedger is None:
+        with _hedger_lock:
+            if _hedger is None:
+                _hedger = Hedger()
+    return _hedger
+
+
+def configure_hedging(policy: Optional[HedgePolicy] = None, **kwargs: Any) -> Hedger:
+    """
+    Replace the shared hedger used by ``hedge=True`` calls.
+
+    Args:
+        policy (Optional[HedgePolicy]): The policy; built from ``kwargs`` if None.
+        **kwargs: Passed to ``HedgePolicy``.
+
+    Returns:
+        Hedger: The new shared hedger.
+    """
+    global _hedger
+    with _hedger_lock:
+        if _hedger is not None:
+            _hedger.close()
+        _hedger = Hedger(policy or HedgePolicy(**kwargs))
+    return _hedger
@@ -0,0 +1,26 @@
+import os
+
+
+def truncate_partial_line(output_path: str) -> None:
+    """
+    Drop a trailing line left incomplete by a crash so appended results start on a fresh line.
+
+    Args:
+        output_path (str): Path of the output JSONL file.
+    """
+    if not os.path.exists(output_path):
+        return
+    with open(output_path, "rb+") as f:
+        end = f.seek(0, os.SEEK_END)
+        position = end
+        while position > 0:
+            step = min(4096, position)
+            f.seek(position - step)
+            chunk = f.read(step)
+            newline = chunk.rfind(b"\n")
+            if newline != -1:
+                position = position - step + newline + 1
+                break
+            position -= step
+        if position != end:
+            f.truncate(position)
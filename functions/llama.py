@@ -1,29 +1,15 @@
-import requests
-import os
-from dotenv import load_dotenv
-from typing import Optional, Dict, List, Union, Any
+from typing import Optional, Dict, List, Union, Any, Tuple, Iterator
 
-# Load environment variables from .env file
-load_dotenv()
+from .codec import response_json
+from .config import get_config
+from .registry import REGISTRY, get_model
+from .responses import Response
+from .streaming import iter_deltas
 
-# Retrieve API key and base URL from environment variables
-API_KEY: Optional[str] = os.getenv("HKBU_API_KEY")
-BASE_URL: Optional[str] = os.getenv("HKBU_BASIC_URL")
+# LLaMA deployments from the model registry
+LLAMA_MODELS: List[Dict[str, str]] = REGISTRY.model_list("llama")
 
-if API_KEY is None:
-    raise ValueError("HKBU_API_KEY not found in environment variables")
-if BASE_URL is None:
-    raise ValueError("HKBU_BASIC_URL not found in environment variables")
-
-# Define available models
-LLAMA_MODELS: List[Dict[str, str]] = [
-    {
-        "model": "llama3_1",
-        "api-version": "20240723"
-    }
-]
-
-def llama(
+def build_request(
     message: str,
     model_name: str = "llama3_1",
     image_url: Optional[str] = None,
@@ -34,31 +20,20 @@ def llama(
     stop_sequences: Optional[List[str]] = None,
     stream: bool = False,
     system: Optional[str] = None
-) -> Union[Dict[str, Any], str]:
+) -> Tuple[str, Dict[str, str], Dict[str, Any]]:
     """
-    Sends a request to the LLaMA model API and returns the response.
+    Builds the URL, headers and payload for a LLaMA model API request.
 
     Args:
-        message (str): The input message for the model.
-        model_name (str): The name of the model to use (default: "llama3_1").
-        image_url (Optional[str]): URL of an image to include in the request.
-        temperature (float): Sampling temperature for the model.
-        max_tokens (int): Maximum number of tokens to generate.
-        top_p (float): Top-p (nucleus) sampling parameter.
-        top_k (int): Top-k sampling parameter.
-        stop_sequences (Optional[List[str]]): List of sequences to stop generation at.
-        stream (bool): Whether to stream the response.
-        system (Optional[str]): System-level instructions for the model.
+        Same as ``llama``.
 
     Returns:
-        Union[Dict[str, Any], str]: The JSON response from the API or an error message.
+        Tuple[str, Dict[str, str], Dict[str, Any]]: The request URL, headers and payload.
     """
     # Validate the model name
-    model_info = next((model for model in LLAMA_MODELS if model["model"] == model_name), None)
-    if not model_info:
+    spec = get_model(model_name, "llama")
+    if spec is None:
         raise ValueError(f"Model {model_name} not found in LLAMA_MODELS list")
-    
-    api_version: str = model_info['api-version']
 
     # Construct the conversation payload
     conversation: List[Dict[str, Any]] = [{"role": "user", "content": message}]
@@ -69,13 +44,11 @@ def llama(
         ]
 
     # Construct the API endpoint URL
-    url: str = f"{BASE_URL}/deployments/{model_name}/llama/completion/?api-version={api_version}"
+    config = get_config()
+    url: str = spec.url(config.base_url)
 
     # Prepare headers and payload
-    headers: Dict[str, str] = {
-        'Content-Type': 'application/json',
-        'api-key': API_KEY
-    }
+    headers: Dict[str, str] = spec.headers(config.api_key)
     payload: Dict[str, Any] = {
         'messages': conversation,
         'temperature': temperature,
@@ -87,13 +60,58 @@ def llama(
         'system': system
     }
 
+    return url, headers, payload
+
+def llama(
+    message: str,
+    model_name: str = "llama3_1",
+    image_url: Optional[str] = None,
+    temperature: float = 0.0,
+    max_tokens: int = 100,
+    top_p: float = 1.0,
+    top_k: int = 50,
+    stop_sequences: Optional[List[str]] = None,
+    stream: bool = False,
+    system: Optional[str] = None,
+    as_response: bool = False
+) -> Union[Dict[str, Any], Response, str, Iterator[str]]:
+    """
+    Sends a request to the LLaMA model API and returns the response.
+
+    Args:
+        message (str): The input message for the model.
+        model_name (str): The name of the model to use (default: "llama3_1").
+        image_url (Optional[str]): URL of an image to include in the request.
+        temperature (float): Sampling temperature for the model.
+        max_tokens (int): Maximum number of tokens to generate.
+        top_p (float): Top-p (nucleus) sampling parameter.
+        top_k (int): Top-k sampling parameter.
+        stop_sequences (Optional[List[str]]): List of sequences to stop generation at.
+        stream (bool): Whether to stream the response.
+        system (Optional[str]): System-level instructions for the model.
+        as_response (bool): Return a normalized ``responses.Response`` instead of the raw dict.
+
+    Returns:
+        Union[Dict[str, Any], Response, str, Iterator[str]]: The JSON response from the API, an iterator
+        of text deltas if ``stream`` is set, or an error message.
+    """
+    import requests
+    from .transport import get_transport
+
+    url, headers, payload = build_request(
+        message, model_name, image_url, temperature, max_tokens,
+        top_p, top_k, stop_sequences, stream, system
+    )
+
     try:
         # Send the POST request to the API
-        response = requests.post(url, json=payload, headers=headers)
+        response = get_transport().post(url, deployment=model_name, json=payload, headers=headers, stream=stream)
 
         # Check the response status code
         if response.status_code == 200:
-            return response.json()
+            if stream:
+                return iter_deltas(response, "llama")
+            return Response.from_http(response, "llama") if as_response else response_json(response)
         else:
             return f'Error: {response.status_code}, {response.text}'
     except requests.exceptions.RequestException as e:
@@ -1,45 +1,14 @@
-import requests
-import os
-from dotenv import load_dotenv
-import json
-from typing import Optional, Dict, List, Union, Any
+from typing import Optional, Dict, List, Union, Any, Tuple, Iterator
 
-load_dotenv()
-apiKey = os.getenv("HKBU_API_KEY")
-basicUrl = os.getenv("HKBU_BASIC_URL")
-if apiKey is None:
-    raise ValueError("HKBU_API_KEY not found in environment variables")
-if basicUrl is None:
-    raise ValueError("HKBU_BASIC_URL not found in environment variables")
+from .codec import response_json
+from .config import get_config
+from .registry import REGISTRY, get_model
+from .responses import Response
+from .streaming import iter_deltas
 
-openai_models = [
-    {
-        "model": "gpt-4-o",
-        'api-version': '2024-10-21',
-    },
-    {
-        "model": "gpt-4-o-mini",
-        'api-version': '2024-10-21',
-    },
-    {
-        "model": "o1-preview",
-        'api-version': '2024-10-21',
-    },
-    {
-        "model": "o1-mini",
-        'api-version': '2024-10-21',
-    },
-    {
-        "model": "text-embedding-3-large",
-        'api-version': '2024-05-01-preview',
-    },
-    {
-        "model": "text-embedding-3-small",
-        'api-version': '2024-05-01-preview',
-    },
-]
+openai_models = REGISTRY.model_list("openai")
 
-def OpenAI(
+def build_request(
         message: str,
         model_name: str = "gpt-4-o-mini",
         imageURL: Optional[str] = None,
@@ -49,32 +18,22 @@ def OpenAI(
         stream: bool = False,
         response_format: Optional[Dict[str, str]] = None,
         system_message: Optional[str] = None
-        ) -> Union[Dict[str, Any], str]:
+        ) -> Tuple[str, Dict[str, str], Dict[str, Any]]:
     """
-    Send a request to Azure OpenAI service.
+    Build the URL, headers and payload for an Azure OpenAI chat request.
     
     Args:
-        message: User message content
-        model_name: OpenAI model to use
-        imageURL: Optional URL to image for vision models
-        temperature: Sampling temperature (0-2.0)
-        max_tokens: Maximum tokens in response
-        tools: List of tools for function calling
-        stream: Whether to stream the response
-        response_format: Specify response format (e.g., {"type": "json_object"})
-        system_message: Optional system message to set context
+        Same as ``OpenAI``.
         
     Returns:
-        Response data from the API or error message
+        The request URL, headers and JSON payload
     """
-    # Find the model in the openai_models list
-    model_info = next((model for model in openai_models if model["model"] == model_name), None)
+    # Look up the deployment in the model registry
+    spec = get_model(model_name, "openai")
     
-    if not model_info:
+    if spec is None:
         raise ValueError(f"Model {model_name} not found in openai_models list")
     
-    api_version = model_info['api-version']
-    
     # Build conversation
     conversation = []
     
@@ -93,8 +52,9 @@ def OpenAI(
     
     conversation.append(user_message)
     
-    url = f"{basicUrl}/deployments/{model_name}/chat/completions/?api-version={api_version}"
-    headers = {'Content-Type': 'application/json', 'api-key': apiKey}
+    config = get_config()
+    url = spec.url(config.base_url)
+    headers = spec.headers(config.api_key)
     payload = { 
         'messages': conversation,
         'temperature': temperature,
@@ -109,9 +69,92 @@ def OpenAI(
     if response_format:
         payload['response_format'] = response_format
     
+    return url, headers, payload
+
+def build_embeddings_request(
+        texts: List[str],
+        model_name: str = "text-embedding-3-small",
+        dimensions: Optional[int] = None,
+        encoding_format: str = "float"
+        ) -> Tuple[str, Dict[str, str], Dict[str, Any]]:
+    """
+    Build the URL, headers and payload for an Azure OpenAI embeddings request.
+    
+    Args:
+        texts: Input texts, one embedding is returned per text
+        model_name: Embeddings deployment to use
+        dimensions: Optional output dimensionality (text-embedding-3 only)
+        encoding_format: "float" or "base64"
+        
+    Returns:
+        The request URL, headers and JSON payload
+    """
+    spec = get_model(model_name, "openai")
+    
+    if spec is None:
+        raise ValueError(f"Model {model_name} not found in openai_models list")
+    if "embeddings" not in spec.capabilities:
+        raise ValueError(f"Model {model_name} is not an embeddings deployment")
+    
+    config = get_config()
+    url = spec.url(config.base_url)
+    headers = spec.headers(config.api_key)
+    payload: Dict[str, Any] = {'input': texts}
+    
+    if dimensions:
+        payload['dimensions'] = dimensions
+    
+    if encoding_format != "float":
+        payload['encoding_format'] = encoding_format
+    
+    return url, headers, payload
+
+def OpenAI(
+        message: str,
+        model_name: str = "gpt-4-o-mini",
+        imageURL: Optional[str] = None,
+        temperature: float = 0,
+        max_tokens: int = 100,
+        tools: Optional[List[Dict[str, Any]]] = None,
+        stream: bool = False,
+        response_format: Optional[Dict[str, str]] = None,
+        system_message: Optional[str] = None,
+        hedge: bool = False,
+        as_response: bool = False
+        ) -> Union[Dict[str, Any], Response, str, Iterator[str]]:
+    """
+    Send a request to Azure OpenAI service.
+    
+    Args:
+        message: User message content
+        model_name: OpenAI model to use
+        imageURL: Optional URL to image for vision models
+        temperature: Sampling temperature (0-2.0)
+        max_tokens: Maximum tokens in response
+        tools: List of tools for function calling
+        stream: Whether to stream the response
+        response_format: Specify response format (e.g., {"type": "json_object"})
+        system_message: Optional system message to set context
+        hedge: Send a backup request if this one is slow (see ``hedge.HedgePolicy``)
+        as_response: Return a normalized ``responses.Response`` instead of the raw dict
+        
+    Returns:
+        Response data from the API, an iterator of text deltas if stream is set, or error message
+    """
+    # requests and the transport are only imported once a request is made
+    import requests
+    from .transport import get_transport
+
+    url, headers, payload = build_request(
+        message, model_name, imageURL, temperature, max_tokens,
+        tools, stream, response_format, system_message
+    )
+    
     try:
-        response = requests.post(url, json=payload, headers=headers, timeout=30)
+        response = get_transport().post(url, deployment=model_name, json=payload, headers=headers, timeout=30, stream=stream, hedge=hedge)
         response.raise_for_status()  # Raise exception for 4XX/5XX responses
-        return response.json()
+        if stream:
+            return iter_deltas(response, "openai")
+        return Response.from_http(response, "openai") if as_response else response_json(response)
     except requests.exceptions.RequestException as e:
-        return f'Error: {str(e)}'
\ No newline at end of file
+        return f'Error: {str(e)}'
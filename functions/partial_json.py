@@ -0,0 +1,274 @@
+import json
+import re
+from typing import Optional, List, Any, Union
+
+# Next character that ends or escapes a run of string content
+_STRING_STOP = re.compile(r'["\\]')
+# Whitespace between tokens
+_WHITESPACE = re.compile(r"[ \t\r\n]*")
+# Characters a number or true/false/null literal is made of
+_LITERAL = re.compile(r"[-+0-9.eEtruefalsn]*")
+# A trailing escape sequence that has not fully arrived yet
+_INCOMPLETE_ESCAPE = re.compile(r"\\(u[0-9a-fA-F]{0,3})?$")
+
+# Parser states
+_VALUE = 0          # expecting a value
+_VALUE_OR_END = 1   # after "[": a value or "]"
+_KEY_OR_END = 2     # after "{": a key or "}"
+_KEY = 3            # after "," in an object
+_COLON = 4          # after a key
+_AFTER_VALUE = 5    # after a value inside a container: "," or the closer
+_DONE = 6           # the root value is complete
+
+
+class PartialJSONError(ValueError):
+    """The streamed text is not valid JSON."""
+
+
+class IncrementalJSONParser:
+    """
+    Push parser that builds a JSON value from chunks as they arrive.
+
+    Each character is examined once: ``feed`` continues from where the last
+    chunk ended, so parsing a stream of n characters costs O(n) overall
+    rather than re-parsing the growing buffer per chunk. Objects and arrays
+    are created as soon as they open and filled in place, so ``value``
+    exposes the partial result at any time, including the string that is
+    still being received.
+
+    Text before the first ``{`` or ``[`` (e.g. a Markdown code fence) and
+    after the root value is ignored.
+
+    Example:
+        parser = IncrementalJSONParser()
+        for delta in deltas:
+            parser.feed(delta)
+            print(parser.value)
+        result = parser.close()
+    """
+
+    def __init__(self) -> None:
+        self.root: Any = None
+        self._started = False
+        self._state = _VALUE
+        self._stack: List[Union[dict, list]] = []
+        self._keys: List[Optional[str]] = []
+        # Raw text of the string or literal being read
+        self._buffer: List[str] = []
+        self._in_string = False
+        self._string_is_key = False
+        self._escaped = False
+        self._literal = False
+
+    @property
+    def done(self) -> bool:
+        """Whether the root value is complete."""
+        return self._state == _DONE
+
+    @property
+    def value(self) -> Any:
+        """
+        The value parsed so far.
+
+        Containers are live and keep growing as more chunks are fed; a string
+        value that is still arriving is included with the text received so far.
+        """
+        if self._in_string and not self._string_is_key and self._stack:
+            raw = _INCOMPLETE_ESCAPE.sub("", "".join(self._buffer))
+            self._attach(_decode_string(raw, partial=True), partial=True)
+        return self.root
+
+    def feed(self, chunk: str) -> None:
+        """
+        Parse the next chunk of text.
+
+        Args:
+            chunk (str): The next piece of the JSON text.
+
+        Raises:
+            PartialJSONError: If the text is not valid JSON.
+        """
+        i = 0
+        n = len(chunk)
+        if not self._started:
+            starts = [pos for pos in (chunk.find("{"), chunk.find("[")) if pos >= 0]
+            if not starts:
+                return
+            i = min(starts)
+            self._started = True
+        while i < n:
+            if self._in_string:
+                i = self._read_string(chunk, i, n)
+                continue
+            if self._literal:
+                end = _LITERAL.match(chunk, i).end()
+                self._buffer.append(chunk[i:end])
+                i = end
+                if i == n:
+                    break
+                self._end_literal()
+                continue
+            i = _WHITESPACE.match(chunk, i).end()
+            if i == n:
+                break
+            char = chunk[i]
+            state = self._state
+            if state == _DONE:
+                return
+            if state in (_VALUE, _VALUE_OR_END):
+                if char == "]" and state == _VALUE_OR_END:
+                    self._close()
+                elif char == "{":
+                    self._open({})
+                    self._state = _KEY_OR_END
+                elif char == "[":
+                    self._open([])
+                    self._state = _VALUE_OR_END
+                elif char == '"':
+                    self._in_string, self._string_is_key = True, False
+                elif char in "-0123456789tfn":
+                    self._literal = True
+                    continue
+                else:
+                    raise PartialJSONError(f"Unexpected {char!r} where a value was expected")
+            elif state in (_KEY_OR_END, _KEY):
+                if char == '"':
+                    self._in_string, self._string_is_key = True, True
+                elif char == "}" and state == _KEY_OR_END:
+                    self._close()
+                else:
+                    raise PartialJSONError(f"Unexpected {char!r} where an object key was expected")
+            elif state == _COLON:
+                if char != ":":
+                    raise PartialJSONError(f"Expected ':' after an object key, got {char!r}")
+                self._state = _VALUE
+            else:
+                container = self._stack[-1]
+                if char == ",":
+                    self._state = _KEY if isinstance(container, dict) else _VALUE
+                elif char == "}" and isinstance(container, dict):
+                    self._close()
+                elif char == "]" and isinstance(container, list):
+                    self._close()
+                else:
+                    raise PartialJSONError(f"Unexpected {char!r} after a value")
+            i += 1
+
+    def close(self) -> Any:
+        """
+        Finish parsing and return the complete value.
+
+        Returns:
+            Any: The parsed value.
+
+        Raises:
+            PartialJSONError: If the text ended before the root value was complete.
+        """
+        if self._state != _DONE:
+            raise PartialJSONError("JSON text ended before the value was complete")
+        return self.root
+
+    def _read_string(self, chunk: str, i: int, n: int) -> int:
+        if self._escaped:
+            # The escaped character arrived in this chunk
+            self._buffer.append(chunk[i])
+            self._escaped = False
+            i += 1
+        while i < n:
+            match = _STRING_STOP.search(chunk, i)
+            if match is None:
+                self._buffer.append(chunk[i:])
+                return n
+            pos = match.start()
+            if chunk[pos] == '"':
+                self._buffer.append(chunk[i:pos])
+                self._end_string()
+                return pos + 1
+            # Keep the escape raw; it is decoded with the whole string
+            if pos + 1 < n:
+                self._buffer.append(chunk[i:pos + 2])
+                i = pos + 2
+            else:
+                self._buffer.append(chunk[i:pos + 1])
+                self._escaped = True
+                return n
+        return n
+
+    def _end_string(self) -> None:
+        text = _decode_string("".join(self._buffer))
+        self._buffer.clear()
+        self._in_string = False
+        if self._string_is_key:
+            self._keys[-1] = text
+            self._state = _COLON
+        else:
+            self._add(text)
+
+    def _end_literal(self) -> None:
+        raw = "".join(self._buffer)
+        self._buffer.clear()
+        self._literal = False
+        try:
+            value = json.loads(raw)
+        except ValueError as e:
+            raise PartialJSONError(f"Invalid literal {raw!r}") from e
+        self._add(value)
+
+    def _attach(self, value: Any, partial: bool = False) -> None:
+        if not self._stack:
+            self.root = value
+            return
+        container = self._stack[-1]
+        if isinstance(container, dict):
+            container[self._keys[-1]] = value
+        elif partial and self._state == _AFTER_VALUE:
+            container[-1] = value
+        else:
+            container.append(value)
+            if partial:
+                # Later snapshots of the same string replace this entry
+                self._state = _AFTER_VALUE
+
+    def _add(self, value: Any) -> None:
+        if self._stack and isinstance(self._stack[-1], list) and self._state == _AFTER_VALUE:
+            # A partial snapshot of this string was already appended
+            self._stack[-1][-1] = value
+        else:
+            self._attach(value)
+        self._state = _AFTER_VALUE if self._stack else _DONE
+
+    def _open(self, container: Union[dict, list]) -> None:
+        self._attach(container)
+        self._stack.append(container)
+        self._keys.append(None)
+
+    def _close(self) -> None:
+        self._stack.pop()
+        self._keys.pop()
+        self._state = _AFTER_VALUE if self._stack else _DONE
+
+
+def _decode_string(raw: str, partial: bool = False) -> str:
+    if "\\" not in raw:
+        return raw
+    try:
+        return json.loads(f'"{raw}"')
+    except ValueError as e:
+        if partial:
+            return raw
+        raise PartialJSONError(f"Invalid string escape in {raw!r}") from e
+
+
+def parse_partial(text: str) -> Any:
+    """
+    Parse a possibly incomplete JSON text into the value received so far.
+
+    Args:
+        text (str): JSON text, e.g. the model output streamed up to now.
+
+    Returns:
+        Any: The partial value, or None if no object or array has started.
+    """
+    parser = IncrementalJSONParser()
+    parser.feed(text)
+    return parser.value
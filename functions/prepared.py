@@ -0,0 +1,333 @@
+import base64
+import hashlib
+import mimetypes
+import os
+import threading
+from collections import OrderedDict
+from typing import Optional, Dict, List, Any, Tuple, Union
+
+from . import openai, claude, llama as llama_module
+from .codec import dumps, response_json
+from .config import get_config
+from .registry import ModelSpec, get_model
+from .responses import Response
+
+# Serialized in place of the user message; the template is split around it
+_PLACEHOLDER = "\x00message\x00"
+
+
+def _openai(message: str, model: str, system_message: Optional[str], image_url: Optional[str],
+            temperature: float, max_tokens: int, options: Dict[str, Any]):
+    return openai.build_request(message, model, image_url, temperature, max_tokens,
+                                system_message=system_message, **options)
+
+
+def _claude(message: str, model: str, system_message: Optional[str], image_url: Optional[str],
+            temperature: float, max_tokens: int, options: Dict[str, Any]):
+    url, headers, payload = claude.build_request(message, model, image_url, temperature, max_tokens, **options)
+    if system_message:
+        payload["system"] = system_message
+    return url, headers, payload
+
+
+def _llama(message: str, model: str, system_message: Optional[str], image_url: Optional[str],
+           temperature: float, max_tokens: int, options: Dict[str, Any]):
+    return llama_module.build_request(message, model, image_url, temperature, max_tokens,
+                                      system=system_message, **options)
+
+
+# Family -> builder of (url, headers, payload) with an optional image
+TEMPLATE_BUILDERS = {
+    "openai": _openai,
+    "claude": _claude,
+    "llama": _llama,
+}
+
+
+def _find(value: Any, target: str) -> Optional[List[Union[str, int]]]:
+    # Path of keys and indices from ``value`` to the string ``target``
+    if value == target:
+        return []
+    items = value.items() if isinstance(value, dict) else enumerate(value) if isinstance(value, list) else ()
+    for key, item in items:
+        path = _find(item, target)
+        if path is not None:
+            return [key] + path
+    return None
+
+
+def _replace(value: Any, path: List[Union[str, int]], new: Any) -> Any:
+    # Copy of ``value`` with ``new`` at ``path``; containers off the path are shared
+    if not path:
+        return new
+    copy = dict(value) if isinstance(value, dict) else list(value)
+    copy[path[0]] = _replace(value[path[0]], path[1:], new)
+    return copy
+
+
+class PromptTemplate:
+    """
+    A request whose static parts are serialized once, so only the user message is encoded per call.
+
+    The system message, images, sampling parameters and the rest of the
+    payload are rendered to JSON when the template is created. Each call
+    JSON-encodes the message, splices it between the two pre-serialized
+    halves and sends the result through the shared transport, which still
+    sees the payload for context checks, rate limiting, caching and request
+    coalescing. Worth it for large fixed system prompts or images (see
+    ``image_data_url``) reused across many calls.
+
+    Example:
+        classify = PromptTemplate("gpt-4-o-mini", system_message=GUIDELINES, max_tokens=5)
+        for review in reviews:
+            label = classify(review, as_response=True).text
+
+    Templates are not streamed; use the wrappers for ``stream=True``.
+    """
+
+    __slots__ = ("model_name", "family", "_spec", "_payload", "_path", "_prefix", "_suffix")
+
+    def __init__(
+        self,
+        model_name: str,
+        system_message: Optional[str] = None,
+        image_url: Optional[str] = None,
+        temperature: float = 0,
+        max_tokens: int = 100,
+        **options: Any
+    ) -> None:
+        """
+        Args:
+            model_name (str): OpenAI, Claude or Llama deployment to send to.
+            system_message (Optional[str]): Optional system message to set context.
+            image_url (Optional[str]): Image URL or data URL attached to every request.
+            temperature (float): Sampling temperature.
+            max_tokens (int): Maximum tokens in each response.
+            **options: Further arguments of the family's ``build_request``, e.g.
+                ``tools`` and ``response_format`` for OpenAI or ``top_p`` for Llama.
+
+        Raises:
+            ValueError: If the model is not an OpenAI, Claude or Llama deployment.
+        """
+        spec: Optional[ModelSpec] = get_model(model_name)
+        if spec is None or spec.family not in TEMPLATE_BUILDERS:
+            raise ValueError(f"Model {model_name} is not an OpenAI, Claude or Llama deployment")
+        self.model_name = model_name
+        self.family = spec.family
+        self._spec = spec
+        _, _, payload = TEMPLATE_BUILDERS[spec.family](
+            _PLACEHOLDER, model_name, system_message, image_url, temperature, max_tokens, options
+        )
+        self._payload = payload
+        self._path = _find(payload, _PLACEHOLDER)
+        self._prefix, self._suffix = dumps(payload).split(dumps(_PLACEHOLDER))
+
+    def render(self, message: str) -> Tuple[str, Dict[str, str], Dict[str, Any], bytes]:
+        """
+        Build the request for ``message``.
+
+        Args:
+            message (str): User message content.
+
+        Returns:
+            Tuple[str, Dict[str, str], Dict[str, Any], bytes]: The request URL,
+            headers, JSON payload and the payload serialized.
+        """
+        config = get_config()
+        body = self._prefix + dumps(message) + self._suffix
+        payload = _replace(self._payload, self._path, message)
+        return self._spec.url(config.base_url), self._spec.headers(config.api_key), payload, body
+
+    def __call__(
+        self, message: str, hedge: bool = False, as_response: bool = False
+    ) -> Union[Dict[str, Any], Response, str]:
+        """
+        Send ``message`` with the template's static parts.
+
+        Args:
+            message (str): User message content.
+            hedge (bool): Send a backup request if this one is slow (see ``hedge.HedgePolicy``).
+            as_response (bool): Return a normalized ``responses.Response`` instead of the raw dict.
+
+        Returns:
+            Union[Dict[str, Any], Response, str]: The JSON response from the API, or an error message.
+        """
+        # requests and the transport are only imported once a request is made
+        import requests
+        from .transport import get_transport
+
+        url, headers, payload, body = self.render(message)
+        try:
+            response = get_transport().post(
+                url, deployment=self.model_name, json=payload, data=body, headers=headers, timeout=30, hedge=hedge
+            )
+            response.raise_for_status()
+            return Response.from_http(response, self.family) if as_response else response_json(response)
+        except requests.exceptions.RequestException as e:
+            return f"Error: {e}"
+
+    async def acall(
+        self, message: str, hedge: bool = False, as_response: bool = False
+    ) -> Union[Dict[str, Any], Response, str]:
+        """
+        Async version of calling the template.
+
+        Returns:
+            Union[Dict[str, Any], Response, str]: The JSON response from the API, or an error message.
+        """
+        import httpx
+        from .async_transport import get_async_transport
+        from .exceptions import HKBUAPIError
+
+        url, headers, payload, body = self.render(message)
+        try:
+            response = await get_async_transport().post(
+                url, deployment=self.model_name, json=payload, content=body, headers=headers, timeout=30, hedge=hedge
+            )
+            response.raise_for_status()
+            return Response.from_http(response, self.family) if as_response else response_json(response)
+        except (httpx.HTTPError, HKBUAPIError) as e:
+            return f"Error: {e}"
+
+
+# Leading bytes of the image formats the vision models accept
+_SIGNATURES = (
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"GIF87a", "image/gif"),
+    (b"GIF89a", "image/gif"),
+)
+
+
+def _sniff(data: bytes) -> Optional[str]:
+    for signature, mime_type in _SIGNATURES:
+        if data.startswith(signature):
+            return mime_type
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return "image/webp"
+    return None
+
+
+class ImageCache:
+    """
+    Base64 data URLs of images, keyed by a hash of their content.
+
+    Each URL is downloaded once and each file read once (again if it
+    changes); identical images from different sources share one entry.
+    Once the data URLs exceed ``max_bytes`` the least recently used ones
+    are dropped.
+    """
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024, max_sources: int = 4096) -> None:
+        """
+        Args:
+            max_bytes (int): Maximum total size of the cached data URLs.
+            max_sources (int): Maximum number of URLs and paths remembered.
+        """
+        self.max_bytes = max_bytes
+        self.max_sources = max_sources
+        self._urls: "OrderedDict[str, str]" = OrderedDict()
+        self._sources: "OrderedDict[str, str]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def data_url(self, image: Union[str, bytes, "os.PathLike[str]"], mime_type: Optional[str] = None) -> str:
+        """
+        Return ``image`` as a base64 data URL.
+
+        Args:
+            image (Union[str, bytes, os.PathLike]): An http(s) URL, a file path or the image bytes.
+                Data URLs are returned unchanged.
+            mime_type (Optional[str]): Overrides the type detected from the content, response
+                headers or file name.
+
+        Returns:
+            str: A ``data:<type>;base64,...`` URL.
+
+        Raises:
+            requests.exceptions.RequestException: If downloading the image fails.
+            OSError: If reading the file fails.
+        """
+        if isinstance(image, (bytes, bytearray)):
+            return self._store(bytes(image), mime_type or _sniff(image) or "application/octet-stream")
+
+        source = os.fspath(image)
+        if source.startswith("data:"):
+            return source
+        remote = source.startswith(("http://", "https://"))
+        if remote:
+            key = source
+        else:
+            stat = os.stat(source)
+            key = f"{source}\0{stat.st_mtime_ns}\0{stat.st_size}"
+        with self._lock:
+            digest = self._sources.get(key)
+            url = self._urls.get(digest) if digest is not None else None
+            if url is not None:
+                self._sources.move_to_end(key)
+                self._urls.move_to_end(digest)
+                return url
+
+        if remote:
+            data, header_type = self._download(source)
+        else:
+            with open(source, "rb") as f:
+                data = f.read()
+            header_type = None
+        guessed = mimetypes.guess_type(source)[0]
+        return self._store(data, mime_type or _sniff(data) or header_type or guessed or "application/octet-stream", key)
+
+    @staticmethod
+    def _download(url: str) -> Tuple[bytes, Optional[str]]:
+        from .transport import get_transport
+
+        response = get_transport().session.get(url, timeout=30)
+        response.raise_for_status()
+        content_type = response.headers.get("Content-Type")
+        return response.content, content_type.split(";")[0].strip() if content_type else None
+
+    def _store(self, data: bytes, mime_type: str, source: Optional[str] = None) -> str:
+        digest = hashlib.sha256(data).hexdigest()
+        with self._lock:
+            url = self._urls.get(digest)
+            if url is None:
+                url = f"data:{mime_type};base64,{base64.b64encode(data).decode('ascii')}"
+                self._urls[digest] = url
+                self._size += len(url)
+                while self._size > self.max_bytes and len(self._urls) > 1:
+                    _, evicted = self._urls.popitem(last=False)
+                    self._size -= len(evicted)
+            else:
+                self._urls.move_to_end(digest)
+            if source is not None:
+                self._sources[source] = digest
+                self._sources.move_to_end(source)
+                while len(self._sources) > self.max_sources:
+                    self._sources.popitem(last=False)
+        return url
+
+    def clear(self) -> None:
+        with self._lock:
+            self._urls.clear()
+            self._sources.clear()
+            self._size = 0
+
+
+_image_cache = ImageCache()
+
+
+def image_data_url(image: Union[str, bytes, "os.PathLike[str]"], mime_type: Optional[str] = None) -> str:
+    """
+    Return ``image`` as a base64 data URL from the shared ``ImageCache``.
+
+    Pass the result as ``imageURL``/``image_url`` to the wrappers or a
+    ``PromptTemplate``; the image is then fetched and encoded only once.
+
+    Args:
+        image (Union[str, bytes, os.PathLike]): An http(s) URL, a file path or the image bytes.
+        mime_type (Optional[str]): Overrides the detected image type.
+
+    Returns:
+        str: A ``data:<type>;base64,...`` URL.
+    """
+    return _image_cache.data_url(image, mime_type)
@@ -1,25 +1,33 @@
-import requests
-import os
-from dotenv import load_dotenv
-from typing import Optional, Dict, List, Union, Any
+import logging
+from typing import Optional, Dict, List, Union, Any, Tuple
 
-# Load environment variables
-load_dotenv()
+from .codec import response_json
+from .config import get_config
+from .registry import REGISTRY, ModelSpec, get_model
+from .responses import Response
 
-# Environment Variables
-API_KEY: Optional[str] = os.getenv("HKBU_API_KEY")
-BASE_URL: Optional[str] = os.getenv("HKBU_BASIC_URL")
+logger = logging.getLogger(__name__)
 
-if not API_KEY:
-    raise ValueError("HKBU_API_KEY not found in environment variables")
-if not BASE_URL:
-    raise ValueError("HKBU_BASIC_URL not found in environment variables")
+# Model configurations from the model registry
+QWEN_MODELS: List[Dict[str, str]] = REGISTRY.model_list("qwen")
 
-# Model configurations
-QWEN_MODELS = [
-    {"model": "qwen-max", "api-version": "v1"},
-    {"model": "qwen-plus", "api-version": "v1"},
-]
+def get_model_spec(model_name: str) -> ModelSpec:
+    """
+    Retrieve a Qwen deployment from the model registry.
+
+    Args:
+        model_name (str): Name of the model to retrieve.
+
+    Returns:
+        ModelSpec: Model configuration.
+
+    Raises:
+        ValueError: If the model is not found.
+    """
+    spec = get_model(model_name, "qwen")
+    if spec is None:
+        raise ValueError(f"Model '{model_name}' not found in QWEN_MODELS list")
+    return spec
 
 def get_model_info(model_name: str) -> Dict[str, str]:
     """
@@ -34,10 +42,7 @@ def get_model_info(model_name: str) -> Dict[str, str]:
     Raises:
         ValueError: If the model is not found.
     """
-    model_info = next((model for model in QWEN_MODELS if model["model"] == model_name), None)
-    if not model_info:
-        raise ValueError(f"Model '{model_name}' not found in QWEN_MODELS list")
-    return model_info
+    return get_model_spec(model_name).info()
 
 def build_conversation(message: str, system_message: Optional[str] = None) -> List[Dict[str, str]]:
     """
@@ -56,6 +61,42 @@ def build_conversation(message: str, system_message: Optional[str] = None) -> Li
     conversation.append({"role": "user", "content": message})
     return conversation
 
+def build_request(
+    model_name: str,
+    messages: List[Dict[str, str]],
+    temperature: Optional[float] = 0.7,
+    max_tokens: Optional[int] = 512,
+    top_p: Optional[float] = 1.0,
+    frequency_penalty: Optional[float] = 0.0,
+    presence_penalty: Optional[float] = 0.0,
+) -> Tuple[str, Dict[str, str], Dict[str, Any]]:
+    """
+    Build the URL, headers and request body for the Qwen API.
+
+    Args:
+        Same as ``Qwen``.
+
+    Returns:
+        Tuple[str, Dict[str, str], Dict[str, Any]]: Request URL, headers and body.
+
+    Raises:
+        ValueError: If the model is not found.
+    """
+    spec = get_model_spec(model_name)
+    config = get_config()
+    url = spec.url(config.base_url)
+    headers = spec.headers(config.api_key)
+    data = {
+        "model": model_name,
+        "messages": messages,
+        "temperature": temperature,
+        "max_tokens": max_tokens,
+        "top_p": top_p,
+        "frequency_penalty": frequency_penalty,
+        "presence_penalty": presence_penalty,
+    }
+    return url, headers, data
+
 def Qwen(
     model_name: str,
     messages: List[Dict[str, str]],
@@ -64,7 +105,8 @@ def Qwen(
     top_p: Optional[float] = 1.0,
     frequency_penalty: Optional[float] = 0.0,
     presence_penalty: Optional[float] = 0.0,
-) -> Dict[str, Any]:
+    as_response: bool = False,
+) -> Union[Dict[str, Any], Response]:
     """
     Send a request to the Qwen API.
 
@@ -76,35 +118,27 @@ def Qwen(
         top_p (Optional[float]): Nucleus sampling parameter.
         frequency_penalty (Optional[float]): Frequency penalty parameter.
         presence_penalty (Optional[float]): Presence penalty parameter.
+        as_response (bool): Return a normalized ``responses.Response`` instead of the raw dict.
 
     Returns:
-        Dict[str, Any]: API response.
+        Union[Dict[str, Any], Response]: API response.
 
     Raises:
         ValueError: If the API request fails.
+        HKBUAPIError: If a transient failure persists after the transport's retries.
     """
-    url = f"{BASE_URL}/deployments/{model_name}/chat/completions"
-    headers = {
-        "Content-Type": "application/json",
-        "Authorization": f"Bearer {API_KEY}",
-    }
-    data = {
-        "model": model_name,
-        "messages": messages,
-        "temperature": temperature,
-        "max_tokens": max_tokens,
-        "top_p": top_p,
-        "frequency_penalty": frequency_penalty,
-        "presence_penalty": presence_penalty,
-    }
+    from .transport import get_transport
+
+    url, headers, data = build_request(
+        model_name, messages, temperature, max_tokens, top_p, frequency_penalty, presence_penalty
+    )
     
-    print(f"Sending request to Qwen API at {url}")
-    response = requests.post(url, headers=headers, json=data)
+    logger.debug("Sending request to %s", model_name)
+    response = get_transport().post(url, deployment=model_name, headers=headers, json=data)
     
     if response.status_code != 200:
-        print(f"Request failed with status code {response.status_code}: {response.text}")
+        logger.warning("Qwen request to %s failed with status code %s", model_name, response.status_code)
         raise ValueError(f"Request failed with status code {response.status_code}: {response.text}")
     
-    print("Request successful")
-    return response.json()
+    return Response.from_http(response, "qwen") if as_response else response_json(response)
 
@@ -0,0 +1,246 @@
+import asyncio
+import threading
+import time
+from typing import Optional, Dict, Any, NamedTuple
+
+from .tokens import request_tokens
+
+
+class RateLimit(NamedTuple):
+    """Per-deployment quota. ``None`` leaves that dimension unlimited."""
+    requests_per_minute: Optional[float] = None
+    tokens_per_minute: Optional[float] = None
+
+
+class TokenBucket:
+    """
+    Token bucket refilled continuously at ``rate_per_minute``.
+
+    Callers reserve capacity up front and are told how long to wait for it.
+    The balance may go negative, so concurrent callers queue up in arrival
+    order instead of racing for the next refill.
+    """
+
+    def __init__(self, rate_per_minute: float, capacity: Optional[float] = None) -> None:
+        """
+        Args:
+            rate_per_minute (float): Refill rate.
+            capacity (Optional[float]): Burst size (default: one minute of quota).
+        """
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity if capacity is not None else rate_per_minute
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def reserve(self, amount: float, now: float) -> float:
+        """
+        Take ``amount`` from the bucket.
+
+        Args:
+            amount (float): Capacity to reserve.
+            now (float): Current ``time.monotonic()`` value.
+
+        Returns:
+            float: Seconds to wait before the reservation may be used.
+        """
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        self.tokens -= amount
+        return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+
+class DeploymentLimiter:
+    """Request and token buckets for a single deployment."""
+
+    def __init__(self, limit: RateLimit) -> None:
+        self.requests = TokenBucket(limit.requests_per_minute) if limit.requests_per_minute else None
+        self.tokens = TokenBucket(limit.tokens_per_minute) if limit.tokens_per_minute else None
+        self.paused_until = 0.0
+        self.lock = threading.Lock()
+
+    def reserve(self, tokens: int) -> float:
+        """
+        Reserve one request and ``tokens`` tokens.
+
+        Args:
+            tokens (int): Estimated tokens the request will consume.
+
+        Returns:
+            float: Seconds to wait before sending.
+        """
+        with self.lock:
+            now = time.monotonic()
+            delay = max(0.0, self.paused_until - now)
+            if self.requests is not None:
+                delay = max(delay, self.requests.reserve(1, now))
+            if self.tokens is not None:
+                delay = max(delay, self.tokens.reserve(tokens, now))
+            return delay
+
+    def pause(self, seconds: float) -> None:
+        """
+        Hold back new requests for ``seconds``, e.g. after the gateway answered 429.
+
+        Args:
+            seconds (float): Pause duration.
+        """
+        with self.lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+
+class RateLimiter:
+    """
+    Client-side scheduler enforcing per-deployment request and token quotas.
+
+    ``acquire`` blocks (or ``acquire_async`` awaits) until the deployment has
+    capacity, so bursts are queued and smoothed rather than rejected by the
+    gateway.
+
+    Example:
+        configure_rate_limits({"gpt-4-o": RateLimit(requests_per_minute=60, tokens_per_minute=40000)})
+    """
+
+    def __init__(self, limits: Dict[str, RateLimit], default: Optional[RateLimit] = None) -> None:
+        """
+        Args:
+            limits (Dict[str, RateLimit]): Quota per deployment name.
+            default (Optional[RateLimit]): Quota for deployments not in ``limits``; unlimited if None.
+        """
+        self.limits = dict(limits)
+        self.default = default
+        self._limiters: Dict[str, Optional[DeploymentLimiter]] = {}
+        self._lock = threading.Lock()
+
+    def limiter(self, deployment: str) -> Optional[DeploymentLimiter]:
+        """
+        Return the limiter of a deployment, or None if it is unlimited.
+
+        Args:
+            deployment (str): Deployment name.
+
+        Returns:
+            Optional[DeploymentLimiter]: The deployment's limiter.
+        """
+        try:
+            return self._limiters[deployment]
+        except KeyError:
+            with self._lock:
+                if deployment not in self._limiters:
+                    limit = self.limits.get(deployment, self.default)
+                    self._limiters[deployment] = DeploymentLimiter(limit) if limit else None
+                return self._limiters[deployment]
+
+    def acquire(self, deployment: str, tokens: int = 0) -> float:
+        """
+        Block until ``deployment`` can take one more request of ``tokens`` tokens.
+
+        Args:
+            deployment (str): Deployment name.
+            tokens (int): Estimated tokens the request will consume.
+
+        Returns:
+            float: Seconds spent waiting.
+        """
+        limiter = self.limiter(deployment)
+        if limiter is None:
+            return 0.0
+        delay = limiter.reserve(tokens)
+        if delay > 0:
+            time.sleep(delay)
+        return delay
+
+    async def acquire_async(self, deployment: str, tokens: int = 0) -> float:
+        """
+        Async version of ``acquire``.
+
+        Args:
+            deployment (str): Deployment name.
+            tokens (int): Estimated tokens the request will consume.
+
+        Returns:
+            float: Seconds spent waiting.
+        """
+        limiter = self.limiter(deployment)
+        if limiter is None:
+            return 0.0
+        delay = limiter.reserve(tokens)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return delay
+
+    def pause(self, deployment: str, seconds: float) -> None:
+        """
+        Hold back new requests to ``deployment`` for ``seconds``.
+
+        Args:
+            deployment (str): Deployment name.
+            seconds (float): Pause duration.
+        """
+        limiter = self.limiter(deployment)
+        if limiter is not None:
+            limiter.pause(seconds)
+
+
+def estimate_tokens(payload: Dict[str, Any]) -> int:
+    """
+    Estimate the tokens a request will consume: prompt size plus the output cap.
+
+    Args:
+        payload (Dict[str, Any]): The JSON payload built by a wrapper.
+
+    Returns:
+        int: Estimated prompt tokens plus ``max_tokens`` / ``maxOutputTokens``.
+    """
+    return request_tokens(payload)
+
+
+def retry_after_seconds(headers: Any, default: Optional[float] = 1.0) -> Optional[float]:
+    """
+    Read the ``Retry-After`` header as a number of seconds.
+
+    Args:
+        headers (Any): Response headers.
+        default (Optional[float]): Value used when the header is missing or not numeric.
+
+    Returns:
+        Optional[float]: Seconds to wait.
+    """
+    try:
+        return max(0.0, float(headers.get("Retry-After")))
+    except (TypeError, ValueError):
+        return default
+
+
+_rate_limiter: Optional[RateLimiter] = None
+
+
+def get_rate_limiter() -> Optional[RateLimiter]:
+    """
+    Return the shared rate limiter, or None if rate limiting is not configured.
+
+    Returns:
+        Optional[RateLimiter]: The process-wide rate limiter.
+    """
+    return _rate_limiter
+
+
+def configure_rate_limits(limits: Dict[str, RateLimit], default: Optional[RateLimit] = None) -> RateLimiter:
+    """
+    Install a shared rate limiter used by both the sync and async transports.
+
+    Args:
+        limits (Dict[str, RateLimit]): Quota per deployment name.
+        default (Optional[RateLimit]): Quota for other deployments; unlimited if None.
+
+    Returns:
+        RateLimiter: The new shared rate limiter.
+    """
+    global _rate_limiter
+    _rate_limiter = RateLimiter(limits, default)
+    return _rate_limiter
+
+
+def disable_rate_limits() -> None:
+    """Remove the shared rate limiter."""
+    global _rate_limiter
+    _rate_limiter = None
@@ -0,0 +1,301 @@
+import json
+import os
+import threading
+from typing import Optional, Dict, List, Any, Iterable, FrozenSet
+
+# Bundled model configuration; HKBU_MODELS_CONFIG may point to an extra file
+# whose families and models are merged on top of it on first lookup.
+DEFAULT_CONFIG_PATH: str = os.path.join(os.path.dirname(os.path.abspath(__file__)), "models.json")
+
+
+class ModelSpec:
+    """
+    Everything needed to address one deployment.
+
+    The request URL and headers are rendered once per base URL / API key and
+    then reused, so building a request does no lookups or string formatting.
+    """
+
+    __slots__ = (
+        "model", "family", "api_version", "endpoint", "auth", "capabilities",
+        "extra_headers", "context_window", "max_output_tokens", "tokenizer",
+        "_url", "_url_base", "_headers", "_headers_key",
+    )
+
+    def __init__(
+        self,
+        model: str,
+        family: str,
+        api_version: str,
+        endpoint: str,
+        auth: str = "api-key",
+        capabilities: Iterable[str] = (),
+        extra_headers: Optional[Dict[str, str]] = None,
+        context_window: Optional[int] = None,
+        max_output_tokens: Optional[int] = None,
+        tokenizer: Optional[str] = None,
+    ) -> None:
+        """
+        Args:
+            model (str): Deployment name.
+            family (str): Model family (``"openai"``, ``"claude"``, ``"gemini"``, ...).
+            api_version (str): API version sent with each request.
+            endpoint (str): Path template with ``{model}`` and ``{api_version}`` placeholders.
+            auth (str): ``"api-key"`` header or ``"bearer"`` Authorization header.
+            capabilities (Iterable[str]): Features supported by the deployment.
+            extra_headers (Optional[Dict[str, str]]): Additional headers required by the family.
+            context_window (Optional[int]): Maximum prompt plus output tokens (per input for embeddings).
+            max_output_tokens (Optional[int]): Maximum tokens the model generates per response.
+            tokenizer (Optional[str]): tiktoken encoding for exact token counts; estimated if None.
+        """
+        self.model = model
+        self.family = family
+        self.api_version = api_version
+        self.endpoint = endpoint.format(model=model, api_version=api_version)
+        self.auth = auth
+        self.capabilities: FrozenSet[str] = frozenset(capabilities)
+        self.extra_headers = dict(extra_headers or {})
+        self.context_window = context_window
+        self.max_output_tokens = max_output_tokens
+        self.tokenizer = tokenizer
+        self._url: Optional[str] = None
+        self._url_base: Optional[str] = None
+        self._headers: Optional[Dict[str, str]] = None
+        self._headers_key: Optional[str] = None
+
+    def url(self, base_url: str) -> str:
+        """
+        Return the full request URL for ``base_url``.
+
+        Args:
+            base_url (str): The HKBU_BASIC_URL value.
+
+        Returns:
+            str: The request URL.
+        """
+        if base_url != self._url_base:
+            self._url = f"{base_url}{self.endpoint}"
+            self._url_base = base_url
+        return self._url  # type: ignore[return-value]
+
+    def headers(self, api_key: str) -> Dict[str, str]:
+        """
+        Return the request headers for ``api_key``.
+
+        The same dict is returned on every call; treat it as read-only.
+
+        Args:
+            api_key (str): The HKBU_API_KEY value.
+
+        Returns:
+            Dict[str, str]: The request headers.
+        """
+        if api_key != self._headers_key:
+            headers = {"Content-Type": "application/json"}
+            headers.update(self.extra_headers)
+            if self.auth == "bearer":
+                headers["Authorization"] = f"Bearer {api_key}"
+            else:
+                headers["api-key"] = api_key
+            self._headers = headers
+            self._headers_key = api_key
+        return self._headers  # type: ignore[return-value]
+
+    def info(self) -> Dict[str, str]:
+        """Return the legacy ``{"model": ..., "api-version": ...}`` dict."""
+        return {"model": self.model, "api-version": self.api_version}
+
+    def __repr__(self) -> str:
+        return f"ModelSpec(model={self.model!r}, family={self.family!r}, api_version={self.api_version!r})"
+
+
+class ModelRegistry:
+    """Dict index of model name -> ``ModelSpec``, loadable from JSON config files."""
+
+    def __init__(self) -> None:
+        self.families: Dict[str, Dict[str, Any]] = {}
+        self.models: Dict[str, ModelSpec] = {}
+        self._lock = threading.Lock()
+
+    def register(
+        self,
+        model: str,
+        family: str,
+        api_version: str,
+        endpoint: Optional[str] = None,
+        auth: Optional[str] = None,
+        capabilities: Iterable[str] = (),
+        headers: Optional[Dict[str, str]] = None,
+        context_window: Optional[int] = None,
+        max_output_tokens: Optional[int] = None,
+        tokenizer: Optional[str] = None,
+    ) -> ModelSpec:
+        """
+        Add or replace a deployment. Unset fields default to the family's settings.
+
+        Args:
+            model (str): Deployment name.
+            family (str): Model family; must be known unless ``endpoint`` is given.
+            api_version (str): API version.
+            endpoint (Optional[str]): Path template overriding the family's.
+            auth (Optional[str]): Auth scheme overriding the family's.
+            capabilities (Iterable[str]): Features supported by the deployment.
+            headers (Optional[Dict[str, str]]): Extra headers overriding the family's.
+            context_window (Optional[int]): Maximum prompt plus output tokens.
+            max_output_tokens (Optional[int]): Maximum tokens per response.
+            tokenizer (Optional[str]): tiktoken encoding name.
+
+        Returns:
+            ModelSpec: The registered spec.
+
+        Raises:
+            ValueError: If the family is unknown and no endpoint is given.
+        """
+        defaults = self.families.get(family, {})
+        endpoint = endpoint or defaults.get("endpoint")
+        if endpoint is None:
+            raise ValueError(f"Unknown model family {family!r} for model {model!r}")
+        spec = ModelSpec(
+            model,
+            family,
+            api_version,
+            endpoint,
+            auth or defaults.get("auth", "api-key"),
+            capabilities,
+            headers if headers is not None else defaults.get("headers"),
+            context_window,
+            max_output_tokens,
+            tokenizer,
+        )
+        with self._lock:
+            self.models[model] = spec
+        return spec
+
+    def load(self, path: str) -> None:
+        """
+        Merge the families and models of a JSON config file into the registry.
+
+        Args:
+            path (str): Path of a file shaped like ``models.json``.
+        """
+        with open(path, "r", encoding="utf-8") as f:
+            config = json.load(f)
+        self.families.update(config.get("families", {}))
+        for entry in config.get("models", []):
+            self.register(
+                entry["model"],
+                entry["family"],
+                entry["api-version"],
+                endpoint=entry.get("endpoint"),
+                auth=entry.get("auth"),
+                capabilities=entry.get("capabilities", ()),
+                headers=entry.get("headers"),
+                context_window=entry.get("context_window"),
+                max_output_tokens=entry.get("max_output_tokens"),
+                tokenizer=entry.get("tokenizer"),
+            )
+
+    def get(self, model: str, family: Optional[str] = None) -> Optional[ModelSpec]:
+        """
+        Look up a deployment.
+
+        Args:
+            model (str): Deployment name.
+            family (Optional[str]): If given, only match a deployment of this family.
+
+        Returns:
+            Optional[ModelSpec]: The spec, or None if not found.
+        """
+        spec = self.models.get(model)
+        if spec is None or (family is not None and spec.family != family):
+            return None
+        return spec
+
+    def model_list(self, family: str) -> List[Dict[str, str]]:
+        """
+        Return the deployments of a family in the legacy list-of-dicts format.
+
+        Args:
+            family (str): Model family.
+
+        Returns:
+            List[Dict[str, str]]: ``{"model": ..., "api-version": ...}`` dicts.
+        """
+        return [spec.info() for spec in self.models.values() if spec.family == family]
+
+
+def _default_registry() -> ModelRegistry:
+    registry = ModelRegistry()
+    registry.load(DEFAULT_CONFIG_PATH)
+    return registry
+
+
+REGISTRY: ModelRegistry = _default_registry()
+
+_environment_loaded = False
+_environment_lock = threading.Lock()
+
+
+def get_registry() -> ModelRegistry:
+    """
+    Return the shared registry, merging the ``HKBU_MODELS_CONFIG`` file into it on first use.
+
+    ``.env`` is loaded first, as in ``config.get_config``, so the variable can
+    be set there; importing the package still reads no environment.
+
+    Returns:
+        ModelRegistry: The process-wide registry.
+    """
+    global _environment_loaded
+    if not _environment_loaded:
+        with _environment_lock:
+            if not _environment_loaded:
+                from dotenv import load_dotenv
+
+                load_dotenv()
+                extra = os.getenv("HKBU_MODELS_CONFIG")
+                if extra:
+                    REGISTRY.load(extra)
+                _environment_loaded = True
+    return REGISTRY
+
+
+def get_model(model: str, family: Optional[str] = None) -> Optional[ModelSpec]:
+    """
+    Look up a deployment in the shared registry.
+
+    Args:
+        model (str): Deployment name.
+        family (Optional[str]): If given, only match a deployment of this family.
+
+    Returns:
+        Optional[ModelSpec]: The spec, or None if not found.
+    """
+    return get_registry().get(model, family)
+
+
+def load_models(path: str) -> None:
+    """
+    Merge a JSON model config file into the shared registry.
+
+    Args:
+        path (str): Path of a file shaped like ``functions/models.json``.
+    """
+    get_registry().load(path)
+
+
+def register_model(model: str, family: str, api_version: str, **kwargs: Any) -> ModelSpec:
+    """
+    Add or replace a deployment in the shared registry.
+
+    Args:
+        model (str): Deployment name.
+        family (str): Model family.
+        api_version (str): API version.
+        **kwargs: ``endpoint``, ``auth``, ``capabilities``, ``headers``, ``context_window``,
+            ``max_output_tokens`` or ``tokenizer``; see ``ModelRegistry.register``.
+
+    Returns:
+        ModelSpec: The registered spec.
+    """
+    return get_registry().register(model, family, api_version, **kwargs)
@@ -0,0 +1,276 @@
+from typing import Optional, Dict, Any, Callable, NamedTuple, Tuple
+
+from .codec import dumps, loads
+
+# Readers for the text of a complete (non-streamed) response in each model
+# family's format. Streamed chunks are handled by streaming.DELTA_EXTRACTORS.
+
+
+def _chat_text(data: Dict[str, Any]) -> Optional[str]:
+    choices = data.get("choices") or []
+    if not choices:
+        return None
+    return (choices[0].get("message") or {}).get("content")
+
+
+def _claude_text(data: Dict[str, Any]) -> Optional[str]:
+    blocks = data.get("content") or []
+    return "".join(block.get("text", "") for block in blocks if block.get("type", "text") == "text") or None
+
+
+def _gemini_text(data: Dict[str, Any]) -> Optional[str]:
+    candidates = data.get("candidates") or []
+    if not candidates:
+        return None
+    parts = (candidates[0].get("content") or {}).get("parts") or []
+    return "".join(part.get("text", "") for part in parts) or None
+
+
+def _llama_text(data: Dict[str, Any]) -> Optional[str]:
+    if "generation" in data:
+        return data["generation"]
+    return _chat_text(data)
+
+
+# Text extractor for each model family's response format
+TEXT_EXTRACTORS: Dict[str, Callable[[Dict[str, Any]], Optional[str]]] = {
+    "openai": _chat_text,
+    "deepseek": _chat_text,
+    "qwen": _chat_text,
+    "claude": _claude_text,
+    "gemini": _gemini_text,
+    "llama": _llama_text,
+}
+
+
+def response_text(data: Dict[str, Any], family: str) -> Optional[str]:
+    """
+    Return the generated text of a response.
+
+    Args:
+        data (Dict[str, Any]): Parsed JSON response.
+        family (str): Model family, a key of ``TEXT_EXTRACTORS``.
+
+    Returns:
+        Optional[str]: The text, or None if the response carries none (e.g. only tool calls).
+    """
+    return TEXT_EXTRACTORS[family](data)
+
+
+class Usage(NamedTuple):
+    """Token usage of one response, normalized across families."""
+    prompt_tokens: int
+    completion_tokens: int
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
+
+
+def response_usage(data: Dict[str, Any]) -> Usage:
+    """
+    Return the token usage of a response in any family's format.
+
+    Args:
+        data (Dict[str, Any]): Parsed JSON response.
+
+    Returns:
+        Usage: Prompt and completion tokens; zero if the response reports none.
+    """
+    usage = data.get("usage")
+    if isinstance(usage, dict):
+        return Usage(
+            usage.get("prompt_tokens", usage.get("input_tokens", 0)),
+            usage.get("completion_tokens", usage.get("output_tokens", 0)),
+        )
+    usage = data.get("usageMetadata")
+    if isinstance(usage, dict):
+        return Usage(usage.get("promptTokenCount", 0), usage.get("candidatesTokenCount", 0))
+    return Usage(data.get("prompt_token_count", 0), data.get("generation_token_count", 0))
+
+
+class ToolCall(NamedTuple):
+    """A function call requested by the model."""
+    id: Optional[str]
+    name: str
+    arguments: Any
+
+
+# Fields shared by every family's parser: text, tool calls, finish reason,
+# prompt tokens, completion tokens
+Fields = Tuple[Optional[str], Tuple[ToolCall, ...], Optional[str], int, int]
+
+
+def _json_arguments(arguments: Any) -> Any:
+    # OpenAI-style tool arguments arrive as a JSON string
+    if isinstance(arguments, str):
+        try:
+            return loads(arguments)
+        except ValueError:
+            return arguments
+    return arguments
+
+
+def _chat_fields(data: Dict[str, Any]) -> Fields:
+    choices = data.get("choices") or [{}]
+    message = choices[0].get("message") or {}
+    calls = tuple(
+        ToolCall(call.get("id"), call["function"]["name"], _json_arguments(call["function"].get("arguments")))
+        for call in message.get("tool_calls") or ()
+    )
+    usage = data.get("usage") or {}
+    return (
+        message.get("content"),
+        calls,
+        choices[0].get("finish_reason"),
+        usage.get("prompt_tokens", 0),
+        usage.get("completion_tokens", 0),
+    )
+
+
+def _claude_fields(data: Dict[str, Any]) -> Fields:
+    blocks = data.get("content") or []
+    calls = tuple(
+        ToolCall(block.get("id"), block["name"], block.get("input"))
+        for block in blocks if block.get("type") == "tool_use"
+    )
+    usage = data.get("usage") or {}
+    return (
+        _claude_text(data),
+        calls,
+        data.get("stop_reason"),
+        usage.get("input_tokens", 0),
+        usage.get("output_tokens", 0),
+    )
+
+
+def _gemini_fields(data: Dict[str, Any]) -> Fields:
+    candidates = data.get("candidates") or [{}]
+    parts = (candidates[0].get("content") or {}).get("parts") or []
+    calls = tuple(
+        ToolCall(None, part["functionCall"]["name"], part["functionCall"].get("args"))
+        for part in parts if "functionCall" in part
+    )
+    usage = data.get("usageMetadata") or {}
+    return (
+        _gemini_text(data),
+        calls,
+        candidates[0].get("finishReason"),
+        usage.get("promptTokenCount", 0),
+        usage.get("candidatesTokenCount", 0),
+    )
+
+
+def _llama_fields(data: Dict[str, Any]) -> Fields:
+    if "generation" not in data:
+        return _chat_fields(data)
+    return (
+        data["generation"],
+        (),
+        data.get("stop_reason"),
+        data.get("prompt_token_count", 0),
+        data.get("generation_token_count", 0),
+    )
+
+
+# Field parser for each model family's response format
+FIELD_PARSERS: Dict[str, Callable[[Dict[str, Any]], Fields]] = {
+    "openai": _chat_fields,
+    "deepseek": _chat_fields,
+    "qwen": _chat_fields,
+    "claude": _claude_fields,
+    "gemini": _gemini_fields,
+    "llama": _llama_fields,
+}
+
+
+class Response:
+    """
+    A completion normalized across model families.
+
+    Only the fields callers need are kept as slots; the raw body is stored
+    as the bytes received and parsed again only when ``raw`` is read. A
+    response typically takes a fraction of the memory of its parsed dict.
+    """
+
+    __slots__ = ("family", "text", "tool_calls", "finish_reason", "prompt_tokens", "completion_tokens", "_body")
+
+    def __init__(
+        self,
+        family: str,
+        text: Optional[str],
+        tool_calls: Tuple[ToolCall, ...] = (),
+        finish_reason: Optional[str] = None,
+        prompt_tokens: int = 0,
+        completion_tokens: int = 0,
+        body: Optional[bytes] = None,
+    ) -> None:
+        self.family = family
+        self.text = text
+        self.tool_calls = tool_calls
+        self.finish_reason = finish_reason
+        self.prompt_tokens = prompt_tokens
+        self.completion_tokens = completion_tokens
+        self._body = body
+
+    @classmethod
+    def from_json(cls, data: Dict[str, Any], family: str, body: Optional[bytes] = None) -> "Response":
+        """
+        Build a response from a parsed JSON body.
+
+        Args:
+            data (Dict[str, Any]): Parsed JSON response.
+            family (str): Model family, a key of ``FIELD_PARSERS``.
+            body (Optional[bytes]): The raw body to keep for ``raw``; re-encoded from ``data`` if None.
+
+        Returns:
+            Response: The normalized response.
+        """
+        if body is None:
+            body = dumps(data)
+        return cls(family, *FIELD_PARSERS[family](data), body=body)
+
+    @classmethod
+    def from_http(cls, response: Any, family: str, keep_raw: bool = True) -> "Response":
+        """
+        Build a response from a ``requests`` or ``httpx`` response.
+
+        Args:
+            response (Any): A successful HTTP response with a JSON body.
+            family (str): Model family, a key of ``FIELD_PARSERS``.
+            keep_raw (bool): Keep the body bytes so ``raw`` stays available.
+
+        Returns:
+            Response: The normalized response.
+        """
+        body = response.content
+        return cls(family, *FIELD_PARSERS[family](loads(body)), body=body if keep_raw else None)
+
+    @property
+    def raw(self) -> Optional[Dict[str, Any]]:
+        """The full JSON response, parsed on each access; None if it was not kept."""
+        return loads(self._body) if self._body is not None else None
+
+    @property
+    def usage(self) -> Usage:
+        return Usage(self.prompt_tokens, self.completion_tokens)
+
+    def __repr__(self) -> str:
+        return (
+            f"Response(family={self.family!r}, text={self.text!r}, tool_calls={len(self.tool_calls)}, "
+            f"finish_reason={self.finish_reason!r}, usage={self.prompt_tokens}+{self.completion_tokens})"
+        )
+
+
+def parse_response(data: Dict[str, Any], family: str) -> Response:
+    """
+    Normalize a raw response dict returned by a wrapper.
+
+    Args:
+        data (Dict[str, Any]): Parsed JSON response.
+        family (str): Model family of the response.
+
+    Returns:
+        Response: The normalized response.
+    """
+    return Response.from_json(data, family)
@@ -0,0 +1,114 @@
+import random
+import time
+from typing import Optional, Dict, Tuple
+
+from .exceptions import DeadlineExceededError
+
+# Statuses treated as transient server errors
+RETRYABLE_SERVER_STATUSES: Tuple[int, ...] = (500, 502, 503, 504)
+
+
+class RetryPolicy:
+    """
+    Retry settings shared by the sync and async transports.
+
+    Each failure class (429, 5xx, timeouts, connection errors) has its own
+    retry budget. Delays use decorrelated jitter, a ``Retry-After`` header is
+    honoured when present, and no retry is attempted once it would end past
+    the overall deadline.
+
+    Example:
+        configure_transport(retry_policy=RetryPolicy(rate_limit_retries=8, deadline=300))
+    """
+
+    def __init__(
+        self,
+        rate_limit_retries: int = 5,
+        server_error_retries: int = 3,
+        timeout_retries: int = 2,
+        connection_retries: int = 3,
+        base_delay: float = 0.5,
+        max_delay: float = 20.0,
+        deadline: Optional[float] = 120.0,
+        server_error_statuses: Tuple[int, ...] = RETRYABLE_SERVER_STATUSES,
+    ) -> None:
+        """
+        Args:
+            rate_limit_retries (int): Retries after a 429 answer.
+            server_error_retries (int): Retries after a status in ``server_error_statuses``.
+            timeout_retries (int): Retries after a timeout.
+            connection_retries (int): Retries after a connection error.
+            base_delay (float): Minimum delay in seconds.
+            max_delay (float): Maximum jittered delay in seconds.
+            deadline (Optional[float]): Overall time budget in seconds, measured from the first attempt.
+            server_error_statuses (Tuple[int, ...]): Statuses treated as transient server errors.
+        """
+        self.max_retries: Dict[str, int] = {
+            "rate_limit": rate_limit_retries,
+            "server_error": server_error_retries,
+            "timeout": timeout_retries,
+            "connection": connection_retries,
+        }
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.deadline = deadline
+        self.server_error_statuses = frozenset(server_error_statuses)
+
+    def classify(self, status_code: int) -> Optional[str]:
+        """
+        Return the failure class of a status code, or None if it should not be retried.
+
+        Args:
+            status_code (int): HTTP status code.
+
+        Returns:
+            Optional[str]: ``"rate_limit"``, ``"server_error"`` or None.
+        """
+        if status_code == 429:
+            return "rate_limit"
+        if status_code in self.server_error_statuses:
+            return "server_error"
+        return None
+
+
+class RetryState:
+    """Attempt bookkeeping for a single request."""
+
+    def __init__(self, policy: RetryPolicy) -> None:
+        self.policy = policy
+        self.started = time.monotonic()
+        self.retries: Dict[str, int] = {}
+        self.previous_delay = policy.base_delay
+
+    def next_delay(self, kind: str, retry_after: Optional[float] = None) -> Optional[float]:
+        """
+        Decide whether to retry after a failure of class ``kind``.
+
+        Args:
+            kind (str): Failure class.
+            retry_after (Optional[float]): Server-requested delay in seconds, if any.
+
+        Returns:
+            Optional[float]: Seconds to wait before retrying, or None if the budget for ``kind`` is spent.
+
+        Raises:
+            DeadlineExceededError: If waiting would end past the policy's deadline.
+        """
+        policy = self.policy
+        count = self.retries.get(kind, 0)
+        if count >= policy.max_retries.get(kind, 0):
+            return None
+        self.retries[kind] = count + 1
+
+        # Decorrelated jitter: sleep = min(cap, uniform(base, previous * 3))
+        self.previous_delay = min(policy.max_delay, random.uniform(policy.base_delay, self.previous_delay * 3))
+        delay = retry_after if retry_after is not None else self.previous_delay
+
+        if policy.deadline is not None and time.monotonic() - self.started + delay > policy.deadline:
+            raise DeadlineExceededError(
+                f"Retrying after {kind} would exceed the {policy.deadline}s deadline"
+            )
+        return delay
+
+
+DEFAULT_RETRY_POLICY: RetryPolicy = RetryPolicy()
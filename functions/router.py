@@ -0,0 +1,253 @@
+import threading
+import time
+from typing import Optional, Dict, List, Any, Sequence, Tuple, NamedTuple
+
+from .builders import REQUEST_BUILDERS
+from .codec import response_json
+from .exceptions import AllDeploymentsFailedError
+from .registry import get_model
+from .responses import response_text
+
+# Penalty applied to a deployment's latency score per unit of recent error rate
+ERROR_PENALTY: float = 4.0
+
+# 4xx statuses that reflect the deployment's state rather than the request, so they fail over
+FAILOVER_CLIENT_STATUSES: Tuple[int, ...] = (408, 429)
+
+
+def is_caller_error(error: BaseException) -> bool:
+    """
+    Whether a failed call was rejected because of the request itself.
+
+    Such a request would fail on every deployment, so it is raised instead
+    of failed over and does not count against the deployment's health.
+
+    Args:
+        error (BaseException): The exception raised by the call.
+
+    Returns:
+        bool: True for a 4xx answer other than ``FAILOVER_CLIENT_STATUSES``.
+    """
+    status = getattr(getattr(error, "response", None), "status_code", None)
+    return status is not None and 400 <= status < 500 and status not in FAILOVER_CLIENT_STATUSES
+
+
+class RoutedResponse(NamedTuple):
+    """Result of a routed call."""
+    model: str
+    text: Optional[str]
+    data: Dict[str, Any]
+    latency: float
+    attempts: int
+
+
+class DeploymentHealth:
+    """
+    Rolling statistics and circuit breaker state of one deployment.
+
+    Latency and error rate are exponentially weighted moving averages. After
+    ``failure_threshold`` consecutive failures the breaker opens and the
+    deployment is skipped for ``cooldown`` seconds; then a single probe call
+    is let through, which closes the breaker on success or reopens it.
+    """
+
+    __slots__ = ("latency", "error_rate", "failures", "opened_at", "probing", "inflight")
+
+    def __init__(self) -> None:
+        self.latency: Optional[float] = None
+        self.error_rate = 0.0
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.probing = False
+        self.inflight = 0
+
+    def available(self, now: float, cooldown: float) -> bool:
+        if self.opened_at is None:
+            return True
+        return not self.probing and now - self.opened_at >= cooldown
+
+    def score(self) -> float:
+        # Untried deployments score 0 so every pool member gets measured
+        if self.latency is None:
+            return 0.0
+        return self.latency * (1 + self.inflight) * (1 + ERROR_PENALTY * self.error_rate)
+
+
+class Router:
+    """
+    Send each call to the best healthy deployment of an equivalent pool.
+
+    Candidates are ordered by EWMA latency (scaled by in-flight calls and
+    recent errors); deployments with an open circuit breaker are skipped.
+    A failed call fails over to the next candidate; a request the
+    deployment rejected as invalid (see ``is_caller_error``) is raised
+    instead. Each attempt still goes through the shared transport, so its
+    retry policy runs before failing over; configure a short ``deadline``
+    there for fast failover.
+
+    Example:
+        router = Router(["gpt-4-o-mini", "claude-3-haiku", "gemini-1.5-flash"])
+        router("Summarise this paragraph: ...").text
+    """
+
+    def __init__(
+        self,
+        pool: Sequence[str],
+        alpha: float = 0.2,
+        failure_threshold: int = 3,
+        cooldown: float = 30.0,
+        timeout: Optional[float] = 30.0,
+    ) -> None:
+        """
+        Args:
+            pool (Sequence[str]): Deployment names that can serve the same request.
+            alpha (float): EWMA weight of the newest sample.
+            failure_threshold (int): Consecutive failures that open a deployment's breaker.
+            cooldown (float): Seconds an open breaker waits before letting a probe through.
+            timeout (Optional[float]): Per-attempt request timeout in seconds.
+
+        Raises:
+            ValueError: If a deployment is not in the model registry.
+        """
+        self.families: Dict[str, str] = {}
+        for model in pool:
+            spec = get_model(model)
+            if spec is None or spec.family not in REQUEST_BUILDERS:
+                raise ValueError(f"Model {model} not found in model registry")
+            self.families[model] = spec.family
+        self.pool: List[str] = list(pool)
+        self.alpha = alpha
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.timeout = timeout
+        self.health: Dict[str, DeploymentHealth] = {model: DeploymentHealth() for model in self.pool}
+        self._lock = threading.Lock()
+
+    def candidates(self) -> List[str]:
+        """
+        Return the deployments to try, best first.
+
+        If every breaker is open, all deployments are returned, the one that
+        opened longest ago first, rather than failing without trying.
+
+        Returns:
+            List[str]: Deployment names.
+        """
+        now = time.monotonic()
+        with self._lock:
+            ready = [m for m in self.pool if self.health[m].available(now, self.cooldown)]
+            if not ready:
+                return sorted(self.pool, key=lambda m: self.health[m].opened_at or 0.0)
+            return sorted(ready, key=lambda m: self.health[m].score())
+
+    def _begin(self, model: str) -> None:
+        with self._lock:
+            health = self.health[model]
+            health.inflight += 1
+            if health.opened_at is not None:
+                health.probing = True
+
+    def _release(self, model: str) -> None:
+        # The call never reached the deployment, so its health is unchanged
+        with self._lock:
+            health = self.health[model]
+            health.inflight -= 1
+            health.probing = False
+
+    def _record(self, model: str, latency: Optional[float]) -> None:
+        # latency is None for a failed call
+        alpha = self.alpha
+        with self._lock:
+            health = self.health[model]
+            health.inflight -= 1
+            health.probing = False
+            failed = latency is None
+            health.error_rate = (1 - alpha) * health.error_rate + alpha * failed
+            if failed:
+                health.failures += 1
+                if health.opened_at is not None or health.failures >= self.failure_threshold:
+                    health.opened_at = time.monotonic()
+                return
+            health.failures = 0
+            health.opened_at = None
+            health.latency = latency if health.latency is None else (1 - alpha) * health.latency + alpha * latency
+
+    def __call__(
+        self,
+        message: str,
+        system_message: Optional[str] = None,
+        temperature: float = 0,
+        max_tokens: int = 100,
+    ) -> RoutedResponse:
+        """
+        Send a chat request to the best available deployment, failing over on errors.
+
+        Args:
+            message (str): User message content.
+            system_message (Optional[str]): Optional system message to set context.
+            temperature (float): Sampling temperature.
+            max_tokens (int): Maximum tokens in the response.
+
+        Returns:
+            RoutedResponse: The serving deployment, response text, raw response and latency.
+
+        Raises:
+            AllDeploymentsFailedError: If every candidate failed.
+            HKBUClientError: If the request itself is invalid, e.g. too long for the context window.
+            requests.exceptions.HTTPError: If a deployment rejected the request with a 4xx other
+                than 408 or 429.
+        """
+        import requests
+        from .transport import get_transport
+
+        errors: Dict[str, BaseException] = {}
+        for attempt, model in enumerate(self.candidates(), start=1):
+            family = self.families[model]
+            url, headers, payload = REQUEST_BUILDERS[family](message, model, system_message, temperature, max_tokens)
+            self._begin(model)
+            start = time.monotonic()
+            latency: Optional[float] = None
+            failed = False
+            try:
+                response = get_transport().post(url, deployment=model, json=payload, headers=headers, timeout=self.timeout)
+                response.raise_for_status()
+                data = response_json(response)
+                latency = time.monotonic() - start
+            except requests.exceptions.RequestException as e:
+                if is_caller_error(e):
+                    raise
+                failed = True
+                errors[model] = e
+            finally:
+                # Anything else (client errors, hooks, interrupts) says nothing about the deployment
+                if failed or latency is not None:
+                    self._record(model, latency)
+                else:
+                    self._release(model)
+            if failed:
+                continue
+            return RoutedResponse(model, response_text(data, family), data, latency, attempt)
+
+        raise AllDeploymentsFailedError(
+            "All deployments failed: " + "; ".join(f"{m}: {e}" for m, e in errors.items()), errors
+        )
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Snapshot of each deployment's statistics.
+
+        Returns:
+            Dict[str, Dict[str, Any]]: Latency EWMA, error rate, consecutive failures and breaker state.
+        """
+        now = time.monotonic()
+        with self._lock:
+            return {
+                model: {
+                    "latency": health.latency,
+                    "error_rate": health.error_rate,
+                    "failures": health.failures,
+                    "circuit": "closed" if health.opened_at is None
+                    else ("half-open" if now - health.opened_at >= self.cooldown else "open"),
+                }
+                for model, health in self.health.items()
+            }
@@ -0,0 +1,269 @@
+import json
+import re
+import threading
+from typing import Optional, Dict, List, Any, Callable, Union
+
+# Validator of one schema node: (value, path, errors) -> appends error messages
+Check = Callable[[Any, str, List[str]], None]
+
+_TYPE_CHECKS: Dict[str, Callable[[Any], bool]] = {
+    "object": lambda v: isinstance(v, dict),
+    "array": lambda v: isinstance(v, list),
+    "string": lambda v: isinstance(v, str),
+    "integer": lambda v: isinstance(v, int) and not isinstance(v, bool)
+    or isinstance(v, float) and v.is_integer(),
+    "number": lambda v: isinstance(v, (int, float)) and not isinstance(v, bool),
+    "boolean": lambda v: isinstance(v, bool),
+    "null": lambda v: v is None,
+}
+
+
+class CompiledSchema:
+    """
+    A JSON schema compiled once into a tree of validator closures.
+
+    Supports the subset used for structured outputs by OpenAI, Gemini
+    (OpenAPI-style upper-case types and ``nullable``) and tool definitions:
+    ``type``, ``enum``, ``const``, ``properties``, ``required``,
+    ``additionalProperties``, ``items``, ``min/maxItems``, ``min/maxLength``,
+    ``pattern``, ``minimum``/``maximum`` and their exclusive forms,
+    ``anyOf``/``oneOf``/``allOf`` and local ``$ref``s into ``$defs`` or
+    ``definitions``. Other keywords (``format``, ``description``, ...) are
+    ignored.
+    """
+
+    def __init__(self, schema: Dict[str, Any]) -> None:
+        """
+        Args:
+            schema (Dict[str, Any]): The JSON schema.
+        """
+        self.schema = schema
+        self._refs: Dict[str, Check] = {}
+        self._check = self._compile(schema)
+
+    def errors(self, value: Any) -> List[str]:
+        """
+        Validate ``value`` and return every violation.
+
+        Args:
+            value (Any): Parsed JSON value.
+
+        Returns:
+            List[str]: Messages prefixed with the JSON path of the offending value; empty if valid.
+        """
+        errors: List[str] = []
+        self._check(value, "$", errors)
+        return errors
+
+    def is_valid(self, value: Any) -> bool:
+        """Return whether ``value`` matches the schema."""
+        return not self.errors(value)
+
+    def _resolve(self, ref: str) -> Check:
+        check = self._refs.get(ref)
+        if check is not None:
+            return check
+        if not ref.startswith("#/"):
+            raise ValueError(f"Only local $refs are supported, got {ref!r}")
+        node: Any = self.schema
+        for part in ref[2:].split("/"):
+            node = node[part.replace("~1", "/").replace("~0", "~")]
+
+        # Recursive schemas refer to themselves; bind lazily through the table
+        def deferred(value: Any, path: str, errors: List[str]) -> None:
+            self._refs[ref](value, path, errors)
+
+        self._refs[ref] = deferred
+        self._refs[ref] = self._compile(node)
+        return deferred
+
+    def _compile(self, schema: Any) -> Check:
+        if schema is True or schema == {}:
+            return lambda value, path, errors: None
+        if schema is False:
+            return lambda value, path, errors: errors.append(f"{path}: no value is allowed here")
+        if "$ref" in schema:
+            return self._resolve(schema["$ref"])
+
+        checks: List[Check] = []
+        types = schema.get("type")
+        if types is not None:
+            names = [t.lower() for t in ([types] if isinstance(types, str) else types)]
+            if schema.get("nullable"):
+                names.append("null")
+            tests = [_TYPE_CHECKS[name] for name in names]
+            expected = " or ".join(names)
+
+            def check_type(value: Any, path: str, errors: List[str]) -> None:
+                for test in tests:
+                    if test(value):
+                        return
+                errors.append(f"{path}: expected {expected}, got {type(value).__name__}")
+
+            checks.append(check_type)
+
+        if "enum" in schema:
+            options = schema["enum"]
+
+            def check_enum(value: Any, path: str, errors: List[str]) -> None:
+                if value not in options:
+                    errors.append(f"{path}: {value!r} is not one of {options!r}")
+
+            checks.append(check_enum)
+
+        if "const" in schema:
+            const = schema["const"]
+
+            def check_const(value: Any, path: str, errors: List[str]) -> None:
+                if value != const:
+                    errors.append(f"{path}: expected {const!r}")
+
+            checks.append(check_const)
+
+        if "properties" in schema or "required" in schema or "additionalProperties" in schema:
+            checks.append(self._compile_object(schema))
+
+        if "items" in schema or "minItems" in schema or "maxItems" in schema:
+            checks.append(self._compile_array(schema))
+
+        if "minLength" in schema or "maxLength" in schema or "pattern" in schema:
+            checks.append(_compile_string(schema))
+
+        if any(key in schema for key in ("minimum", "maximum", "exclusiveMinimum", "exclusiveMaximum")):
+            checks.append(_compile_number(schema))
+
+        for keyword in ("anyOf", "oneOf", "allOf"):
+            if keyword in schema:
+                checks.append(self._compile_combinator(keyword, schema[keyword]))
+
+        if len(checks) == 1:
+            return checks[0]
+
+        def check_all(value: Any, path: str, errors: List[str]) -> None:
+            for check in checks:
+                check(value, path, errors)
+
+        return check_all
+
+    def _compile_object(self, schema: Dict[str, Any]) -> Check:
+        properties = {name: self._compile(sub) for name, sub in (schema.get("properties") or {}).items()}
+        required = list(schema.get("required") or ())
+        additional = schema.get("additionalProperties", True)
+        extra: Optional[Check] = None if additional is True else self._compile(additional)
+
+        def check_object(value: Any, path: str, errors: List[str]) -> None:
+            if not isinstance(value, dict):
+                return
+            for name in required:
+                if name not in value:
+                    errors.append(f"{path}: missing required property {name!r}")
+            for name, item in value.items():
+                check = properties.get(name)
+                if check is not None:
+                    check(item, f"{path}.{name}", errors)
+                elif extra is not None:
+                    extra(item, f"{path}.{name}", errors)
+
+        return check_object
+
+    def _compile_array(self, schema: Dict[str, Any]) -> Check:
+        items = self._compile(schema["items"]) if "items" in schema else None
+        min_items = schema.get("minItems")
+        max_items = schema.get("maxItems")
+
+        def check_array(value: Any, path: str, errors: List[str]) -> None:
+            if not isinstance(value, list):
+                return
+            if min_items is not None and len(value) < min_items:
+                errors.append(f"{path}: expected at least {min_items} items")
+            if max_items is not None and len(value) > max_items:
+                errors.append(f"{path}: expected at most {max_items} items")
+            if items is not None:
+                for index, item in enumerate(value):
+                    items(item, f"{path}[{index}]", errors)
+
+        return check_array
+
+    def _compile_combinator(self, keyword: str, subschemas: List[Any]) -> Check:
+        compiled = [self._compile(sub) for sub in subschemas]
+
+        def check_combinator(value: Any, path: str, errors: List[str]) -> None:
+            matches = 0
+            failures: List[str] = []
+            for check in compiled:
+                sub_errors: List[str] = []
+                check(value, path, sub_errors)
+                if sub_errors:
+                    failures.extend(sub_errors)
+                else:
+                    matches += 1
+            if keyword == "allOf":
+                errors.extend(failures)
+            elif keyword == "anyOf" and not matches:
+                errors.append(f"{path}: matches none of anyOf ({'; '.join(failures)})")
+            elif keyword == "oneOf" and matches != 1:
+                errors.append(f"{path}: matches {matches} of oneOf, expected exactly 1")
+
+        return check_combinator
+
+
+def _compile_string(schema: Dict[str, Any]) -> Check:
+    min_length = schema.get("minLength")
+    max_length = schema.get("maxLength")
+    pattern = re.compile(schema["pattern"]) if "pattern" in schema else None
+
+    def check_string(value: Any, path: str, errors: List[str]) -> None:
+        if not isinstance(value, str):
+            return
+        if min_length is not None and len(value) < min_length:
+            errors.append(f"{path}: shorter than {min_length} characters")
+        if max_length is not None and len(value) > max_length:
+            errors.append(f"{path}: longer than {max_length} characters")
+        if pattern is not None and not pattern.search(value):
+            errors.append(f"{path}: does not match {pattern.pattern!r}")
+
+    return check_string
+
+
+def _compile_number(schema: Dict[str, Any]) -> Check:
+    bounds = [
+        (schema.get("minimum"), lambda v, b: v >= b, ">="),
+        (schema.get("maximum"), lambda v, b: v <= b, "<="),
+        (schema.get("exclusiveMinimum"), lambda v, b: v > b, ">"),
+        (schema.get("exclusiveMaximum"), lambda v, b: v < b, "<"),
+    ]
+    bounds = [bound for bound in bounds if isinstance(bound[0], (int, float)) and not isinstance(bound[0], bool)]
+
+    def check_number(value: Any, path: str, errors: List[str]) -> None:
+        if not isinstance(value, (int, float)) or isinstance(value, bool):
+            return
+        for limit, test, op in bounds:
+            if not test(value, limit):
+                errors.append(f"{path}: expected {op} {limit}, got {value}")
+
+    return check_number
+
+
+_compiled: Dict[str, CompiledSchema] = {}
+_compiled_lock = threading.Lock()
+
+
+def compile_schema(schema: Union[Dict[str, Any], CompiledSchema]) -> CompiledSchema:
+    """
+    Compile a JSON schema, reusing an earlier compilation of an equal schema.
+
+    Args:
+        schema (Union[Dict[str, Any], CompiledSchema]): The schema, or an already compiled one.
+
+    Returns:
+        CompiledSchema: The compiled schema.
+    """
+    if isinstance(schema, CompiledSchema):
+        return schema
+    key = json.dumps(schema, sort_keys=True, separators=(",", ":"))
+    compiled = _compiled.get(key)
+    if compiled is None:
+        compiled = CompiledSchema(schema)
+        with _compiled_lock:
+            compiled = _compiled.setdefault(key, compiled)
+    return compiled
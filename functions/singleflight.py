@@ -0,0 +1,105 @@
+import asyncio
+import threading
+from typing import Optional, Dict, Any, Callable, Awaitable, Tuple
+
+
+class _Call:
+    __slots__ = ("event", "result", "error")
+
+    def __init__(self) -> None:
+        self.event = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """
+    Collapse concurrent calls with the same key into one execution (threaded path).
+
+    The first caller for a key runs the function; callers arriving while it is
+    in flight wait and receive the same result or exception.
+    """
+
+    def __init__(self) -> None:
+        self._calls: Dict[str, _Call] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """
+        Run ``fn`` unless a call with ``key`` is already in flight.
+
+        Args:
+            key (str): Deduplication key.
+            fn (Callable[[], Any]): The call to run.
+
+        Returns:
+            Tuple[Any, bool]: The result and whether it was shared from another caller.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.event.set()
+        return call.result, False
+
+
+class AsyncSingleFlight:
+    """Async version of ``SingleFlight`` for callers on one event loop."""
+
+    def __init__(self) -> None:
+        self._calls: Dict[str, "asyncio.Future[Any]"] = {}
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """
+        Await ``fn()`` unless a call with ``key`` is already in flight.
+
+        Args:
+            key (str): Deduplication key.
+            fn (Callable[[], Awaitable[Any]]): The call to run.
+
+        Returns:
+            Tuple[Any, bool]: The result and whether it was shared from another caller.
+        """
+        future = self._calls.get(key)
+        while future is not None:
+            try:
+                # Shield so a cancelled follower doesn't cancel the shared call
+                return await asyncio.shield(future), True
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    raise
+                # The leader was cancelled, not us: make the call ourselves
+                future = self._calls.get(key)
+
+        future = self._calls[key] = asyncio.get_running_loop().create_future()
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # Mark the exception as retrieved in case nobody else was waiting
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+        finally:
+            del self._calls[key]
+        return result, False
@@ -0,0 +1,172 @@
+from typing import Optional, Dict, Any, Callable, Iterable, Iterator, AsyncIterable, AsyncIterator
+
+from .codec import loads
+
+# Sentinel sent by chat/completions style endpoints after the last chunk
+DONE_MARKER: str = "[DONE]"
+
+
+def iter_sse(lines: Iterable[str]) -> Iterator[str]:
+    """
+    Parse a server-sent-event stream into the ``data`` payload of each event.
+
+    Args:
+        lines (Iterable[str]): Decoded lines of the response body, without line terminators.
+
+    Yields:
+        str: The (possibly multi-line) data of each event.
+    """
+    data = []
+    for line in lines:
+        if not line:
+            # A blank line dispatches the event collected so far
+            if data:
+                yield "\n".join(data)
+                data = []
+            continue
+        if line.startswith(":"):
+            continue
+        field, _, value = line.partition(":")
+        if field == "data":
+            data.append(value[1:] if value.startswith(" ") else value)
+    if data:
+        yield "\n".join(data)
+
+
+async def aiter_sse(lines: AsyncIterable[str]) -> AsyncIterator[str]:
+    """
+    Async version of ``iter_sse``.
+
+    Args:
+        lines (AsyncIterable[str]): Decoded lines of the response body.
+
+    Yields:
+        str: The data of each event.
+    """
+    data = []
+    async for line in lines:
+        if not line:
+            if data:
+                yield "\n".join(data)
+                data = []
+            continue
+        if line.startswith(":"):
+            continue
+        field, _, value = line.partition(":")
+        if field == "data":
+            data.append(value[1:] if value.startswith(" ") else value)
+    if data:
+        yield "\n".join(data)
+
+
+def _chat_delta(event: Dict[str, Any]) -> Optional[str]:
+    choices = event.get("choices") or []
+    if not choices:
+        return None
+    return (choices[0].get("delta") or {}).get("content")
+
+
+def _claude_delta(event: Dict[str, Any]) -> Optional[str]:
+    if event.get("type") != "content_block_delta":
+        return None
+    return event.get("delta", {}).get("text")
+
+
+def _gemini_delta(event: Dict[str, Any]) -> Optional[str]:
+    candidates = event.get("candidates") or []
+    if not candidates:
+        return None
+    parts = (candidates[0].get("content") or {}).get("parts") or []
+    return "".join(part.get("text", "") for part in parts) or None
+
+
+def _llama_delta(event: Dict[str, Any]) -> Optional[str]:
+    if "generation" in event:
+        return event["generation"]
+    return _chat_delta(event)
+
+
+# Text delta extractor for each model family's streaming chunk format
+DELTA_EXTRACTORS: Dict[str, Callable[[Dict[str, Any]], Optional[str]]] = {
+    "openai": _chat_delta,
+    "deepseek": _chat_delta,
+    "qwen": _chat_delta,
+    "claude": _claude_delta,
+    "gemini": _gemini_delta,
+    "llama": _llama_delta,
+}
+
+
+def iter_events(response: Any) -> Iterator[Dict[str, Any]]:
+    """
+    Iterate over the JSON events of a streamed ``requests`` response.
+
+    The response is closed once the stream is exhausted or the iterator is discarded.
+
+    Args:
+        response (requests.Response): A response obtained with ``stream=True``.
+
+    Yields:
+        Dict[str, Any]: Each decoded event.
+    """
+    if response.encoding is None:
+        response.encoding = "utf-8"
+    try:
+        for data in iter_sse(response.iter_lines(chunk_size=None, decode_unicode=True)):
+            if data == DONE_MARKER:
+                break
+            yield loads(data)
+    finally:
+        response.close()
+
+
+def iter_deltas(response: Any, family: str) -> Iterator[str]:
+    """
+    Iterate over the text deltas of a streamed ``requests`` response.
+
+    Args:
+        response (requests.Response): A response obtained with ``stream=True``.
+        family (str): Model family, a key of ``DELTA_EXTRACTORS``.
+
+    Yields:
+        str: Each non-empty text delta, as soon as it arrives.
+    """
+    extract = DELTA_EXTRACTORS[family]
+    for event in iter_events(response):
+        delta = extract(event)
+        if delta:
+            yield delta
+
+
+async def aiter_events(response: Any) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Iterate over the JSON events of a streamed ``httpx`` response.
+
+    Args:
+        response (httpx.Response): A response whose body has not been read yet.
+
+    Yields:
+        Dict[str, Any]: Each decoded event.
+    """
+    async for data in aiter_sse(response.aiter_lines()):
+        if data == DONE_MARKER:
+            break
+        yield loads(data)
+
+
+async def aiter_deltas(response: Any, family: str) -> AsyncIterator[str]:
+    """
+    Iterate over the text deltas of a streamed ``httpx`` response.
+
+    Args:
+        response (httpx.Response): A response whose body has not been read yet.
+        family (str): Model family, a key of ``DELTA_EXTRACTORS``.
+
+    Yields:
+        str: Each non-empty text delta, as soon as it arrives.
+    """
+    extract = DELTA_EXTRACTORS[family]
+    async for event in aiter_events(response):
+        delta = extract(event)
+        if delta:
+            yield delta
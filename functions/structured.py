@@ -0,0 +1,361 @@
+import json
+from typing import Optional, Dict, Any, Iterator, Tuple, Union
+
+from .codec import response_json
+from .exceptions import StructuredOutputError
+from .partial_json import IncrementalJSONParser, PartialJSONError
+from .registry import get_model
+from .responses import response_text
+from .schema import CompiledSchema, compile_schema
+from .streaming import iter_deltas
+
+# Families whose API enforces a JSON schema; the others are asked for JSON in
+# the system prompt and validated on our side only
+NATIVE_SCHEMA_FAMILIES = ("openai", "deepseek", "gemini")
+
+# Key under which a non-object output is wrapped for APIs that require an object root
+WRAPPER_KEY = "value"
+
+# Schema keywords Gemini's OpenAPI-style response_schema accepts
+_GEMINI_KEYWORDS = frozenset({
+    "type", "format", "description", "nullable", "enum", "properties", "required", "items",
+    "minItems", "maxItems", "propertyOrdering",
+})
+
+
+def gemini_schema(schema: Dict[str, Any], defs: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Convert a JSON schema to the OpenAPI subset Gemini's ``response_schema`` accepts.
+
+    Local ``$ref``s are inlined, ``anyOf`` with ``null`` becomes ``nullable``,
+    and unsupported keywords such as ``additionalProperties`` are dropped.
+
+    Args:
+        schema (Dict[str, Any]): JSON schema.
+        defs (Optional[Dict[str, Any]]): ``$defs`` of the root schema (set on recursion).
+
+    Returns:
+        Dict[str, Any]: Gemini schema.
+    """
+    if defs is None:
+        defs = dict(schema.get("definitions") or {}, **(schema.get("$defs") or {}))
+    if "$ref" in schema:
+        return gemini_schema(defs[schema["$ref"].rsplit("/", 1)[-1]], defs)
+    options = schema.get("anyOf") or schema.get("oneOf")
+    if options:
+        non_null = [option for option in options if option.get("type") != "null"]
+        converted = gemini_schema(non_null[0], defs) if len(non_null) == 1 else {}
+        if len(non_null) < len(options):
+            converted["nullable"] = True
+        return converted
+    out: Dict[str, Any] = {}
+    for key, value in schema.items():
+        if key not in _GEMINI_KEYWORDS:
+            continue
+        if key == "type":
+            if isinstance(value, list):
+                if "null" in value:
+                    out["nullable"] = True
+                value = next((t for t in value if t != "null"), "string")
+            out["type"] = value.upper()
+        elif key == "properties":
+            out[key] = {name: gemini_schema(sub, defs) for name, sub in value.items()}
+        elif key == "items":
+            out[key] = gemini_schema(value, defs)
+        else:
+            out[key] = value
+    return out
+
+
+def strict_schema(schema: Any) -> Any:
+    """
+    Make a JSON schema acceptable to OpenAI's strict ``json_schema`` mode.
+
+    Strict mode requires every object to set ``additionalProperties`` to
+    false and to list all of its properties as required, so every object
+    node, including those in ``$defs``, ``items`` and combinators, is changed
+    that way. The input is not modified.
+
+    Args:
+        schema (Any): JSON schema (or a sub-schema on recursion).
+
+    Returns:
+        Any: The normalized schema.
+    """
+    if isinstance(schema, list):
+        return [strict_schema(item) for item in schema]
+    if not isinstance(schema, dict):
+        return schema
+    out = {}
+    for key, value in schema.items():
+        if key in ("properties", "$defs", "definitions"):
+            out[key] = {name: strict_schema(sub) for name, sub in value.items()}
+        elif key in ("items", "anyOf", "oneOf", "allOf", "not"):
+            out[key] = strict_schema(value)
+        else:
+            out[key] = value
+    if out.get("type") == "object" or "properties" in out:
+        out["additionalProperties"] = False
+        out["required"] = list(out.get("properties") or {})
+    return out
+
+
+def strip_code_fence(text: str) -> str:
+    """Remove a surrounding Markdown code fence (e.g. ```json ... ```) from model output."""
+    stripped = text.strip()
+    if stripped.startswith("```"):
+        stripped = stripped.split("\n", 1)[1] if "\n" in stripped else ""
+        if stripped.rstrip().endswith("```"):
+            stripped = stripped.rstrip()[:-3]
+    return stripped
+
+
+class StructuredOutput:
+    """
+    Request JSON that matches a schema from any model family and return it parsed and validated.
+
+    The schema is compiled once, and equal schemas share one compilation.
+    OpenAI and DeepSeek deployments get a ``json_schema`` response format,
+    Gemini a converted ``response_schema``, and the other families an
+    instruction in the system prompt. Every family's reply is validated
+    against the compiled schema. ``stream`` yields the partial object while
+    it arrives. With ``strict``, OpenAI-style APIs enforce the schema
+    themselves; this makes every property of every object required.
+
+    Example:
+        recipes = StructuredOutput({"type": "array", "items": {...}}, name="recipes")
+        recipes("List a few popular cookie recipes", model_name="gemini-1.5-flash")
+        for partial in recipes.stream("List a few popular cookie recipes", model_name="gpt-4-o-mini"):
+            render(partial)
+    """
+
+    def __init__(self, schema: Union[Dict[str, Any], CompiledSchema], name: str = "response", strict: bool = False) -> None:
+        """
+        Args:
+            schema (Union[Dict[str, Any], CompiledSchema]): JSON schema of the expected output.
+            name (str): Schema name sent to OpenAI-style APIs.
+            strict (bool): Ask OpenAI-style APIs to enforce the schema strictly; the schema
+                sent to them is normalized with ``strict_schema``.
+        """
+        self.compiled = compile_schema(schema)
+        self.schema = self.compiled.schema
+        self.name = name
+        self.strict = strict
+        self._gemini_schema: Optional[Dict[str, Any]] = None
+        self._instruction: Optional[str] = None
+        # OpenAI-style json_schema formats need an object at the root
+        self._wrapped = self.schema.get("type") != "object"
+        root = self.schema
+        if self._wrapped:
+            root = {"type": "object", "properties": {WRAPPER_KEY: root}, "required": [WRAPPER_KEY], "additionalProperties": False}
+        if strict:
+            root = strict_schema(root)
+        self._response_format = {"type": "json_schema", "json_schema": {"name": name, "schema": root, "strict": strict}}
+
+    def _system_prompt(self, system_message: Optional[str]) -> str:
+        if self._instruction is None:
+            self._instruction = (
+                "Respond only with a JSON value, without any other text, that matches this JSON schema:\n"
+                + json.dumps(self.schema, separators=(",", ":"))
+            )
+        return f"{system_message}\n\n{self._instruction}" if system_message else self._instruction
+
+    def build_request(
+        self,
+        message: str,
+        model_name: str = "gpt-4-o-mini",
+        system_message: Optional[str] = None,
+        temperature: float = 0.0,
+        max_tokens: int = 1024,
+        stream: bool = False,
+    ) -> Tuple[str, Dict[str, str], Dict[str, Any]]:
+        """
+        Build the URL, headers and payload of a structured-output request.
+
+        Args:
+            message (str): User message content.
+            model_name (str): Deployment of any family in the model registry.
+            system_message (Optional[str]): Optional system message to set context.
+            temperature (float): Sampling temperature.
+            max_tokens (int): Maximum tokens in the response.
+            stream (bool): Whether to stream the response.
+
+        Returns:
+            Tuple[str, Dict[str, str], Dict[str, Any]]: The request URL, headers and payload.
+
+        Raises:
+            ValueError: If the model is not in the model registry.
+        """
+        from .builders import REQUEST_BUILDERS
+
+        spec = get_model(model_name)
+        if spec is None or spec.family not in REQUEST_BUILDERS:
+            raise ValueError(f"Model {model_name} not found in model registry")
+        family = spec.family
+        if family not in NATIVE_SCHEMA_FAMILIES:
+            system_message = self._system_prompt(system_message)
+        url, headers, payload = REQUEST_BUILDERS[family](message, model_name, system_message, temperature, max_tokens)
+        if family == "gemini":
+            if self._gemini_schema is None:
+                self._gemini_schema = gemini_schema(self.schema)
+            payload["generationConfig"]["response_mime_type"] = "application/json"
+            payload["generationConfig"]["response_schema"] = self._gemini_schema
+        elif family in NATIVE_SCHEMA_FAMILIES:
+            payload["response_format"] = self._response_format
+        if stream:
+            payload["stream"] = True
+        return url, headers, payload
+
+    def validate(self, value: Any) -> Any:
+        """
+        Check a parsed value against the schema.
+
+        Args:
+            value (Any): Parsed JSON value.
+
+        Returns:
+            Any: ``value`` unchanged.
+
+        Raises:
+            StructuredOutputError: If the value does not match the schema.
+        """
+        errors = self.compiled.errors(value)
+        if errors:
+            raise StructuredOutputError("Output does not match the schema: " + "; ".join(errors), value, errors)
+        return value
+
+    def _unwrap(self, value: Any, family: Optional[str]) -> Any:
+        if self._wrapped and family in ("openai", "deepseek") and isinstance(value, dict):
+            return value.get(WRAPPER_KEY)
+        return value
+
+    def parse(self, text: Optional[str], family: Optional[str] = None) -> Any:
+        """
+        Parse and validate model output text.
+
+        Args:
+            text (Optional[str]): The model's reply, optionally inside a Markdown code fence.
+            family (Optional[str]): Model family that produced it, to undo its request-side wrapping.
+
+        Returns:
+            Any: The validated value.
+
+        Raises:
+            StructuredOutputError: If the text is not JSON or does not match the schema.
+        """
+        if text is None:
+            raise StructuredOutputError("The response contains no text")
+        try:
+            value = json.loads(strip_code_fence(text))
+        except ValueError as e:
+            raise StructuredOutputError(f"Output is not valid JSON: {e}") from e
+        return self.validate(self._unwrap(value, family))
+
+    def parse_response(self, data: Dict[str, Any], family: str) -> Any:
+        """
+        Extract, parse and validate the structured output of a raw API response.
+
+        Args:
+            data (Dict[str, Any]): Parsed JSON response.
+            family (str): Model family of the response.
+
+        Returns:
+            Any: The validated value.
+        """
+        return self.parse(response_text(data, family), family)
+
+    def __call__(
+        self,
+        message: str,
+        model_name: str = "gpt-4-o-mini",
+        system_message: Optional[str] = None,
+        temperature: float = 0.0,
+        max_tokens: int = 1024,
+        timeout: Optional[float] = 60,
+    ) -> Any:
+        """
+        Send a structured-output request and return the validated value.
+
+        Args:
+            Same as ``build_request``, plus ``timeout`` in seconds.
+
+        Returns:
+            Any: The validated value.
+
+        Raises:
+            StructuredOutputError: If the output is not valid JSON or does not match the schema.
+            requests.exceptions.RequestException: If the request fails.
+        """
+        from .transport import get_transport
+
+        url, headers, payload = self.build_request(message, model_name, system_message, temperature, max_tokens)
+        response = get_transport().post(url, deployment=model_name, json=payload, headers=headers, timeout=timeout)
+        response.raise_for_status()
+        return self.parse_response(response_json(response), get_model(model_name).family)
+
+    def stream(
+        self,
+        message: str,
+        model_name: str = "gpt-4-o-mini",
+        system_message: Optional[str] = None,
+        temperature: float = 0.0,
+        max_tokens: int = 1024,
+        timeout: Optional[float] = 60,
+    ) -> Iterator[Any]:
+        """
+        Stream a structured-output request, yielding the partial value as it grows.
+
+        The yielded object is the same live dict or list each time, filled in
+        place; copy it to keep a snapshot. Once the stream ends, the complete
+        value is validated and yielded one last time.
+
+        Args:
+            Same as ``__call__``.
+
+        Yields:
+            Any: The value parsed so far, then the validated complete value.
+
+        Raises:
+            StructuredOutputError: If the output is not valid JSON or does not match the schema.
+            requests.exceptions.RequestException: If the request fails.
+        """
+        from .transport import get_transport
+
+        url, headers, payload = self.build_request(message, model_name, system_message, temperature, max_tokens, True)
+        response = get_transport().post(
+            url, deployment=model_name, json=payload, headers=headers, timeout=timeout, stream=True
+        )
+        response.raise_for_status()
+        family = get_model(model_name).family
+        parser = IncrementalJSONParser()
+        try:
+            for delta in iter_deltas(response, family):
+                parser.feed(delta)
+                partial = self._unwrap(parser.value, family)
+                if partial is not None:
+                    yield partial
+            value = parser.close()
+        except PartialJSONError as e:
+            raise StructuredOutputError(f"Output is not valid JSON: {e}", parser.root) from e
+        yield self.validate(self._unwrap(value, family))
+
+
+def structured(
+    message: str,
+    schema: Union[Dict[str, Any], CompiledSchema],
+    model_name: str = "gpt-4-o-mini",
+    **kwargs: Any,
+) -> Any:
+    """
+    One-off structured-output call; see ``StructuredOutput``.
+
+    Args:
+        message (str): User message content.
+        schema (Union[Dict[str, Any], CompiledSchema]): JSON schema of the expected output.
+        model_name (str): Deployment of any family in the model registry.
+        **kwargs: Passed to ``StructuredOutput.__call__``.
+
+    Returns:
+        Any: The validated value.
+    """
+    return StructuredOutput(schema)(message, model_name, **kwargs)
@@ -0,0 +1,489 @@
+import logging
+import threading
+import time
+from typing import Optional, Dict, List, Any, Callable, Sequence, Tuple
+
+from .codec import loads
+from .responses import Usage, response_usage
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds in seconds of the latency histogram buckets
+LATENCY_BUCKETS: Tuple[float, ...] = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+class RequestMetrics:
+    """
+    Measurements of one call through a transport, passed to every hook when it finishes.
+
+    Timings are in seconds and describe the last upstream attempt, except
+    ``total``, which spans the whole call including rate-limit waits and
+    retries. ``connect`` covers DNS resolution, TCP and TLS setup and is None
+    when a pooled connection was reused; ``ttfb`` runs from sending the
+    request to receiving the response headers. For streamed requests the call
+    ends when the headers arrive, and no response size or usage is recorded.
+    Token usage is parsed from the response body on first access.
+    """
+
+    __slots__ = (
+        "deployment", "url", "stream", "started_at", "status", "error", "attempts", "cache_hit", "coalesced",
+        "connect", "ttfb", "total", "request_bytes", "response_bytes", "_start", "_attempt", "_body", "_usage",
+    )
+
+    def __init__(self, deployment: Optional[str], url: str, stream: bool = False) -> None:
+        self.deployment = deployment
+        self.url = url
+        self.stream = stream
+        self.started_at = time.time_ns()
+        self.status: Optional[int] = None
+        self.error: Optional[str] = None
+        self.attempts = 0
+        self.cache_hit = False
+        self.coalesced = False
+        self.connect: Optional[float] = None
+        self.ttfb: Optional[float] = None
+        self.total = 0.0
+        self.request_bytes: Optional[int] = None
+        self.response_bytes: Optional[int] = None
+        self._start = self._attempt = time.perf_counter()
+        self._body: Optional[bytes] = None
+        self._usage: Optional[Usage] = None
+
+    @property
+    def retries(self) -> int:
+        """Upstream attempts beyond the first."""
+        return max(0, self.attempts - 1)
+
+    @property
+    def usage(self) -> Usage:
+        """Token usage reported by the response; zero if there is none."""
+        if self._usage is None:
+            usage = Usage(0, 0)
+            if self._body:
+                try:
+                    usage = response_usage(loads(self._body))
+                except (ValueError, AttributeError):
+                    pass
+            self._usage = usage
+            self._body = None
+        return self._usage
+
+    def begin_attempt(self) -> float:
+        """Count an upstream attempt and return its start time."""
+        self.attempts += 1
+        self.connect = None
+        self.ttfb = None
+        self._attempt = time.perf_counter()
+        return self._attempt
+
+    def fork(self, url: str, deployment: Optional[str]) -> "RequestMetrics":
+        """
+        Return a separate record for one arm of a hedged call.
+
+        Each arm measures its own attempts; ``join`` folds them back into this record.
+
+        Args:
+            url (str): URL the arm sends to.
+            deployment (Optional[str]): Deployment the arm sends to.
+
+        Returns:
+            RequestMetrics: The arm's record, which is never passed to the hooks.
+        """
+        return RequestMetrics(deployment, url, self.stream)
+
+    def join(self, arms: Sequence["RequestMetrics"], winner: Optional["RequestMetrics"]) -> None:
+        """
+        Fold the arms of a hedged call back into this record.
+
+        ``attempts`` counts the upstream attempts of every arm. The deployment,
+        URL and attempt timings are those of the arm whose response is returned.
+
+        Args:
+            arms (Sequence[RequestMetrics]): Records returned by ``fork``.
+            winner (Optional[RequestMetrics]): The arm whose response is returned; None if all failed.
+        """
+        self.attempts = sum(arm.attempts for arm in arms)
+        if winner is not None:
+            self.deployment = winner.deployment
+            self.url = winner.url
+            self.connect = winner.connect
+            self.ttfb = winner.ttfb
+            self.request_bytes = winner.request_bytes
+
+    def finish(self, response: Any = None, error: Optional[BaseException] = None) -> None:
+        """
+        Complete the measurements and pass them to the hooks.
+
+        Args:
+            response (Any): The ``requests`` or ``httpx`` response returned to the caller.
+            error (Optional[BaseException]): The exception raised instead.
+        """
+        self.total = time.perf_counter() - self._start
+        if response is not None:
+            self.status = response.status_code
+            if not self.stream:
+                body = response.content
+                self.response_bytes = len(body)
+                if self.status == 200:
+                    self._body = body
+        if error is not None:
+            self.error = type(error).__name__
+            self.status = getattr(error, "status_code", None)
+        emit(self)
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return the measurements as a flat dict, e.g. for structured logs."""
+        usage = self.usage
+        return {
+            "deployment": self.deployment,
+            "status": self.status,
+            "error": self.error,
+            "stream": self.stream,
+            "attempts": self.attempts,
+            "cache_hit": self.cache_hit,
+            "coalesced": self.coalesced,
+            "connect": self.connect,
+            "ttfb": self.ttfb,
+            "total": self.total,
+            "request_bytes": self.request_bytes,
+            "response_bytes": self.response_bytes,
+            "prompt_tokens": usage.prompt_tokens,
+            "completion_tokens": usage.completion_tokens,
+        }
+
+    def __repr__(self) -> str:
+        return (
+            f"RequestMetrics(deployment={self.deployment!r}, status={self.status!r}, error={self.error!r}, "
+            f"attempts={self.attempts}, total={self.total:.3f})"
+        )
+
+
+Hook = Callable[[RequestMetrics], None]
+
+# Replaced rather than mutated so the request path can iterate without a lock
+_hooks: Tuple[Hook, ...] = ()
+_hooks_lock = threading.Lock()
+
+
+def add_hook(hook: Hook) -> Hook:
+    """
+    Call ``hook`` with the ``RequestMetrics`` of every request once it finishes.
+
+    Hooks run synchronously on the calling thread (or event loop) and should
+    be quick; an exception in a hook is logged and does not affect the call.
+
+    Args:
+        hook (Hook): Callable taking a ``RequestMetrics``.
+
+    Returns:
+        Hook: ``hook``, so this can be used as a decorator.
+    """
+    global _hooks
+    with _hooks_lock:
+        if hook not in _hooks:
+            _hooks = _hooks + (hook,)
+    return hook
+
+
+def remove_hook(hook: Hook) -> None:
+    """Stop calling ``hook``; does nothing if it was not added."""
+    global _hooks
+    with _hooks_lock:
+        _hooks = tuple(h for h in _hooks if h != hook)
+
+
+def hooks_enabled() -> bool:
+    """Return whether any hook is installed; the transports measure nothing otherwise."""
+    return bool(_hooks)
+
+
+def emit(record: RequestMetrics) -> None:
+    """Pass finished measurements to every hook."""
+    for hook in _hooks:
+        try:
+            hook(record)
+        except Exception:
+            logger.exception("Telemetry hook %r failed", hook)
+
+
+class _Histogram:
+    __slots__ = ("counts", "sum", "count")
+
+    def __init__(self, buckets: int) -> None:
+        self.counts = [0] * buckets
+        self.sum = 0.0
+        self.count = 0
+
+
+def _labels(**labels: Any) -> str:
+    parts = []
+    for name, value in labels.items():
+        text = "" if value is None else str(value)
+        text = text.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        parts.append(f'{name}="{text}"')
+    return "{" + ",".join(parts) + "}"
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+# Counter name -> help text, in output order
+_COUNTERS: Dict[str, str] = {
+    "hkbu_requests_total": "Calls through the transports by deployment and outcome.",
+    "hkbu_request_attempts_total": "Upstream HTTP attempts, including retries.",
+    "hkbu_request_retries_total": "Upstream attempts beyond the first of each call.",
+    "hkbu_cache_hits_total": "Calls answered from the response cache.",
+    "hkbu_coalesced_requests_total": "Calls that shared an identical in-flight request.",
+    "hkbu_request_bytes_total": "Bytes of request bodies sent.",
+    "hkbu_response_bytes_total": "Bytes of response bodies received.",
+    "hkbu_tokens_total": "Tokens reported in response usage fields.",
+}
+
+
+class PrometheusMetrics:
+    """
+    Hook that aggregates request measurements into Prometheus-style metrics.
+
+    Counts calls, attempts, retries, cache hits, payload bytes and tokens per
+    deployment, and keeps latency histograms of the ``connect``, ``ttfb`` and
+    ``total`` phases. ``render`` returns the text exposition format, ready to
+    serve from a ``/metrics`` endpoint.
+
+    Example:
+        metrics = configure_metrics()
+        OpenAI("hello")
+        print(metrics.render())
+    """
+
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS) -> None:
+        """
+        Args:
+            buckets (Tuple[float, ...]): Upper bounds in seconds of the latency histogram buckets.
+        """
+        self.buckets = tuple(sorted(buckets))
+        self._counters: Dict[str, Dict[Tuple[Tuple[str, Any], ...], float]] = {name: {} for name in _COUNTERS}
+        self._histograms: Dict[Tuple[str, str], _Histogram] = {}
+        self._lock = threading.Lock()
+
+    def _add(self, name: str, value: float, **labels: Any) -> None:
+        if value:
+            series = self._counters[name]
+            key = tuple(labels.items())
+            series[key] = series.get(key, 0) + value
+
+    def _observe(self, deployment: str, phase: str, seconds: Optional[float]) -> None:
+        if seconds is None:
+            return
+        histogram = self._histograms.get((deployment, phase))
+        if histogram is None:
+            histogram = self._histograms[(deployment, phase)] = _Histogram(len(self.buckets))
+        for i, bound in enumerate(self.buckets):
+            if seconds <= bound:
+                histogram.counts[i] += 1
+                break
+        histogram.sum += seconds
+        histogram.count += 1
+
+    def __call__(self, record: RequestMetrics) -> None:
+        deployment = record.deployment or ""
+        usage = record.usage
+        outcome = record.error or ("cached" if record.cache_hit else record.status)
+        with self._lock:
+            self._add("hkbu_requests_total", 1, deployment=deployment, status=outcome)
+            self._add("hkbu_request_attempts_total", record.attempts, deployment=deployment)
+            self._add("hkbu_request_retries_total", record.retries, deployment=deployment)
+            self._add("hkbu_cache_hits_total", record.cache_hit, deployment=deployment)
+            self._add("hkbu_coalesced_requests_total", record.coalesced, deployment=deployment)
+            self._add("hkbu_request_bytes_total", record.request_bytes or 0, deployment=deployment)
+            self._add("hkbu_response_bytes_total", record.response_bytes or 0, deployment=deployment)
+            self._add("hkbu_tokens_total", usage.prompt_tokens, deployment=deployment, type="prompt")
+            self._add("hkbu_tokens_total", usage.completion_tokens, deployment=deployment, type="completion")
+            self._observe(deployment, "connect", record.connect)
+            self._observe(deployment, "ttfb", record.ttfb)
+            self._observe(deployment, "total", record.total)
+
+    def render(self) -> str:
+        """
+        Return all metrics in the Prometheus text exposition format.
+
+        Returns:
+            str: The exposition text.
+        """
+        lines: List[str] = []
+        with self._lock:
+            for name, help_text in _COUNTERS.items():
+                series = self._counters[name]
+                if not series:
+                    continue
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} counter")
+                for key, value in sorted(series.items(), key=lambda item: str(item[0])):
+                    lines.append(f"{name}{_labels(**dict(key))} {_number(value)}")
+            if self._histograms:
+                name = "hkbu_request_duration_seconds"
+                lines.append(f"# HELP {name} Latency of each request phase (connect, ttfb, total).")
+                lines.append(f"# TYPE {name} histogram")
+                for (deployment, phase), histogram in sorted(self._histograms.items()):
+                    cumulative = 0
+                    for bound, count in zip(self.buckets, histogram.counts):
+                        cumulative += count
+                        labels = _labels(deployment=deployment, phase=phase, le=_number(float(bound)))
+                        lines.append(f"{name}_bucket{labels} {cumulative}")
+                    labels = _labels(deployment=deployment, phase=phase, le="+Inf")
+                    lines.append(f"{name}_bucket{labels} {histogram.count}")
+                    labels = _labels(deployment=deployment, phase=phase)
+                    lines.append(f"{name}_sum{labels} {_number(histogram.sum)}")
+                    lines.append(f"{name}_count{labels} {histogram.count}")
+        return "\n".join(lines) + "\n" if lines else ""
+
+    def reset(self) -> None:
+        """Clear all collected metrics."""
+        with self._lock:
+            for series in self._counters.values():
+                series.clear()
+            self._histograms.clear()
+
+
+class OpenTelemetryHook:
+    """
+    Hook that reports each request as an OpenTelemetry client span.
+
+    Spans use the GenAI semantic conventions (``gen_ai.request.model``,
+    ``gen_ai.usage.input_tokens``, ...) and carry the retry count, cache hit,
+    payload sizes and connect time as attributes, with a ``first_byte`` event
+    at the TTFB. Requires the ``opentelemetry-api`` package.
+
+    Example:
+        add_hook(OpenTelemetryHook())
+    """
+
+    def __init__(self, tracer: Any = None) -> None:
+        """
+        Args:
+            tracer (Any): OpenTelemetry tracer (default: one from the global tracer provider).
+
+        Raises:
+            ImportError: If ``opentelemetry-api`` is not installed.
+        """
+        try:
+            from opentelemetry import trace
+        except ImportError as e:
+            raise ImportError("OpenTelemetryHook requires the opentelemetry-api package") from e
+        self.tracer = tracer or trace.get_tracer(__name__)
+        self._kind = trace.SpanKind.CLIENT
+        self._error = trace.Status(trace.StatusCode.ERROR)
+
+    def __call__(self, record: RequestMetrics) -> None:
+        from .registry import get_model
+
+        spec = get_model(record.deployment) if record.deployment else None
+        usage = record.usage
+        attributes: Dict[str, Any] = {
+            "gen_ai.operation.name": "chat",
+            "gen_ai.request.model": record.deployment or "",
+            "gen_ai.usage.input_tokens": usage.prompt_tokens,
+            "gen_ai.usage.output_tokens": usage.completion_tokens,
+            "hkbu.attempts": record.attempts,
+            "hkbu.retries": record.retries,
+            "hkbu.cache_hit": record.cache_hit,
+            "hkbu.coalesced": record.coalesced,
+            "hkbu.stream": record.stream,
+        }
+        if spec is not None:
+            attributes["gen_ai.system"] = spec.family
+        if record.status is not None:
+            attributes["http.response.status_code"] = record.status
+        if record.error is not None:
+            attributes["error.type"] = record.error
+        if record.request_bytes is not None:
+            attributes["http.request.body.size"] = record.request_bytes
+        if record.response_bytes is not None:
+            attributes["http.response.body.size"] = record.response_bytes
+        if record.connect is not None:
+            attributes["hkbu.connect_seconds"] = record.connect
+
+        span = self.tracer.start_span(
+            f"chat {record.deployment or ''}".strip(),
+            kind=self._kind,
+            attributes=attributes,
+            start_time=record.started_at,
+        )
+        if record.ttfb is not None:
+            offset = record._attempt - record._start + record.ttfb
+            span.add_event("first_byte", timestamp=record.started_at + int(offset * 1e9))
+        if record.error is not None:
+            span.set_status(self._error)
+        span.end(end_time=record.started_at + int(record.total * 1e9))
+
+
+class LoggingHook:
+    """
+    Hook that logs one line per request, with the measurements as structured fields.
+
+    The fields of ``RequestMetrics.as_dict`` are attached to the log record as
+    its ``metrics`` attribute for JSON formatters; prompts are never logged.
+
+    Example:
+        logging.basicConfig(level=logging.INFO)
+        add_hook(LoggingHook())
+    """
+
+    def __init__(self, logger: Optional[logging.Logger] = None, level: int = logging.INFO) -> None:
+        """
+        Args:
+            logger (Optional[logging.Logger]): Logger to write to (default: this module's).
+            level (int): Level of successful requests; failures are logged as warnings.
+        """
+        self.logger = logger or logging.getLogger(__name__)
+        self.level = level
+
+    def __call__(self, record: RequestMetrics) -> None:
+        level = logging.WARNING if record.error else self.level
+        if not self.logger.isEnabledFor(level):
+            return
+        self.logger.log(
+            level,
+            "%s %s in %.3fs (attempts=%d, cache_hit=%s)",
+            record.deployment, record.error or record.status, record.total, record.attempts, record.cache_hit,
+            extra={"metrics": record.as_dict()},
+        )
+
+
+_metrics: Optional[PrometheusMetrics] = None
+
+
+def get_metrics() -> Optional[PrometheusMetrics]:
+    """
+    Return the shared metrics collector, or None if metrics are not enabled.
+
+    Returns:
+        Optional[PrometheusMetrics]: The process-wide collector.
+    """
+    return _metrics
+
+
+def configure_metrics(**kwargs: Any) -> PrometheusMetrics:
+    """
+    Enable the shared Prometheus-style metrics collector as a hook.
+
+    Args:
+        **kwargs: Passed to ``PrometheusMetrics``.
+
+    Returns:
+        PrometheusMetrics: The new shared collector.
+    """
+    global _metrics
+    if _metrics is not None:
+        remove_hook(_metrics)
+    _metrics = PrometheusMetrics(**kwargs)
+    add_hook(_metrics)
+    return _metrics
+
+
+def disable_metrics() -> None:
+    """Remove the shared metrics collector."""
+    global _metrics
+    if _metrics is not None:
+        remove_hook(_metrics)
+        _metrics = None
@@ -0,0 +1,343 @@
+import functools
+from typing import Optional, Dict, List, Any, Tuple
+
+from .exceptions import ContextWindowExceededError
+from .registry import ModelSpec, get_model
+
+# Characters per token of English-like text for each family's tokenizer, used
+# when no exact tokenizer is available. Non-ASCII characters (e.g. CJK) are
+# counted as one token each.
+CHARS_PER_TOKEN: Dict[str, float] = {
+    "openai": 4.0,
+    "claude": 3.5,
+    "gemini": 4.0,
+    "llama": 3.8,
+    "deepseek": 3.5,
+    "qwen": 3.5,
+}
+DEFAULT_CHARS_PER_TOKEN: float = 4.0
+
+# Tokens added per message for role and separators
+MESSAGE_OVERHEAD: int = 4
+
+# Tokens charged for an attached image (low detail)
+IMAGE_TOKENS: int = 85
+
+# Estimated prompts may exceed the context window by this factor before a
+# request is rejected, since the heuristic can overcount
+ESTIMATE_SLACK: float = 1.1
+
+# Payload keys whose string values are not prompt text
+_NON_TEXT_KEYS = frozenset({"role", "type", "detail"})
+
+CONTEXT_MODES = ("truncate", "reject", "off")
+
+
+def heuristic_tokens(text: str, chars_per_token: float = DEFAULT_CHARS_PER_TOKEN) -> int:
+    """
+    Estimate the tokens of ``text`` without a tokenizer.
+
+    ASCII text is counted at ``chars_per_token``; every other character counts
+    as one token, which is close for CJK and conservative for accented Latin.
+
+    Args:
+        text (str): Text to measure.
+        chars_per_token (float): Average characters per token of ASCII text.
+
+    Returns:
+        int: Estimated number of tokens.
+    """
+    length = len(text)
+    if text.isascii():
+        return int(length / chars_per_token) + 1
+    # CJK characters take 3 UTF-8 bytes, so (bytes - chars) / 2 approximates their count
+    wide = min(length, (len(text.encode("utf-8")) - length) // 2)
+    return int((length - wide) / chars_per_token) + wide + 1
+
+
+@functools.lru_cache(maxsize=None)
+def load_encoding(name: str) -> Any:
+    """
+    Load a tiktoken encoding once per process.
+
+    Args:
+        name (str): Encoding name, e.g. ``"o200k_base"``.
+
+    Returns:
+        Any: The encoding, or None if tiktoken is not installed or the encoding cannot be loaded.
+    """
+    try:
+        import tiktoken
+        return tiktoken.get_encoding(name)
+    except Exception:
+        return None
+
+
+def _encoding_for(spec: Optional[ModelSpec]) -> Any:
+    if spec is None or spec.tokenizer is None:
+        return None
+    return load_encoding(spec.tokenizer)
+
+
+def count_tokens(text: str, model_name: Optional[str] = None) -> int:
+    """
+    Count the tokens of ``text`` for a model.
+
+    Exact when the model has a tiktoken tokenizer and tiktoken is installed;
+    estimated with ``heuristic_tokens`` otherwise.
+
+    Args:
+        text (str): Text to measure.
+        model_name (Optional[str]): Deployment whose tokenizer to use.
+
+    Returns:
+        int: Number of tokens.
+    """
+    spec = get_model(model_name) if model_name else None
+    encoding = _encoding_for(spec)
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+    ratio = CHARS_PER_TOKEN.get(spec.family, DEFAULT_CHARS_PER_TOKEN) if spec else DEFAULT_CHARS_PER_TOKEN
+    return heuristic_tokens(text, ratio)
+
+
+def _collect_text(value: Any, texts: List[str]) -> int:
+    # Appends the prompt strings under ``value`` and returns the number of images
+    if isinstance(value, str):
+        texts.append(value)
+        return 0
+    images = 0
+    if isinstance(value, dict):
+        for key, item in value.items():
+            if key == "image_url" or key == "fileData" or key == "inlineData":
+                images += 1
+            elif key not in _NON_TEXT_KEYS:
+                images += _collect_text(item, texts)
+    elif isinstance(value, list):
+        for item in value:
+            images += _collect_text(item, texts)
+    return images
+
+
+def prompt_tokens(payload: Dict[str, Any], model_name: Optional[str] = None) -> int:
+    """
+    Count the prompt tokens of a request payload in any family's format.
+
+    Messages (``messages`` / Gemini ``contents``), the system prompt, tool
+    definitions and embeddings ``input`` are counted. All text is measured
+    in one tokenizer call.
+
+    Args:
+        payload (Dict[str, Any]): The JSON payload built by a wrapper.
+        model_name (Optional[str]): Deployment whose tokenizer to use.
+
+    Returns:
+        int: Prompt tokens.
+    """
+    texts: List[str] = []
+    images = 0
+    messages = payload.get("messages") or payload.get("contents") or []
+    images += _collect_text(messages, texts)
+    for key in ("system", "systemInstruction", "tools", "input"):
+        if payload.get(key):
+            images += _collect_text(payload[key], texts)
+    if not texts and not images:
+        return 0
+    tokens = count_tokens("\n".join(texts), model_name) if texts else 0
+    return tokens + MESSAGE_OVERHEAD * len(messages) + IMAGE_TOKENS * images
+
+
+def output_tokens(payload: Dict[str, Any]) -> int:
+    """
+    Return the output cap requested by a payload.
+
+    Args:
+        payload (Dict[str, Any]): The JSON payload built by a wrapper.
+
+    Returns:
+        int: ``max_tokens`` or ``generationConfig.maxOutputTokens``, 0 if neither is set.
+    """
+    max_output = payload.get("max_tokens")
+    if max_output is None:
+        max_output = (payload.get("generationConfig") or {}).get("maxOutputTokens")
+    return max_output or 0
+
+
+def _set_output_tokens(payload: Dict[str, Any], value: int) -> None:
+    if "max_tokens" in payload:
+        payload["max_tokens"] = value
+    elif "maxOutputTokens" in (payload.get("generationConfig") or {}):
+        payload["generationConfig"]["maxOutputTokens"] = value
+
+
+def request_tokens(payload: Dict[str, Any], model_name: Optional[str] = None) -> int:
+    """
+    Estimate the tokens a request will consume: prompt plus the output cap.
+
+    Args:
+        payload (Dict[str, Any]): The JSON payload built by a wrapper.
+        model_name (Optional[str]): Deployment whose tokenizer to use.
+
+    Returns:
+        int: Prompt tokens plus ``output_tokens(payload)``.
+    """
+    return prompt_tokens(payload, model_name) + output_tokens(payload)
+
+
+_mode: str = "truncate"
+
+
+def configure_context_checks(mode: str = "truncate") -> None:
+    """
+    Set how requests that exceed a model's limits are handled before sending.
+
+    - ``"truncate"`` (default): the output cap is lowered to the model's
+      ``max_output_tokens`` and, when counts are exact, to the room left in
+      the context window; a
+      prompt that alone exceeds the window raises ``ContextWindowExceededError``.
+    - ``"reject"``: such requests raise instead of being truncated.
+    - ``"off"``: requests are sent unchanged.
+
+    Args:
+        mode (str): One of ``CONTEXT_MODES``.
+    """
+    global _mode
+    if mode not in CONTEXT_MODES:
+        raise ValueError(f"Unknown context check mode {mode!r}; expected one of {CONTEXT_MODES}")
+    _mode = mode
+
+
+def context_checks_enabled() -> bool:
+    """Return whether ``fit_request`` checks requests against model limits."""
+    return _mode != "off"
+
+
+def _check_inputs(payload: Dict[str, Any], model_name: str, spec: ModelSpec) -> int:
+    # Embeddings limit each input separately
+    inputs = payload["input"]
+    if isinstance(inputs, str):
+        inputs = [inputs]
+    exact = _encoding_for(spec) is not None
+    limit = spec.context_window if exact else spec.context_window * ESTIMATE_SLACK
+    total = 0
+    for index, text in enumerate(inputs):
+        tokens = count_tokens(text, model_name) if isinstance(text, str) else len(text)
+        if tokens > limit:
+            raise ContextWindowExceededError(
+                f"Input {index} has {tokens} tokens, over the {spec.context_window}-token limit of {model_name}",
+                tokens, spec.context_window,
+            )
+        total += tokens
+    return total
+
+
+def fit_request(payload: Dict[str, Any], model_name: Optional[str], mode: Optional[str] = None) -> int:
+    """
+    Check a request against its model's context window and output limit.
+
+    In ``"truncate"`` mode the payload's output cap is lowered in place when
+    needed. Models without limits in the registry are passed through.
+
+    Args:
+        payload (Dict[str, Any]): The JSON payload built by a wrapper.
+        model_name (Optional[str]): Deployment the request is sent to.
+        mode (Optional[str]): Overrides the mode set by ``configure_context_checks``.
+
+    Returns:
+        int: Estimated tokens of the request (prompt plus output cap), e.g. for rate limiting.
+
+    Raises:
+        ContextWindowExceededError: If the request cannot fit the model's limits.
+    """
+    mode = mode or _mode
+    spec = get_model(model_name) if model_name else None
+    if mode == "off" or spec is None or spec.context_window is None:
+        return request_tokens(payload, model_name)
+    if payload.get("input") is not None and "messages" not in payload:
+        return _check_inputs(payload, model_name, spec)
+
+    window = spec.context_window
+    prompt = prompt_tokens(payload, model_name)
+    exact = _encoding_for(spec) is not None
+    if prompt > (window if exact else window * ESTIMATE_SLACK):
+        raise ContextWindowExceededError(
+            f"Prompt has {'' if exact else 'an estimated '}{prompt} tokens, "
+            f"over the {window}-token context window of {model_name}",
+            prompt, window,
+        )
+    requested = output_tokens(payload)
+    allowed = spec.max_output_tokens or window
+    if exact:
+        allowed = min(allowed, window - prompt)
+    if requested > allowed:
+        if mode == "reject":
+            raise ContextWindowExceededError(
+                f"Requested {requested} output tokens with a {prompt}-token prompt; "
+                f"{model_name} allows at most {allowed}",
+                prompt, window,
+            )
+        _set_output_tokens(payload, max(1, allowed))
+        requested = max(1, allowed)
+    return prompt + requested
+
+
+def admit_request(payload: Optional[Dict[str, Any]], deployment: Optional[str], rate_limited: bool = False) -> int:
+    """
+    Run ``fit_request`` once before a request is sent, as the transports do.
+
+    Skipped entirely when context checks are off and no rate limiter needs
+    the token estimate, so it adds no work to such calls.
+
+    Args:
+        payload (Optional[Dict[str, Any]]): The JSON payload, if any.
+        deployment (Optional[str]): Deployment the request is sent to.
+        rate_limited (bool): Whether a rate limiter will need the token estimate.
+
+    Returns:
+        int: Estimated tokens of the request, or 0 if it was not checked.
+
+    Raises:
+        ContextWindowExceededError: If the request cannot fit the model's limits.
+    """
+    if payload is None or not deployment or (_mode == "off" and not rate_limited):
+        return 0
+    return fit_request(payload, deployment)
+
+
+def admit_body(
+    kwargs: Dict[str, Any], body_key: str, deployment: Optional[str], rate_limited: bool = False
+) -> Tuple[int, Dict[str, Any], Optional[bytes]]:
+    """
+    Run ``admit_request`` for a request that may carry a pre-serialized body.
+
+    A ``prepared.PromptTemplate`` passes both the payload (``json``), which
+    the checks, cache keys and token estimates read, and the same payload
+    already serialized under ``body_key``. Only the body is sent, unless the
+    check lowered the payload's output cap; the stale body is then dropped
+    and the payload serialized as usual.
+
+    Args:
+        kwargs (Dict[str, Any]): Keyword arguments of the transport call.
+        body_key (str): Keyword of the serialized body (``data`` or ``content``).
+        deployment (Optional[str]): Deployment the request is sent to.
+        rate_limited (bool): Whether a rate limiter will need the token estimate.
+
+    Returns:
+        Tuple[int, Dict[str, Any], Optional[bytes]]: The estimated tokens, the keyword
+        arguments to send and the body they carry, or None if the payload is sent.
+
+    Raises:
+        ContextWindowExceededError: If the request cannot fit the model's limits.
+    """
+    payload = kwargs.get("json")
+    body = kwargs.get(body_key)
+    if payload is None or body is None:
+        return admit_request(payload, deployment, rate_limited), kwargs, None
+    requested = output_tokens(payload)
+    tokens = admit_request(payload, deployment, rate_limited)
+    kwargs = dict(kwargs)
+    if output_tokens(payload) != requested:
+        del kwargs[body_key]
+        return tokens, kwargs, None
+    del kwargs["json"]
+    return tokens, kwargs, body
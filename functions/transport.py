@@ -0,0 +1,407 @@
+import logging
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from typing import Optional, Dict, List, Any, Tuple
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+from .cache import get_cache, cache_key, is_deterministic
+from .codec import encode_request
+from .exceptions import error_for
+from .hedge import get_hedger, backup_target, observe_latency
+from .ratelimit import get_rate_limiter, retry_after_seconds
+from .retry import RetryPolicy, RetryState, DEFAULT_RETRY_POLICY
+from .singleflight import SingleFlight
+from .telemetry import RequestMetrics, hooks_enabled
+from .tokens import admit_body
+from .usage import get_ledger
+
+logger = logging.getLogger(__name__)
+
+# Connection pool defaults. All wrappers talk to the same HKBU_BASIC_URL host,
+# so a single pool sized for the expected concurrency is enough.
+DEFAULT_POOL_CONNECTIONS: int = 4
+DEFAULT_POOL_MAXSIZE: int = 32
+DEFAULT_TIMEOUT: Optional[float] = None
+
+# Measurements of the request being sent on each thread, so that the pooled
+# connections can report how long they took to open
+_active = threading.local()
+
+
+class _TimedConnect:
+    """Mixin that reports the time to open a connection (DNS, TCP and TLS) to the active request."""
+
+    def connect(self) -> None:
+        record = getattr(_active, "record", None)
+        if record is None:
+            return super().connect()
+        start = time.perf_counter()
+        super().connect()
+        record.connect = time.perf_counter() - start
+
+
+class _TimedHTTPConnection(_TimedConnect, HTTPConnection):
+    pass
+
+
+class _TimedHTTPSConnection(_TimedConnect, HTTPSConnection):
+    pass
+
+
+class _TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _TimedHTTPConnection
+
+
+class _TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _TimedHTTPSConnection
+
+
+class _TimedAdapter(HTTPAdapter):
+    """``HTTPAdapter`` whose pools time new connections for ``telemetry.RequestMetrics``."""
+
+    def init_poolmanager(self, *args: Any, **kwargs: Any) -> None:
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _TimedHTTPConnectionPool,
+            "https": _TimedHTTPSConnectionPool,
+        }
+
+
+class Transport:
+    """
+    Keep-alive HTTP transport shared by every model wrapper.
+
+    Wraps a ``requests.Session`` mounted with a tuned ``HTTPAdapter`` so that
+    sequential and threaded calls reuse pooled TCP/TLS connections instead of
+    opening a new one per request.
+
+    Example:
+        with Transport(pool_maxsize=64) as transport:
+            set_transport(transport)
+            OpenAI("hello")
+    """
+
+    def __init__(
+        self,
+        pool_connections: int = DEFAULT_POOL_CONNECTIONS,
+        pool_maxsize: int = DEFAULT_POOL_MAXSIZE,
+        pool_block: bool = False,
+        timeout: Optional[float] = DEFAULT_TIMEOUT,
+        headers: Optional[Dict[str, str]] = None,
+        retry_policy: Optional[RetryPolicy] = DEFAULT_RETRY_POLICY,
+        coalesce: bool = True,
+    ) -> None:
+        """
+        Args:
+            pool_connections (int): Number of per-host pools to cache.
+            pool_maxsize (int): Maximum number of connections kept alive per host.
+            pool_block (bool): Block instead of opening overflow connections when the pool is exhausted.
+            timeout (Optional[float]): Default timeout in seconds for requests that don't pass one.
+            headers (Optional[Dict[str, str]]): Extra headers sent with every request.
+            retry_policy (Optional[RetryPolicy]): Retry policy for transient failures; None disables retries.
+            coalesce (bool): Share one upstream call between concurrent identical deterministic requests.
+        """
+        self.timeout = timeout
+        self.retry_policy = retry_policy
+        self.coalesce = coalesce
+        self._inflight = SingleFlight()
+        self.session = requests.Session()
+        adapter = _TimedAdapter(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            pool_block=pool_block,
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        if headers:
+            self.session.headers.update(headers)
+
+    def _send(
+        self,
+        url: str,
+        deployment: Optional[str],
+        kwargs: Dict[str, Any],
+        tokens: int = 0,
+        record: Optional[RequestMetrics] = None,
+    ) -> requests.Response:
+        limiter = get_rate_limiter() if deployment else None
+        policy = self.retry_policy
+        state = RetryState(policy) if policy is not None else None
+
+        while True:
+            if limiter is not None:
+                limiter.acquire(deployment, tokens)
+            response = None
+            retry_after = None
+            start = time.monotonic()
+            if record is not None:
+                record.begin_attempt()
+                _active.record = record
+            try:
+                response = self.session.post(url, **kwargs)
+            except requests.exceptions.Timeout as e:
+                if state is None:
+                    raise
+                kind, cause = "timeout", e
+            except requests.exceptions.ConnectionError as e:
+                if state is None:
+                    raise
+                kind, cause = "connection", e
+            else:
+                if record is not None:
+                    record.ttfb = response.elapsed.total_seconds()
+                    record.request_bytes = len(response.request.body or b"")
+                if limiter is not None and response.status_code == 429:
+                    limiter.pause(deployment, retry_after_seconds(response.headers))
+                kind = policy.classify(response.status_code) if policy is not None else None
+                if kind is None:
+                    if deployment and not kwargs.get("stream"):
+                        observe_latency(deployment, time.monotonic() - start)
+                    return response
+                cause = None
+                retry_after = retry_after_seconds(response.headers, default=None)
+            finally:
+                if record is not None:
+                    _active.record = None
+
+            delay = state.next_delay(kind, retry_after)
+            if delay is None:
+                raise error_for(kind, response, cause) from cause
+            if response is not None:
+                response.close()
+            logger.debug("Retrying request to %s in %.2fs after a %s failure", deployment or url, delay, kind)
+            time.sleep(delay)
+
+    def _hedged_send(
+        self, url: str, deployment: str, kwargs: Dict[str, Any], tokens: int, record: Optional[RequestMetrics] = None
+    ) -> requests.Response:
+        hedger = get_hedger()
+        backup_url, backup_deployment = backup_target(url, deployment, hedger.policy.siblings)
+        if record is None:
+            return hedger.run(
+                deployment,
+                lambda: self._send(url, deployment, kwargs, tokens),
+                lambda: self._send(backup_url, backup_deployment, kwargs, tokens),
+            )
+        # Each arm gets its own record, so concurrent attempts don't overwrite each other's timings
+        arms = (record.fork(url, deployment), record.fork(backup_url, backup_deployment))
+        returned: List[Tuple[requests.Response, RequestMetrics]] = []
+
+        def send(arm: RequestMetrics) -> requests.Response:
+            response = self._send(arm.url, arm.deployment, kwargs, tokens, arm)
+            returned.append((response, arm))
+            return response
+
+        response = None
+        try:
+            response = hedger.run(deployment, lambda: send(arms[0]), lambda: send(arms[1]))
+            return response
+        finally:
+            record.join(arms, next((arm for sent, arm in returned if sent is response), None))
+
+    def post(self, url: str, deployment: Optional[str] = None, hedge: bool = False, **kwargs: Any) -> requests.Response:
+        """
+        Send a POST request through the pooled session.
+
+        Requests over a usage budget are rejected or downgraded first (see
+        ``usage.Budget``). The payload is then checked against the deployment's
+        context window and output limit (see ``tokens.configure_context_checks``).
+        A ``data`` body passed with its ``json`` payload, as a ``prepared.PromptTemplate``
+        does, is sent without re-serializing the payload.
+        If a response cache is enabled, cacheable requests are answered from it.
+        Concurrent identical deterministic requests share one upstream call.
+        If rate limits are configured, each attempt first waits for the deployment's
+        quota, and a 429 answer pauses further requests to it. Transient failures
+        are retried according to ``retry_policy``. With ``hedge``, a backup request
+        is sent if the first is slower than the shared hedger's latency percentile.
+        If telemetry hooks are installed, each call is measured and reported to
+        them (see ``telemetry.add_hook``).
+
+        Args:
+            url (str): Request URL.
+            deployment (Optional[str]): Deployment name used for rate limiting.
+            hedge (bool): Hedge a non-streamed request (see ``hedge.HedgePolicy``).
+            **kwargs: Passed through to ``requests.Session.post``.
+
+        Returns:
+            requests.Response: The HTTP response.
+
+        Raises:
+            BudgetExceededError: If a hard usage budget for the request is used up.
+            ContextWindowExceededError: If the prompt cannot fit the deployment's context window.
+            HKBUAPIError: A typed error once the retry policy gives up.
+        """
+        kwargs.setdefault("timeout", self.timeout)
+        if not hooks_enabled():
+            return self._post(url, deployment, hedge, kwargs)
+        record = RequestMetrics(deployment, url, kwargs.get("stream", False))
+        try:
+            response = self._post(url, deployment, hedge, kwargs, record)
+        except Exception as e:
+            record.finish(error=e)
+            raise
+        record.finish(response)
+        return response
+
+    def _post(
+        self,
+        url: str,
+        deployment: Optional[str],
+        hedge: bool,
+        kwargs: Dict[str, Any],
+        record: Optional[RequestMetrics] = None,
+    ) -> requests.Response:
+        ledger = get_ledger()
+        if ledger is not None and ledger.budgets and deployment:
+            url, deployment, kwargs = ledger.admit(url, deployment, kwargs, "data")
+            if record is not None:
+                record.deployment = deployment
+        payload = kwargs.get("json")
+        tokens, kwargs, body = admit_body(kwargs, "data", deployment, get_rate_limiter() is not None)
+        streamed = kwargs.get("stream", False)
+        cache = get_cache()
+        key = cache.key_for(url, payload, body) if cache is not None and not streamed else None
+        if key is not None:
+            cached = cache.get(key)
+            if cached is not None:
+                if record is not None:
+                    record.cache_hit = True
+                return cached_response(url, cached)
+
+        kwargs = encode_request(kwargs, "data")
+        if key is None and self.coalesce and payload is not None and not streamed and is_deterministic(payload):
+            # Only compared within this process, so the encoded body can be hashed as is
+            flight_key = cache_key(url, payload, kwargs["data"])
+        else:
+            flight_key = key
+        def send() -> requests.Response:
+            if hedge and deployment and not streamed:
+                return self._hedged_send(url, deployment, kwargs, tokens, record)
+            return self._send(url, deployment, kwargs, tokens, record)
+
+        if flight_key is None:
+            return send()
+
+        response, shared = self._inflight.do(flight_key, send)
+        if shared:
+            if record is not None:
+                record.coalesced = True
+            return copy_response(response)
+        if key is not None and response.status_code == 200:
+            cache.set(key, response.content)
+        return response
+
+    def close(self) -> None:
+        """Close the session and release all pooled connections."""
+        self.session.close()
+
+    def __enter__(self) -> "Transport":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+
+def cached_response(url: str, body: bytes) -> requests.Response:
+    """
+    Build a ``requests.Response`` for a body served from the response cache.
+
+    Args:
+        url (str): Request URL.
+        body (bytes): Cached JSON body.
+
+    Returns:
+        requests.Response: A 200 response carrying ``body``.
+    """
+    response = requests.Response()
+    response.status_code = 200
+    response.reason = "OK"
+    response.url = url
+    response.encoding = "utf-8"
+    response.headers["Content-Type"] = "application/json"
+    response._content = body
+    return response
+
+
+def copy_response(response: requests.Response) -> requests.Response:
+    """
+    Copy a fully read response so each caller sharing it gets its own object.
+
+    Args:
+        response (requests.Response): The response to copy.
+
+    Returns:
+        requests.Response: An independent response with the same status, headers and body.
+    """
+    copy = requests.Response()
+    copy.status_code = response.status_code
+    copy.reason = response.reason
+    copy.url = response.url
+    copy.encoding = response.encoding
+    copy.headers.update(response.headers)
+    copy.request = response.request
+    copy._content = response.content
+    return copy
+
+
+_transport: Optional[Transport] = None
+_transport_lock = threading.Lock()
+
+
+def get_transport() -> Transport:
+    """
+    Return the shared transport, creating it with default settings on first use.
+
+    Returns:
+        Transport: The process-wide transport.
+    """
+    global _transport
+    if _transport is None:
+        with _transport_lock:
+            if _transport is None:
+                _transport = Transport()
+    return _transport
+
+
+def set_transport(transport: Transport) -> None:
+    """
+    Replace the shared transport used by the wrappers.
+
+    The previous transport is not closed; the caller owns its lifecycle.
+
+    Args:
+        transport (Transport): The transport to install.
+    """
+    global _transport
+    with _transport_lock:
+        _transport = transport
+
+
+def configure_transport(**kwargs: Any) -> Transport:
+    """
+    Close the shared transport and replace it with a newly configured one.
+
+    Args:
+        **kwargs: Passed to ``Transport``.
+
+    Returns:
+        Transport: The new shared transport.
+    """
+    global _transport
+    with _transport_lock:
+        if _transport is not None:
+            _transport.close()
+        _transport = Transport(**kwargs)
+    return _transport
+
+
+def close_transport() -> None:
+    """Close the shared transport. A fresh one is created on next use."""
+    global _transport
+    with _transport_lock:
+        if _transport is not None:
+            _transport.close()
+            _transport = None
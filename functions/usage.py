@@ -0,0 +1,531 @@
+import atexit
+import contextvars
+import logging
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Optional, Dict, List, Any, Iterable, Iterator, NamedTuple, Tuple
+
+from .exceptions import BudgetExceededError
+from .hedge import backup_target
+from .registry import get_model
+from .telemetry import RequestMetrics, add_hook, remove_hook
+
+logger = logging.getLogger(__name__)
+
+# Seconds of usage aggregated into one row of the ledger
+DEFAULT_WINDOW: int = 60
+# Seconds between writes of new usage to the ledger file
+DEFAULT_FLUSH_INTERVAL: float = 10.0
+
+_tag: "contextvars.ContextVar[Optional[str]]" = contextvars.ContextVar("usage_tag", default=None)
+
+
+@contextmanager
+def usage_tag(tag: Optional[str]) -> Iterator[None]:
+    """
+    Attribute the requests made inside the block to a caller tag, e.g. a team or feature.
+
+    The tag is a context variable, so it follows the code into coroutines,
+    tasks and the worker threads of ``run_batch``, ``fan_out``,
+    ``Embeddings``, ``Agent`` tools and hedged requests, which run each
+    call in a copy of the caller's context. Threads of your own executor
+    don't inherit it; set it inside the worker.
+
+    Args:
+        tag (Optional[str]): The tag; None for untagged usage.
+    """
+    token = _tag.set(tag)
+    try:
+        yield
+    finally:
+        _tag.reset(token)
+
+
+def current_tag() -> Optional[str]:
+    """Return the caller tag set by the enclosing ``usage_tag`` block, if any."""
+    return _tag.get()
+
+
+class UsageTotals(NamedTuple):
+    """Aggregated usage of a set of requests."""
+    requests: int
+    prompt_tokens: int
+    completion_tokens: int
+    cost: float
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
+
+
+class UsageRow(NamedTuple):
+    """Usage of one deployment and caller tag in one time window."""
+    start: int
+    deployment: str
+    tag: Optional[str]
+    requests: int
+    prompt_tokens: int
+    completion_tokens: int
+    cost: float
+
+
+class Budget:
+    """
+    A token or cost limit per period, for all requests or those of one deployment or caller tag.
+
+    Once the usage of the current period reaches the limit, a hard budget
+    rejects further matching requests with ``BudgetExceededError`` before
+    they are sent. A soft budget sends them to ``downgrade`` instead, or
+    only logs a warning if it has none. Periods are aligned to the epoch,
+    so a daily budget resets at midnight UTC. Requests already in flight
+    when the limit is reached still count, so usage can overshoot by them.
+    """
+
+    __slots__ = (
+        "max_tokens", "max_cost", "period", "deployment", "tag", "hard", "downgrade",
+        "_start", "_tokens", "_cost", "_warned",
+    )
+
+    def __init__(
+        self,
+        max_tokens: Optional[int] = None,
+        max_cost: Optional[float] = None,
+        period: float = 86400.0,
+        deployment: Optional[str] = None,
+        tag: Optional[str] = None,
+        hard: bool = True,
+        downgrade: Optional[str] = None,
+    ) -> None:
+        """
+        Args:
+            max_tokens (Optional[int]): Prompt plus completion tokens allowed per period.
+            max_cost (Optional[float]): Cost allowed per period, in the unit of the ledger's ``prices``.
+            period (float): Length of a budget period in seconds.
+            deployment (Optional[str]): Only count and gate requests to this deployment.
+            tag (Optional[str]): Only count and gate requests with this caller tag.
+            hard (bool): Reject requests over budget; otherwise downgrade them or log a warning.
+            downgrade (Optional[str]): Deployment of the same family that soft over-budget
+                requests to ``deployment`` are sent to instead.
+
+        Raises:
+            ValueError: If no limit is set, or ``downgrade`` is not a registered sibling of ``deployment``.
+        """
+        if max_tokens is None and max_cost is None:
+            raise ValueError("A budget needs max_tokens or max_cost")
+        if downgrade is not None:
+            spec, target = get_model(deployment) if deployment else None, get_model(downgrade)
+            if spec is None or target is None or spec.family != target.family:
+                raise ValueError(f"Cannot downgrade {deployment!r} to {downgrade!r}; both must be registered models of one family")
+        self.max_tokens = max_tokens
+        self.max_cost = max_cost
+        self.period = period
+        self.deployment = deployment
+        self.tag = tag
+        self.hard = hard
+        self.downgrade = downgrade
+        self._start = 0.0
+        self._tokens = 0
+        self._cost = 0.0
+        self._warned = -1.0
+
+    def __repr__(self) -> str:
+        limits = ", ".join(
+            f"{name}={value!r}" for name, value in (
+                ("max_tokens", self.max_tokens), ("max_cost", self.max_cost),
+                ("deployment", self.deployment), ("tag", self.tag),
+            ) if value is not None
+        )
+        return f"Budget({limits}, period={self.period!r})"
+
+    def matches(self, deployment: Optional[str], tag: Optional[str]) -> bool:
+        """Return whether requests to ``deployment`` with ``tag`` count against the budget."""
+        return (self.deployment is None or self.deployment == deployment) and (self.tag is None or self.tag == tag)
+
+    def period_start(self, now: float) -> float:
+        """Start of the period containing ``now``."""
+        return now - now % self.period
+
+    def _roll(self, now: float) -> None:
+        start = self.period_start(now)
+        if start != self._start:
+            self._start = start
+            self._tokens = 0
+            self._cost = 0.0
+
+    def add(self, tokens: int, cost: float, now: float) -> None:
+        self._roll(now)
+        self._tokens += tokens
+        self._cost += cost
+
+    def spent(self, now: Optional[float] = None) -> Tuple[int, float]:
+        """Tokens and cost used in the current period."""
+        self._roll(time.time() if now is None else now)
+        return self._tokens, self._cost
+
+    def exhausted(self, now: Optional[float] = None) -> bool:
+        """Return whether the current period's usage has reached a limit."""
+        tokens, cost = self.spent(now)
+        return (self.max_tokens is not None and tokens >= self.max_tokens) or (
+            self.max_cost is not None and cost >= self.max_cost
+        )
+
+
+class UsageLedger:
+    """
+    Thread-safe token and cost accounting per deployment, caller tag and time window.
+
+    Installed as a telemetry hook (see ``configure_usage``), it reads the
+    ``usage`` block of every successful upstream response; cache hits and
+    coalesced calls cost nothing and are not counted, and streamed
+    responses count as requests without tokens. Recording is a dict update
+    under a lock. With ``path`` set, new usage is added to a SQLite file by
+    a background thread every ``flush_interval`` seconds and at exit, so
+    several processes can share one ledger file.
+
+    Example:
+        ledger = configure_usage(path=".usage/ledger.sqlite", prices={"gpt-4-o": (2.5, 10.0)})
+        ledger.add_budget(Budget(max_tokens=2_000_000, tag="search", deployment="gpt-4-o", hard=False, downgrade="gpt-4-o-mini"))
+        with usage_tag("search"):
+            OpenAI("...", model_name="gpt-4-o")
+        ledger.report(since=time.time() - 3600)
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        window: int = DEFAULT_WINDOW,
+        flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+        prices: Optional[Dict[str, Tuple[float, float]]] = None,
+        budgets: Iterable[Budget] = (),
+    ) -> None:
+        """
+        Args:
+            path (Optional[str]): SQLite file to store usage in; memory only if None.
+            window (int): Seconds of usage aggregated per row.
+            flush_interval (float): Seconds between writes to ``path``.
+            prices (Optional[Dict[str, Tuple[float, float]]]): Deployment -> price per million
+                prompt and completion tokens; other deployments cost 0.
+            budgets (Iterable[Budget]): Budgets to enforce.
+        """
+        self.path = path
+        self.window = window
+        self.flush_interval = flush_interval
+        self.prices: Dict[str, Tuple[float, float]] = dict(prices or {})
+        # Replaced rather than mutated so the request path can iterate without a lock
+        self.budgets: Tuple[Budget, ...] = ()
+        self._lock = threading.Lock()
+        # Held while reading or writing the file, so no usage is in neither the file nor _pending
+        self._db_lock = threading.Lock()
+        # (window start, deployment, tag or "") -> [requests, prompt tokens, completion tokens, cost]
+        self._pending: Dict[Tuple[int, str, str], List[Any]] = {}
+        self._db: Optional[sqlite3.Connection] = None
+        self._stop = threading.Event()
+        self._flusher: Optional[threading.Thread] = None
+        if path:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS usage ("
+                "start INTEGER NOT NULL, deployment TEXT NOT NULL, tag TEXT NOT NULL, "
+                "requests INTEGER NOT NULL, prompt_tokens INTEGER NOT NULL, completion_tokens INTEGER NOT NULL, "
+                "cost REAL NOT NULL, PRIMARY KEY (start, deployment, tag)) WITHOUT ROWID"
+            )
+            self._flusher = threading.Thread(target=self._run, name="usage-flush", daemon=True)
+            self._flusher.start()
+            atexit.register(self.close)
+        for budget in budgets:
+            self.add_budget(budget)
+
+    def cost(self, deployment: str, prompt_tokens: int, completion_tokens: int) -> float:
+        """Price of a request's tokens according to ``prices``."""
+        price = self.prices.get(deployment)
+        if price is None:
+            return 0.0
+        return (prompt_tokens * price[0] + completion_tokens * price[1]) / 1_000_000
+
+    def record(
+        self,
+        deployment: str,
+        prompt_tokens: int,
+        completion_tokens: int,
+        tag: Optional[str] = None,
+        at: Optional[float] = None,
+    ) -> None:
+        """
+        Add one request's usage to the ledger and to the matching budgets.
+
+        Args:
+            deployment (str): Deployment that served the request.
+            prompt_tokens (int): Prompt tokens reported by the response.
+            completion_tokens (int): Completion tokens reported by the response.
+            tag (Optional[str]): Caller tag.
+            at (Optional[float]): Unix time of the request (default: now).
+        """
+        now = time.time() if at is None else at
+        key = (int(now - now % self.window), deployment, tag or "")
+        cost = self.cost(deployment, prompt_tokens, completion_tokens)
+        with self._lock:
+            row = self._pending.get(key)
+            if row is None:
+                row = self._pending[key] = [0, 0, 0, 0.0]
+            row[0] += 1
+            row[1] += prompt_tokens
+            row[2] += completion_tokens
+            row[3] += cost
+            for budget in self.budgets:
+                if budget.matches(deployment, tag):
+                    budget.add(prompt_tokens + completion_tokens, cost, now)
+
+    def __call__(self, record: RequestMetrics) -> None:
+        if record.status != 200 or record.cache_hit or record.coalesced or not record.deployment:
+            return
+        usage = record.usage
+        self.record(record.deployment, usage.prompt_tokens, usage.completion_tokens, current_tag())
+
+    def add_budget(self, budget: Budget) -> Budget:
+        """
+        Start enforcing a budget, counting the usage already recorded in its current period.
+
+        Args:
+            budget (Budget): The budget.
+
+        Returns:
+            Budget: ``budget``.
+        """
+        now = time.time()
+        start = budget.period_start(now)
+        with self._db_lock:
+            rows = self._stored(start, None, budget.deployment, budget.tag)
+            with self._lock:
+                rows.extend(self._pending_rows(start, None, budget.deployment, budget.tag))
+                budget._start = start
+                budget._tokens = sum(row.prompt_tokens + row.completion_tokens for row in rows)
+                budget._cost = sum(row.cost for row in rows)
+                self.budgets = self.budgets + (budget,)
+        return budget
+
+    def remove_budget(self, budget: Budget) -> None:
+        """Stop enforcing a budget; does nothing if it was not added."""
+        with self._lock:
+            self.budgets = tuple(b for b in self.budgets if b is not budget)
+
+    def admit(
+        self, url: str, deployment: str, kwargs: Dict[str, Any], body_key: str
+    ) -> Tuple[str, str, Dict[str, Any]]:
+        """
+        Apply the budgets to a request before it is sent, as the transports do.
+
+        Args:
+            url (str): Request URL.
+            deployment (str): Deployment the request is for.
+            kwargs (Dict[str, Any]): Keyword arguments of the transport call.
+            body_key (str): Keyword of a pre-serialized body (``data`` or ``content``).
+
+        Returns:
+            Tuple[str, str, Dict[str, Any]]: The URL, deployment and keyword arguments to send,
+            changed if a soft budget downgraded the request.
+
+        Raises:
+            BudgetExceededError: If a matching hard budget is used up.
+        """
+        tag = current_tag()
+        now = time.time()
+        for budget in self.budgets:
+            if not budget.matches(deployment, tag):
+                continue
+            with self._lock:
+                exhausted = budget.exhausted(now)
+            if not exhausted:
+                continue
+            if budget.hard:
+                raise BudgetExceededError(f"{budget!r} is used up for the current period", budget)
+            target_url, target = (
+                backup_target(url, deployment, {deployment: budget.downgrade}) if budget.downgrade else (url, deployment)
+            )
+            if target == deployment:
+                if budget._warned != budget._start:
+                    budget._warned = budget._start
+                    logger.warning("%r is used up; requests to %s are sent anyway", budget, deployment)
+                continue
+            logger.debug("%r is used up; sending the request to %s instead of %s", budget, target, deployment)
+            url, deployment = target_url, target
+            payload = kwargs.get("json")
+            if isinstance(payload, dict) and "model" in payload:
+                # e.g. Qwen names the model in the payload; a pre-serialized body would be stale
+                kwargs = dict(kwargs, json=dict(payload, model=target))
+                kwargs.pop(body_key, None)
+        return url, deployment, kwargs
+
+    def _stored(
+        self, since: Optional[float], until: Optional[float], deployment: Optional[str], tag: Optional[str]
+    ) -> List[UsageRow]:
+        # Caller holds _db_lock
+        if self._db is None:
+            return []
+        clauses, params = [], []
+        for clause, value in (("start >= ?", since), ("start < ?", until), ("deployment = ?", deployment), ("tag = ?", tag)):
+            if value is not None:
+                clauses.append(clause)
+                params.append(value)
+        where = " WHERE " + " AND ".join(clauses) if clauses else ""
+        rows = self._db.execute(
+            "SELECT start, deployment, tag, requests, prompt_tokens, completion_tokens, cost FROM usage" + where, params
+        ).fetchall()
+        return [UsageRow(start, name, label or None, *totals) for start, name, label, *totals in rows]
+
+    def _pending_rows(
+        self, since: Optional[float], until: Optional[float], deployment: Optional[str], tag: Optional[str]
+    ) -> List[UsageRow]:
+        # Caller holds _lock
+        return [
+            UsageRow(start, name, label or None, *row)
+            for (start, name, label), row in self._pending.items()
+            if (since is None or start >= since) and (until is None or start < until)
+            and (deployment is None or name == deployment) and (tag is None or label == tag)
+        ]
+
+    def report(
+        self,
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+        deployment: Optional[str] = None,
+        tag: Optional[str] = None,
+    ) -> List[UsageRow]:
+        """
+        Return the recorded usage per window, deployment and caller tag, oldest first.
+
+        Args:
+            since (Optional[float]): Only windows starting at or after this Unix time.
+            until (Optional[float]): Only windows starting before this Unix time.
+            deployment (Optional[str]): Only this deployment.
+            tag (Optional[str]): Only this caller tag; ``""`` selects untagged usage.
+
+        Returns:
+            List[UsageRow]: One row per window, deployment and tag.
+        """
+        with self._db_lock:
+            rows = self._stored(since, until, deployment, tag)
+            with self._lock:
+                rows.extend(self._pending_rows(since, until, deployment, tag))
+        merged: Dict[Tuple[int, str, Optional[str]], UsageRow] = {}
+        for row in rows:
+            key = row[:3]
+            other = merged.get(key)
+            merged[key] = row if other is None else row._replace(
+                requests=row.requests + other.requests,
+                prompt_tokens=row.prompt_tokens + other.prompt_tokens,
+                completion_tokens=row.completion_tokens + other.completion_tokens,
+                cost=row.cost + other.cost,
+            )
+        return sorted(merged.values(), key=lambda row: (row.start, row.deployment, row.tag or ""))
+
+    def totals(self, **kwargs: Any) -> UsageTotals:
+        """
+        Return the usage summed over ``report``'s rows.
+
+        Args:
+            **kwargs: Filters passed to ``report``.
+
+        Returns:
+            UsageTotals: The summed usage.
+        """
+        rows = self.report(**kwargs)
+        return UsageTotals(
+            sum(row.requests for row in rows),
+            sum(row.prompt_tokens for row in rows),
+            sum(row.completion_tokens for row in rows),
+            sum(row.cost for row in rows),
+        )
+
+    def flush(self) -> None:
+        """Add the usage recorded since the last flush to the ledger file."""
+        if self._db is None:
+            return
+        with self._db_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+            if not pending:
+                return
+            try:
+                self._db.execute("BEGIN")
+                self._db.executemany(
+                    "INSERT INTO usage VALUES (?, ?, ?, ?, ?, ?, ?) ON CONFLICT (start, deployment, tag) DO UPDATE SET "
+                    "requests = requests + excluded.requests, prompt_tokens = prompt_tokens + excluded.prompt_tokens, "
+                    "completion_tokens = completion_tokens + excluded.completion_tokens, cost = cost + excluded.cost",
+                    [(*key, *row) for key, row in pending.items()],
+                )
+                self._db.execute("COMMIT")
+            except sqlite3.Error:
+                if self._db.in_transaction:
+                    self._db.execute("ROLLBACK")
+                # Keep the usage for the next attempt
+                with self._lock:
+                    for key, row in pending.items():
+                        current = self._pending.setdefault(key, [0, 0, 0, 0.0])
+                        for i, value in enumerate(row):
+                            current[i] += value
+                raise
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self.flush()
+            except sqlite3.Error:
+                logger.exception("Writing usage to %s failed", self.path)
+
+    def close(self) -> None:
+        """Stop the flush thread, write the remaining usage and close the ledger file."""
+        if self._db is None:
+            return
+        self._stop.set()
+        if self._flusher is not None and self._flusher is not threading.current_thread():
+            self._flusher.join()
+        self.flush()
+        with self._db_lock:
+            self._db.close()
+            self._db = None
+        atexit.unregister(self.close)
+
+
+_ledger: Optional[UsageLedger] = None
+
+
+def get_ledger() -> Optional[UsageLedger]:
+    """
+    Return the shared usage ledger, or None if usage accounting is not enabled.
+
+    Returns:
+        Optional[UsageLedger]: The process-wide ledger.
+    """
+    return _ledger
+
+
+def configure_usage(**kwargs: Any) -> UsageLedger:
+    """
+    Enable the shared usage ledger as a hook, replacing and closing any previous one.
+
+    Args:
+        **kwargs: Passed to ``UsageLedger``.
+
+    Returns:
+        UsageLedger: The new shared ledger.
+    """
+    global _ledger
+    disable_usage()
+    _ledger = UsageLedger(**kwargs)
+    add_hook(_ledger)
+    return _ledger
+
+
+def disable_usage() -> None:
+    """Remove and close the shared usage ledger."""
+    global _ledger
+    if _ledger is not None:
+        remove_hook(_ledger)
+        _ledger.close()
+        _ledger = None
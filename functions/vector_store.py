@@ -0,0 +1,325 @@
+import hashlib
+import json
+import os
+import threading
+from typing import Optional, Dict, List, Any, Iterable, Sequence, Tuple, Union, TYPE_CHECKING
+
+from .embeddings import Embeddings, _import_numpy
+from .jsonl import truncate_partial_line
+
+if TYPE_CHECKING:
+    import numpy
+
+# Rows scored per matrix product during an exact scan, bounding temporary memory
+SCAN_BLOCK_ROWS: int = 65536
+
+
+def content_hash(text: str) -> str:
+    """
+    Hash used to recognise documents that are already stored.
+
+    Args:
+        text (str): Document text.
+
+    Returns:
+        str: Hex SHA-256 digest of the UTF-8 text.
+    """
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _normalize(np: Any, vectors: "numpy.ndarray") -> "numpy.ndarray":
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if vectors.ndim == 1:
+        vectors = vectors[None, :]
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def _top_k(np: Any, scores: "numpy.ndarray", k: int) -> "numpy.ndarray":
+    if k >= len(scores):
+        return np.argsort(-scores, kind="stable")
+    top = np.argpartition(-scores, k - 1)[:k]
+    return top[np.argsort(-scores[top], kind="stable")]
+
+
+class VectorStore:
+    """
+    Append-only on-disk embedding index with top-k cosine search.
+
+    A store is a directory holding:
+
+    - ``store.json``: embedding model and dimension
+    - ``vectors.f32``: L2-normalized float32 rows, memory-mapped for search
+    - ``records.jsonl``: one ``{"id", "hash", "text", "metadata"}`` record per row
+    - ``centroids.npy`` / ``lists.i32``: optional IVF partitioning (see ``build_ivf``)
+
+    Documents are deduplicated by content hash, so adding an unchanged
+    document again costs no embedding request.
+
+    Example:
+        store = VectorStore("index/")
+        store.add(documents, ids=paths)
+        store.search("How do I reset my password?", k=5)
+    """
+
+    def __init__(self, path: str, model_name: str = "text-embedding-3-small", store_text: bool = True) -> None:
+        """
+        Args:
+            path (str): Store directory; created if missing.
+            model_name (str): Embeddings deployment used for documents and queries.
+            store_text (bool): Keep document text in ``records.jsonl``.
+        """
+        self.np = _import_numpy()
+        self.path = path
+        self.store_text = store_text
+        self._lock = threading.Lock()
+        os.makedirs(path, exist_ok=True)
+
+        info: Dict[str, Any] = {}
+        if os.path.exists(self._file("store.json")):
+            with open(self._file("store.json"), "r", encoding="utf-8") as f:
+                info = json.load(f)
+        self.model_name: str = info.get("model", model_name)
+        self.dim: Optional[int] = info.get("dim")
+
+        self.records: List[Dict[str, Any]] = []
+        self.hashes: Dict[str, int] = {}
+        truncate_partial_line(self._file("records.jsonl"))
+        if os.path.exists(self._file("records.jsonl")):
+            with open(self._file("records.jsonl"), "r", encoding="utf-8") as f:
+                for line in f:
+                    self._index_record(json.loads(line))
+        self._repair()
+
+        self.centroids: Optional["numpy.ndarray"] = None
+        self.lists: Optional["numpy.ndarray"] = None
+        if os.path.exists(self._file("centroids.npy")):
+            self.centroids = self.np.load(self._file("centroids.npy"))
+            self.lists = self.np.fromfile(self._file("lists.i32"), dtype=self.np.int32)
+        self._vectors: Optional["numpy.ndarray"] = None
+
+    def _file(self, name: str) -> str:
+        return os.path.join(self.path, name)
+
+    def _index_record(self, record: Dict[str, Any]) -> None:
+        self.hashes.setdefault(record["hash"], len(self.records))
+        self.records.append(record)
+
+    def _repair(self) -> None:
+        # Rows and IVF assignments are written before their records, so after a
+        # crash these files may hold entries without a record; drop them.
+        if self.dim is None:
+            return
+        for name, row_size in (("vectors.f32", self.dim * 4), ("lists.i32", 4)):
+            path = self._file(name)
+            expected = len(self.records) * row_size
+            if os.path.exists(path) and os.path.getsize(path) > expected:
+                with open(path, "r+b") as f:
+                    f.truncate(expected)
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    @property
+    def vectors(self) -> "numpy.ndarray":
+        """Read-only ``(len(self), dim)`` memory map of the stored rows."""
+        np = self.np
+        if not self.records:
+            return np.empty((0, self.dim or 0), dtype=np.float32)
+        if self._vectors is None or len(self._vectors) != len(self.records):
+            self._vectors = np.memmap(self._file("vectors.f32"), dtype=np.float32, mode="r", shape=(len(self.records), self.dim))
+        return self._vectors
+
+    def add(
+        self,
+        texts: Sequence[str],
+        ids: Optional[Sequence[Any]] = None,
+        metadata: Optional[Sequence[Optional[Dict[str, Any]]]] = None,
+        **embed_kwargs: Any
+    ) -> int:
+        """
+        Embed and append documents that are not in the store yet.
+
+        Args:
+            texts (Sequence[str]): Document texts.
+            ids (Optional[Sequence[Any]]): Caller IDs, defaulting to the row number.
+            metadata (Optional[Sequence[Optional[Dict[str, Any]]]]): Per-document metadata.
+            **embed_kwargs: Passed to ``Embeddings`` (e.g. ``max_workers``).
+
+        Returns:
+            int: Number of documents embedded and added.
+        """
+        hashes = [content_hash(text) for text in texts]
+        new: List[int] = []
+        seen = set()
+        for i, h in enumerate(hashes):
+            if h not in self.hashes and h not in seen:
+                seen.add(h)
+                new.append(i)
+        if not new:
+            return 0
+
+        vectors = Embeddings([texts[i] for i in new], model_name=self.model_name, **embed_kwargs)
+        records = []
+        for i in new:
+            record: Dict[str, Any] = {"id": ids[i] if ids is not None else None, "hash": hashes[i]}
+            if self.store_text:
+                record["text"] = texts[i]
+            if metadata is not None and metadata[i] is not None:
+                record["metadata"] = metadata[i]
+            records.append(record)
+        return self.add_vectors(vectors, records)
+
+    def add_vectors(self, vectors: "numpy.ndarray", records: Iterable[Dict[str, Any]]) -> int:
+        """
+        Append precomputed embeddings.
+
+        Records whose ``hash`` is already stored are skipped.
+
+        Args:
+            vectors (numpy.ndarray): ``(n, dim)`` embeddings.
+            records (Iterable[Dict[str, Any]]): One record per row; ``hash`` is required.
+
+        Returns:
+            int: Number of rows added.
+        """
+        np = self.np
+        vectors = _normalize(np, vectors)
+        records = list(records)
+        if len(records) != len(vectors):
+            raise ValueError(f"Got {len(vectors)} vectors for {len(records)} records")
+
+        with self._lock:
+            keep = []
+            seen = set()
+            for i, record in enumerate(records):
+                if record["hash"] not in self.hashes and record["hash"] not in seen:
+                    seen.add(record["hash"])
+                    keep.append(i)
+            if not keep:
+                return 0
+            vectors = vectors[keep]
+            records = [records[i] for i in keep]
+
+            if self.dim is None:
+                self.dim = vectors.shape[1]
+                with open(self._file("store.json"), "w", encoding="utf-8") as f:
+                    json.dump({"model": self.model_name, "dim": self.dim}, f)
+            elif vectors.shape[1] != self.dim:
+                raise ValueError(f"Expected {self.dim}-dimensional vectors, got {vectors.shape[1]}")
+
+            start = len(self.records)
+            with open(self._file("vectors.f32"), "ab") as f:
+                f.write(np.ascontiguousarray(vectors).tobytes())
+            if self.centroids is not None:
+                assigned = np.argmax(vectors @ self.centroids.T, axis=1).astype(np.int32)
+                with open(self._file("lists.i32"), "ab") as f:
+                    f.write(assigned.tobytes())
+                self.lists = np.concatenate([self.lists, assigned])
+            with open(self._file("records.jsonl"), "a", encoding="utf-8") as f:
+                for i, record in enumerate(records):
+                    if record.get("id") is None:
+                        record["id"] = start + i
+                    f.write(json.dumps(record, ensure_ascii=False) + "\n")
+                    self._index_record(record)
+            return len(records)
+
+    def build_ivf(self, n_lists: Optional[int] = None, iterations: int = 10, sample_size: int = 256, seed: int = 0) -> None:
+        """
+        Partition the stored rows into ``n_lists`` clusters (spherical k-means).
+
+        Searches then score only the rows of the ``n_probe`` clusters closest to
+        the query, trading a little recall for a large speed-up on big stores.
+        Rows added later are assigned to the nearest existing cluster; rebuild
+        after the corpus has changed substantially.
+
+        Args:
+            n_lists (Optional[int]): Number of clusters (default: about ``sqrt(len(self))``).
+            iterations (int): k-means iterations.
+            sample_size (int): Training rows per cluster.
+            seed (int): Random seed.
+        """
+        np = self.np
+        vectors = self.vectors
+        n = len(vectors)
+        if n == 0:
+            raise ValueError("Cannot build an IVF index for an empty store")
+        n_lists = min(n, n_lists or max(1, int(n ** 0.5)))
+        rng = np.random.default_rng(seed)
+        sample = np.asarray(vectors[np.sort(rng.choice(n, min(n, n_lists * sample_size), replace=False))])
+        centroids = sample[rng.choice(len(sample), n_lists, replace=False)].copy()
+
+        for _ in range(iterations):
+            assigned = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assigned, sample)
+            filled = np.bincount(assigned, minlength=n_lists) > 0
+            centroids[filled] = _normalize(np, sums[filled])
+
+        lists = np.empty(n, dtype=np.int32)
+        for start in range(0, n, SCAN_BLOCK_ROWS):
+            block = vectors[start:start + SCAN_BLOCK_ROWS]
+            lists[start:start + len(block)] = np.argmax(block @ centroids.T, axis=1)
+
+        with self._lock:
+            np.save(self._file("centroids.npy"), centroids)
+            lists.tofile(self._file("lists.i32"))
+            self.centroids = centroids
+            self.lists = lists
+
+    def search(
+        self,
+        query: Union[str, "numpy.ndarray"],
+        k: int = 10,
+        n_probe: Optional[int] = 8,
+        exact: bool = False
+    ) -> List[Tuple[float, Dict[str, Any]]]:
+        """
+        Return the ``k`` stored documents most similar to ``query``.
+
+        Args:
+            query (Union[str, numpy.ndarray]): Query text (embedded with the store's model) or vector.
+            k (int): Number of results.
+            n_probe (Optional[int]): IVF clusters to scan, if an IVF index was built.
+            exact (bool): Scan every row even if an IVF index exists.
+
+        Returns:
+            List[Tuple[float, Dict[str, Any]]]: ``(cosine similarity, record)`` pairs, best first.
+        """
+        np = self.np
+        if not self.records or k <= 0:
+            return []
+        if isinstance(query, str):
+            query = Embeddings([query], model_name=self.model_name)
+        q = _normalize(np, query)[0]
+        vectors = self.vectors
+
+        if self.centroids is not None and not exact and n_probe and n_probe < len(self.centroids):
+            probes = _top_k(np, self.centroids @ q, n_probe)
+            rows = np.flatnonzero(np.isin(self.lists[:len(vectors)], probes))
+            scores = vectors[rows] @ q
+            top = _top_k(np, scores, k)
+            return [(float(scores[i]), self.records[rows[i]]) for i in top]
+
+        best_rows = np.empty(0, dtype=np.int64)
+        best_scores = np.empty(0, dtype=np.float32)
+        for start in range(0, len(vectors), SCAN_BLOCK_ROWS):
+            scores = np.concatenate([best_scores, vectors[start:start + SCAN_BLOCK_ROWS] @ q])
+            rows = np.concatenate([best_rows, np.arange(start, start + len(scores) - len(best_scores))])
+            top = _top_k(np, scores, k)
+            best_rows, best_scores = rows[top], scores[top]
+        return [(float(score), self.records[row]) for score, row in zip(best_scores, best_rows)]
+
+    def get(self, text: str) -> Optional[Dict[str, Any]]:
+        """
+        Return the record of a stored document, matched by content.
+
+        Args:
+            text (str): Document text.
+
+        Returns:
+            Optional[Dict[str, Any]]: The record, or None if not stored.
+        """
+        row = self.hashes.get(content_hash(text))
+        return self.records[row] if row is not None else None
@@ -0,0 +1,54 @@
+import asyncio
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+
+from mock_gateway import MockGateway, fixed_latency  # noqa: E402
+
+from functions import hedge  # noqa: E402
+from functions.async_transport import close_async_transport  # noqa: E402
+from functions.cache import disable_cache  # noqa: E402
+from functions.config import configure, reset_config  # noqa: E402
+from functions.ratelimit import disable_rate_limits  # noqa: E402
+from functions.telemetry import disable_metrics  # noqa: E402
+from functions.transport import close_transport  # noqa: E402
+from functions.usage import disable_usage  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def _server():
+    with MockGateway(latency=fixed_latency(0.0), seed=0) as server:
+        yield server
+
+
+@pytest.fixture
+def gateway(_server):
+    """The mock gateway with clean counters, configured as the shared endpoint."""
+    _server.reset()
+    _server.latency = fixed_latency(0.0)
+    _server.error_rate = 0.0
+    _server.rate_limit_rate = 0.0
+    _server.reply = "Hello"
+    configure(api_key="mock", base_url=_server.url)
+    yield _server
+    _server.reset()
+
+
+@pytest.fixture(autouse=True)
+def _reset_shared_state():
+    yield
+    disable_usage()
+    disable_cache()
+    disable_rate_limits()
+    disable_metrics()
+    close_transport()
+    asyncio.run(close_async_transport())
+    if hedge._hedger is not None:
+        hedge._hedger.close()
+        hedge._hedger = None
+    reset_config()
@@ -0,0 +1,125 @@
+import asyncio
+import threading
+import time
+
+from functions.agent import Agent, function_schema, tool
+from functions.responses import ToolCall
+
+
+@tool
+def add(a: int, b: int) -> int:
+    """Add two integers."""
+    return a + b
+
+
+def test_function_schema():
+    schema = function_schema(add.function)
+    assert schema["properties"] == {"a": {"type": "integer"}, "b": {"type": "integer"}}
+    assert schema["required"] == ["a", "b"]
+
+
+def test_run_tools_reports_errors_per_call():
+    @tool
+    def fail() -> None:
+        """Always fails."""
+        raise RuntimeError("boom")
+
+    agent = Agent("gpt-4-o-mini", [add, fail])
+    results = agent.run_tools([
+        ToolCall("1", "add", {"a": 1, "b": 2}),
+        ToolCall("2", "add", {"a": "x"}),
+        ToolCall("3", "fail", {}),
+        ToolCall("4", "missing", {}),
+    ])
+    assert results[0].value == 3 and not results[0].error
+    assert "invalid arguments" in results[1].content
+    assert "boom" in results[2].content
+    assert "unknown tool" in results[3].content
+
+
+def test_tools_run_in_parallel():
+    @tool
+    def slow(n: int) -> int:
+        """Sleep a bit."""
+        time.sleep(0.2)
+        return n
+
+    agent = Agent("gpt-4-o-mini", [slow])
+    start = time.monotonic()
+    results = agent.run_tools([ToolCall(str(n), "slow", {"n": n}) for n in range(20)])
+    assert time.monotonic() - start < 1.0
+    assert [result.value for result in results] == list(range(20))
+
+
+def test_hung_tools_do_not_starve_later_turns():
+    release = threading.Event()
+
+    @tool(timeout=0.05)
+    def hang() -> None:
+        """Never returns in time."""
+        release.wait(5)
+
+    agent = Agent("gpt-4-o-mini", [hang, add])
+    try:
+        for _ in range(3):
+            results = agent.run_tools([ToolCall(str(n), "hang", {}) for n in range(20)])
+            assert all("timed out" in result.content for result in results)
+        start = time.monotonic()
+        result, = agent.run_tools([ToolCall("x", "add", {"a": 1, "b": 1})])
+        assert result.value == 2
+        assert time.monotonic() - start < 0.5
+    finally:
+        release.set()
+
+
+def test_timeout_runs_from_tool_start():
+    @tool(timeout=0.3)
+    def steady() -> str:
+        """Takes 0.2s."""
+        time.sleep(0.2)
+        return "done"
+
+    agent = Agent("gpt-4-o-mini", [steady])
+    results = agent.run_tools([ToolCall(str(n), "steady", {}) for n in range(40)])
+    assert all(result.value == "done" for result in results)
+    assert all(result.latency < 0.3 for result in results)
+
+
+def test_arun_tools_times_out_coroutines_and_threads():
+    @tool(timeout=0.05)
+    async def sleepy() -> None:
+        """Sleeps too long."""
+        await asyncio.sleep(1)
+
+    @tool(timeout=0.05)
+    def blocking() -> None:
+        """Blocks too long."""
+        time.sleep(0.3)
+
+    agent = Agent("gpt-4-o-mini", [sleepy, blocking, add])
+    results = asyncio.run(agent.arun_tools([
+        ToolCall("1", "sleepy", {}), ToolCall("2", "blocking", {}), ToolCall("3", "add", {"a": 2, "b": 3}),
+    ]))
+    assert "timed out" in results[0].content
+    assert "timed out" in results[1].content
+    assert results[2].value == 5
+
+
+def test_run_loops_until_the_model_answers(gateway):
+    calls = {
+        "object": "chat.completion",
+        "choices": [{"index": 0, "finish_reason": "tool_calls", "message": {
+            "role": "assistant", "content": None,
+            "tool_calls": [{"id": "c1", "type": "function", "function": {"name": "add", "arguments": '{"a": 2, "b": 2}'}}],
+        }}],
+        "usage": {"prompt_tokens": 5, "completion_tokens": 1, "total_tokens": 6},
+    }
+    gateway.forced_body = calls
+    agent = Agent("gpt-4-o-mini", [add], max_turns=2)
+    result = agent.run("What is 2 + 2?")
+    assert result.turns == 2
+    assert [r.value for r in result.tool_results] == [4]
+    assert result.messages[-1] == {"role": "tool", "tool_call_id": "c1", "content": "4"}
+    gateway.forced_body = None
+    result = agent.run("What is 2 + 2?")
+    assert result.text == "Hello" and result.turns == 1
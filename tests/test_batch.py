@@ -0,0 +1,70 @@
+import json
+
+from functions.batch import read_done_ids, run_batch
+
+
+def write_lines(path, lines):
+    path.write_text("".join(line + "\n" for line in lines), encoding="utf-8")
+
+
+def read_results(path):
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+
+
+def test_run_batch_writes_every_record(gateway, tmp_path):
+    source, output = tmp_path / "in.jsonl", tmp_path / "out.jsonl"
+    write_lines(source, [json.dumps({"id": i, "model": "gpt-4-o-mini", "message": f"q{i}"}) for i in range(5)])
+    assert run_batch(str(source), str(output), max_workers=2) == 5
+    results = read_results(output)
+    assert [r["id"] for r in results] == list(range(5))
+    assert all("response" in r for r in results)
+
+
+def test_malformed_lines_become_error_records(gateway, tmp_path):
+    source, output = tmp_path / "in.jsonl", tmp_path / "out.jsonl"
+    write_lines(source, [
+        json.dumps({"model": "gpt-4-o-mini", "message": "first"}),
+        "{not json",
+        "[1, 2]",
+        json.dumps({"id": [1], "model": "gpt-4-o-mini", "message": "list id"}),
+        json.dumps({"model": "gpt-4-o-mini", "message": "last"}),
+    ])
+    assert run_batch(str(source), str(output)) == 5
+    results = {r["id"]: r for r in read_results(output)}
+    assert "response" in results[1]
+    assert "Invalid JSON on line 2" in results[2]["error"]
+    assert "not a JSON object" in results[3]["error"]
+    assert "id" in results[4]["error"]
+    assert "response" in results[5]
+
+
+def test_resume_skips_written_ids_including_errors(gateway, tmp_path):
+    source, output = tmp_path / "in.jsonl", tmp_path / "out.jsonl"
+    write_lines(source, ["{broken", json.dumps({"model": "gpt-4-o-mini", "message": "hi"})])
+    assert run_batch(str(source), str(output)) == 2
+    requests = gateway.requests
+    assert run_batch(str(source), str(output)) == 0
+    assert gateway.requests == requests
+    assert len(read_results(output)) == 2
+
+
+def test_resume_drops_a_partial_last_line(gateway, tmp_path):
+    source, output = tmp_path / "in.jsonl", tmp_path / "out.jsonl"
+    write_lines(source, [json.dumps({"id": i, "model": "gpt-4-o-mini", "message": "hi"}) for i in range(3)])
+    output.write_text(json.dumps({"id": 0, "response": "Hello"}) + '\n{"id": 1, "resp', encoding="utf-8")
+    assert run_batch(str(source), str(output)) == 2
+    assert sorted(r["id"] for r in read_results(output)) == [0, 1, 2]
+
+
+def test_read_done_ids_ignores_non_object_lines(tmp_path):
+    output = tmp_path / "out.jsonl"
+    write_lines(output, ['{"id": "a"}', "[1, 2]", '"text"', "3", '{"no_id": 1}'])
+    assert read_done_ids(str(output)) == {"a"}
+
+
+def test_unsupported_parameters_are_errors(gateway, tmp_path):
+    source, output = tmp_path / "in.jsonl", tmp_path / "out.jsonl"
+    write_lines(source, [json.dumps({"id": "s", "model": "gpt-4-o-mini", "message": "hi", "parameters": {"stream": True}})])
+    assert run_batch(str(source), str(output)) == 1
+    assert "stream" in read_results(output)[0]["error"]
+    assert gateway.requests == 0
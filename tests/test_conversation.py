@@ -0,0 +1,68 @@
+import pytest
+import requests
+
+from functions.conversation import Conversation
+
+EMPTY_CLAUDE = {"type": "message", "role": "assistant", "content": [], "stop_reason": "end_turn",
+                "usage": {"input_tokens": 5, "output_tokens": 0}}
+
+
+def roles(chat, family=None):
+    return [message["role"] for message in chat.messages(family)]
+
+
+def test_send_records_both_turns(gateway):
+    chat = Conversation("claude-3-haiku", system_message="Be brief.")
+    assert chat.send("Hi") == "Hello"
+    assert chat.send("Again") == "Hello"
+    assert roles(chat) == ["user", "assistant", "user", "assistant"]
+    assert gateway.last_request["system"] == "Be brief."
+    assert [m["role"] for m in gateway.last_request["messages"]] == ["user", "assistant", "user"]
+
+
+def test_reply_without_text_removes_the_user_turn(gateway):
+    chat = Conversation("claude-3-haiku")
+    chat.send("Hi")
+    tokens = chat.prompt_tokens
+    gateway.forced_body = EMPTY_CLAUDE
+    assert chat.send("Filtered?") is None
+    assert len(chat) == 2
+    assert chat.prompt_tokens == tokens
+    gateway.forced_body = None
+    chat.send("Next")
+    assert roles(chat, "claude") == ["user", "assistant", "user", "assistant"]
+    assert [m["role"] for m in gateway.last_request["messages"]] == ["user", "assistant", "user"]
+
+
+def test_failed_request_removes_the_user_turn(gateway):
+    chat = Conversation("gpt-4-o-mini")
+    gateway.forced_status = 400
+    with pytest.raises(requests.HTTPError):
+        chat.send("Hi")
+    assert len(chat) == 0
+
+
+def test_stream_records_the_reply_once_exhausted(gateway):
+    gateway.reply = "Hello there"
+    chat = Conversation("gpt-4-o-mini")
+    assert "".join(chat.send("Hi", stream=True)) == "Hello there"
+    assert [turn.content for turn in chat.turns] == ["Hi", "Hello there"]
+
+
+def test_stream_closed_early_removes_the_user_turn(gateway):
+    gateway.reply = "one two three four five six seven eight"
+    chat = Conversation("gemini-1.5-flash")
+    deltas = chat.send("Hi", stream=True)
+    next(deltas)
+    deltas.close()
+    assert len(chat) == 0
+    assert chat.messages("gemini") == []
+
+
+def test_trim_keeps_recent_turns(gateway):
+    chat = Conversation("gpt-4-o-mini", max_context_tokens=60, token_counter=lambda text: len(text.split()))
+    for i in range(10):
+        chat.send(f"question number {i} " * 3)
+    assert chat.prompt_tokens <= 60
+    assert chat.turns[-1].role == "assistant"
+    assert chat.turns[0].role == "user"
@@ -0,0 +1,83 @@
+import asyncio
+import threading
+import time
+
+from functions.hedge import Hedger, HedgePolicy, LatencyTracker
+
+
+def make_hedger(**kwargs):
+    policy = HedgePolicy(initial_delay=0.05, min_samples=1000, budget=1.0, burst=10.0)
+    return Hedger(policy, **kwargs)
+
+
+def test_percentile_needs_min_samples():
+    tracker = LatencyTracker()
+    for seconds in (0.1, 0.2, 0.3, 0.4):
+        tracker.observe("gpt-4-o", seconds)
+    assert tracker.percentile("gpt-4-o", 50, min_samples=5) is None
+    assert tracker.percentile("gpt-4-o", 50) == 0.3
+
+
+def test_no_delay_runs_primary_only():
+    hedger = Hedger(HedgePolicy())
+    assert hedger.run("gpt-4-o", lambda: "primary", lambda: "backup") == "primary"
+    assert hedger.hedges == 0
+
+
+def test_slow_primary_is_hedged():
+    hedger = make_hedger()
+    closed = []
+
+    class Slow:
+        def close(self):
+            closed.append(self)
+
+    def primary():
+        time.sleep(0.3)
+        return Slow()
+
+    start = time.perf_counter()
+    assert hedger.run("gpt-4-o", primary, lambda: "backup") == "backup"
+    assert time.perf_counter() - start < 0.25
+    assert hedger.hedges == 1
+    time.sleep(0.35)
+    assert len(closed) == 1
+    hedger.close()
+
+
+def test_delay_starts_when_primary_runs():
+    hedger = make_hedger(max_workers=1)
+    release = threading.Event()
+    hedger._executor().submit(release.wait, 1.0)
+    threading.Timer(0.2, release.set).start()
+    result = hedger.run("gpt-4-o", lambda: time.sleep(0.01) or "primary", lambda: "backup")
+    assert result == "primary"
+    assert hedger.hedges == 0
+    hedger.close()
+
+
+def test_budget_limits_hedges():
+    hedger = Hedger(HedgePolicy(initial_delay=0.01, min_samples=1000, budget=0.0, burst=1.0))
+    slow = lambda: time.sleep(0.05) or "primary"  # noqa: E731
+    assert hedger.run("gpt-4-o", slow, lambda: "backup") == "backup"
+    assert hedger.run("gpt-4-o", slow, lambda: "backup") == "primary"
+    assert hedger.hedges == 1
+    hedger.close()
+
+
+def test_arun_cancels_the_slower_request():
+    hedger = make_hedger()
+    cancelled = []
+
+    async def primary():
+        try:
+            await asyncio.sleep(1.0)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+
+    async def backup():
+        return "backup"
+
+    assert asyncio.run(hedger.arun("gpt-4-o", primary, backup)) == "backup"
+    assert cancelled == [True]
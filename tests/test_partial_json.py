@@ -0,0 +1,45 @@
+import json
+
+import pytest
+
+from functions.partial_json import IncrementalJSONParser, PartialJSONError
+
+DOCUMENT = {"name": "café \"x\"", "n": [1, -2.5, 3e2], "ok": True, "none": None, "nested": {"a": []}}
+
+
+def chunks(text, size):
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+@pytest.mark.parametrize("size", [1, 2, 7, 1000])
+def test_any_chunking_gives_the_same_value(size):
+    parser = IncrementalJSONParser()
+    for chunk in chunks(json.dumps(DOCUMENT), size):
+        parser.feed(chunk)
+    assert parser.close() == DOCUMENT
+    assert parser.done
+
+
+def test_partial_string_is_visible():
+    parser = IncrementalJSONParser()
+    parser.feed('{"title": "Hello wor')
+    assert parser.value == {"title": "Hello wor"}
+    parser.feed('ld", "items": [1, 2')
+    assert parser.value["title"] == "Hello world"
+    parser.feed("]}")
+    assert parser.close() == {"title": "Hello world", "items": [1, 2]}
+
+
+def test_code_fence_is_ignored():
+    parser = IncrementalJSONParser()
+    for chunk in ["```json\n", '{"a": ', "1}", "\n```"]:
+        parser.feed(chunk)
+    assert parser.close() == {"a": 1}
+
+
+@pytest.mark.parametrize("text", ['{"a": 1', '{"a": tru}', '{"a" 1}'])
+def test_invalid_or_truncated_json_raises(text):
+    parser = IncrementalJSONParser()
+    with pytest.raises(PartialJSONError):
+        parser.feed(text)
+        parser.close()
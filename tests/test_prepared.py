@@ -0,0 +1,74 @@
+import asyncio
+import base64
+import json
+
+import pytest
+
+from functions import openai
+from functions.async_transport import close_async_transport
+from functions.prepared import ImageCache, PromptTemplate
+
+PNG = b"\x89PNG\r\n\x1a\n" + b"\x00" * 16
+
+
+@pytest.mark.parametrize("message", ["plain", 'quotes " and \\ backslashes', "line\nbreak", "café ☕ 漢字"])
+def test_render_matches_the_payload(gateway, message):
+    template = PromptTemplate("claude-3-haiku", system_message="Be brief.", max_tokens=5)
+    url, headers, payload, body = template.render(message)
+    assert json.loads(body) == payload
+    assert payload["messages"][0]["content"] == message
+    assert payload["system"] == "Be brief."
+    assert url.startswith(gateway.url + "/deployments/claude-3-haiku/")
+
+
+def test_payload_matches_the_wrapper(gateway):
+    template = PromptTemplate("gpt-4-o-mini", system_message="Be brief.", temperature=0.5, max_tokens=7)
+    _, _, payload, _ = template.render("Hi")
+    _, _, expected = openai.build_request("Hi", "gpt-4-o-mini", None, 0.5, 7, system_message="Be brief.")
+    assert payload == expected
+
+
+def test_render_does_not_mutate_the_template(gateway):
+    template = PromptTemplate("gpt-4-o-mini")
+    first = template.render("one")[2]
+    template.render("two")
+    assert first["messages"][-1]["content"] == "one"
+
+
+def test_call_sends_the_rendered_body(gateway):
+    template = PromptTemplate("llama3_1", system_message="Be brief.")
+    assert template("Hi", as_response=True).text == "Hello"
+    assert gateway.last_request == template.render("Hi")[2]
+
+
+def test_call_returns_an_error_string(gateway):
+    gateway.forced_status = 400
+    assert PromptTemplate("gpt-4-o-mini")("Hi").startswith("Error:")
+
+
+def test_acall(gateway):
+    async def main():
+        try:
+            return await PromptTemplate("gpt-4-o-mini").acall("Hi")
+        finally:
+            await close_async_transport()
+
+    assert asyncio.run(main())["choices"][0]["message"]["content"] == "Hello"
+
+
+def test_unsupported_family():
+    with pytest.raises(ValueError):
+        PromptTemplate("gemini-1.5-flash")
+
+
+def test_image_cache_encodes_and_reuses(tmp_path):
+    cache = ImageCache()
+    url = cache.data_url(PNG)
+    assert url == "data:image/png;base64," + base64.b64encode(PNG).decode()
+    assert cache.data_url(url) == url
+
+    path = tmp_path / "picture.bin"
+    path.write_bytes(PNG)
+    assert cache.data_url(str(path)) is cache.data_url(path)
+    path.write_bytes(b"\xff\xd8\xff" + b"\x00" * 32)
+    assert cache.data_url(str(path)).startswith("data:image/jpeg;base64,")
@@ -0,0 +1,75 @@
+import json
+
+import dotenv
+import pytest
+
+from functions import registry
+from functions.openai import OpenAI
+from functions.registry import ModelRegistry, get_model, load_models, register_model
+
+EXTRA = {
+    "families": {"custom": {"endpoint": "/deployments/{model}/custom?v={api_version}", "auth": "bearer"}},
+    "models": [
+        {"model": "my-model", "family": "custom", "api-version": "7"},
+        {"model": "gpt-4-o-mini", "family": "openai", "api-version": "2099-01-01"},
+    ],
+}
+
+
+@pytest.fixture
+def fresh_registry(monkeypatch, tmp_path):
+    """A registry with only the bundled models, whose HKBU_MODELS_CONFIG has not been read yet."""
+    monkeypatch.setattr(registry, "REGISTRY", registry._default_registry())
+    monkeypatch.setattr(registry, "_environment_loaded", False)
+    monkeypatch.delenv("HKBU_MODELS_CONFIG", raising=False)
+    path = tmp_path / "models.json"
+    path.write_text(json.dumps(EXTRA))
+    return str(path)
+
+
+def test_bundled_models():
+    spec = get_model("claude-3-haiku")
+    assert spec.family == "claude"
+    assert spec.url("https://gw") == "https://gw/deployments/claude-3-haiku/messages/?api-version=20240307"
+    assert get_model("claude-3-haiku", family="openai") is None
+    assert get_model("no-such-model") is None
+
+
+def test_family_defaults_and_overrides(fresh_registry):
+    load_models(fresh_registry)
+    spec = get_model("my-model")
+    assert spec.url("https://gw") == "https://gw/deployments/my-model/custom?v=7"
+    assert spec.headers("key")["Authorization"] == "Bearer key"
+    assert get_model("gpt-4-o-mini").api_version == "2099-01-01"
+    assert get_model("gpt-4-o").api_version == "2024-10-21"
+
+
+def test_config_file_is_read_on_first_lookup(fresh_registry, monkeypatch):
+    # Set after the package was imported, as load_dotenv would from .env
+    monkeypatch.setenv("HKBU_MODELS_CONFIG", fresh_registry)
+    assert get_model("my-model") is not None
+
+
+def test_config_file_can_come_from_dotenv(fresh_registry, monkeypatch):
+    def load_dotenv():
+        monkeypatch.setenv("HKBU_MODELS_CONFIG", fresh_registry)
+
+    monkeypatch.setattr(dotenv, "load_dotenv", load_dotenv)
+    assert get_model("my-model").family == "custom"
+
+
+def test_registered_models_take_precedence_over_the_config_file(fresh_registry, monkeypatch):
+    monkeypatch.setenv("HKBU_MODELS_CONFIG", fresh_registry)
+    register_model("gpt-4-o-mini", family="openai", api_version="2024-10-21")
+    assert get_model("gpt-4-o-mini").api_version == "2024-10-21"
+
+
+def test_wrappers_use_registered_models(fresh_registry, gateway):
+    register_model("gpt-5-test", family="openai", api_version="1")
+    OpenAI("hi", model_name="gpt-5-test")
+    assert gateway.last_path == "/deployments/gpt-5-test/chat/completions/?api-version=1"
+
+
+def test_unknown_family_needs_an_endpoint():
+    with pytest.raises(ValueError):
+        ModelRegistry().register("x", "unknown", "1")
@@ -0,0 +1,105 @@
+import pytest
+import requests
+
+from functions import transport
+from functions.exceptions import AllDeploymentsFailedError, HKBUClientError
+from functions.router import Router, is_caller_error
+from functions.transport import configure_transport
+
+POOL = ["gpt-4-o-mini", "claude-3-haiku", "gemini-1.5-flash"]
+
+
+@pytest.fixture
+def router(gateway):
+    configure_transport(retry_policy=None)
+    return Router(POOL, failure_threshold=2, cooldown=60)
+
+
+def assert_idle(router):
+    for health in router.health.values():
+        assert health.inflight == 0
+        assert not health.probing
+
+
+def test_routes_to_a_healthy_deployment(router):
+    result = router("hi")
+    assert result.text == "Hello"
+    assert result.attempts == 1
+    assert_idle(router)
+
+
+def test_fails_over_and_opens_the_breaker(router, gateway):
+    gateway.deployment_statuses = {"gpt-4-o-mini": 503}
+    for _ in range(3):
+        result = router("hi")
+        assert result.model != "gpt-4-o-mini"
+    assert router.stats()["gpt-4-o-mini"]["circuit"] == "open"
+    assert "gpt-4-o-mini" not in router.candidates()
+    assert_idle(router)
+
+
+def test_rate_limits_fail_over(router, gateway):
+    gateway.deployment_statuses = {"gpt-4-o-mini": 429}
+    router.pool = ["gpt-4-o-mini", "claude-3-haiku"]
+    assert router("hi").model == "claude-3-haiku"
+    assert router.health["gpt-4-o-mini"].failures == 1
+
+
+def test_all_deployments_failed(router, gateway):
+    gateway.forced_status = 500
+    with pytest.raises(AllDeploymentsFailedError) as info:
+        router("hi")
+    assert set(info.value.errors) == set(POOL)
+    assert_idle(router)
+
+
+@pytest.mark.parametrize("status", [400, 401, 404, 422])
+def test_caller_errors_are_raised_without_failover(router, gateway, status):
+    gateway.forced_status = status
+    with pytest.raises(requests.HTTPError) as info:
+        router("hi")
+    assert info.value.response.status_code == status
+    assert gateway.requests == 1
+    for health in router.health.values():
+        assert health.failures == 0
+        assert health.error_rate == 0
+    assert_idle(router)
+
+
+def test_is_caller_error():
+    response = requests.Response()
+    for status, expected in ((400, True), (408, False), (429, False), (500, False)):
+        response.status_code = status
+        assert is_caller_error(requests.HTTPError(response=response)) is expected
+    assert not is_caller_error(requests.ConnectionError())
+
+
+def test_client_errors_release_the_deployment(router, monkeypatch):
+    class Failing:
+        def __init__(self, error):
+            self.error = error
+
+        def post(self, *args, **kwargs):
+            raise self.error
+
+    for error in (HKBUClientError("too long"), KeyboardInterrupt(), RuntimeError("hook failed")):
+        monkeypatch.setattr(transport, "get_transport", lambda error=error: Failing(error))
+        with pytest.raises(type(error)):
+            router("hi")
+        assert_idle(router)
+    assert all(health.failures == 0 for health in router.health.values())
+
+
+def test_probe_is_released_after_an_interrupt(router, monkeypatch):
+    health = router.health["gpt-4-o-mini"]
+    health.opened_at = 0.0
+    router.pool = ["gpt-4-o-mini"]
+
+    def interrupt(*args, **kwargs):
+        raise KeyboardInterrupt
+
+    monkeypatch.setattr(transport.get_transport(), "post", interrupt)
+    with pytest.raises(KeyboardInterrupt):
+        router("hi")
+    assert not health.probing
+    assert health.available(1e9, router.cooldown)
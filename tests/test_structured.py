@@ -0,0 +1,75 @@
+import json
+
+import pytest
+
+from functions.exceptions import StructuredOutputError
+from functions.structured import StructuredOutput, strict_schema
+
+PERSON = {
+    "type": "object",
+    "properties": {
+        "name": {"type": "string"},
+        "address": {"type": "object", "properties": {"city": {"type": "string"}}},
+        "tags": {"type": "array", "items": {"type": "object", "properties": {"label": {"type": "string"}}}},
+    },
+    "required": ["name"],
+}
+
+
+def object_nodes(schema):
+    if isinstance(schema, dict):
+        if schema.get("type") == "object":
+            yield schema
+        for value in schema.values():
+            yield from object_nodes(value)
+    elif isinstance(schema, list):
+        for item in schema:
+            yield from object_nodes(item)
+
+
+def test_strict_schema_normalizes_every_object():
+    normalized = strict_schema(PERSON)
+    nodes = list(object_nodes(normalized))
+    assert len(nodes) == 3
+    for node in nodes:
+        assert node["additionalProperties"] is False
+        assert node["required"] == list(node["properties"])
+    assert PERSON["required"] == ["name"]
+    assert "additionalProperties" not in PERSON
+
+
+def test_not_strict_by_default(gateway):
+    _, _, payload = StructuredOutput(PERSON).build_request("Who?")
+    json_schema = payload["response_format"]["json_schema"]
+    assert json_schema["strict"] is False
+    assert json_schema["schema"] == PERSON
+
+
+def test_strict_sends_normalized_schema(gateway):
+    _, _, payload = StructuredOutput(PERSON, strict=True).build_request("Who?")
+    json_schema = payload["response_format"]["json_schema"]
+    assert json_schema["strict"] is True
+    assert json_schema["schema"]["required"] == ["name", "address", "tags"]
+
+
+def test_call_validates_the_reply(gateway):
+    gateway.reply = json.dumps({"name": "Ada", "tags": [{"label": "math"}]})
+    assert StructuredOutput(PERSON)("Who?") == {"name": "Ada", "tags": [{"label": "math"}]}
+    gateway.reply = json.dumps({"tags": []})
+    with pytest.raises(StructuredOutputError) as info:
+        StructuredOutput(PERSON)("Who?")
+    assert info.value.errors
+
+
+def test_non_object_root_is_wrapped_and_unwrapped(gateway):
+    numbers = StructuredOutput({"type": "array", "items": {"type": "integer"}})
+    gateway.reply = json.dumps({"value": [1, 2, 3]})
+    assert numbers("Count") == [1, 2, 3]
+    assert gateway.last_request["response_format"]["json_schema"]["schema"]["required"] == ["value"]
+
+
+def test_stream_yields_growing_value(gateway):
+    gateway.reply = json.dumps({"name": "Ada Lovelace", "tags": [{"label": "math"}]})
+    values = [json.dumps(value) for value in StructuredOutput(PERSON).stream("Who?")]
+    assert json.loads(values[-1]) == {"name": "Ada Lovelace", "tags": [{"label": "math"}]}
+    assert len(values) > 1
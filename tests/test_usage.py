@@ -0,0 +1,107 @@
+import json
+
+import pytest
+
+from functions.agent import Agent, tool
+from functions.batch import run_batch
+from functions.embeddings import Embeddings
+from functions.exceptions import BudgetExceededError, HKBUClientError
+from functions.fanout import fan_out
+from functions.hedge import Hedger, HedgePolicy
+from functions.openai import OpenAI
+from functions.responses import ToolCall
+from functions.usage import Budget, configure_usage, current_tag, usage_tag
+
+MODELS = ["gpt-4-o-mini", "gpt-4-o"]
+
+
+@pytest.fixture
+def ledger(gateway):
+    return configure_usage(flush_interval=3600)
+
+
+def test_requests_are_tagged(ledger):
+    with usage_tag("search"):
+        OpenAI("hi")
+    OpenAI("hi")
+    assert ledger.totals(tag="search").requests == 1
+    assert ledger.totals(tag="").requests == 1
+    assert ledger.totals().prompt_tokens == 10
+
+
+def test_tag_follows_fan_out_threads(ledger):
+    with usage_tag("compare"):
+        results = list(fan_out("hi", MODELS))
+    assert all(result.ok for result in results)
+    assert ledger.totals(tag="compare").requests == 2
+
+
+def test_tag_follows_batch_workers(ledger, tmp_path):
+    source, output = tmp_path / "in.jsonl", tmp_path / "out.jsonl"
+    source.write_text("\n".join(json.dumps({"model": "gpt-4-o-mini", "message": f"q{i}"}) for i in range(4)))
+    with usage_tag("nightly"):
+        run_batch(str(source), str(output), max_workers=4)
+    assert ledger.totals(tag="nightly").requests == 4
+
+
+def test_tag_follows_embedding_batches(ledger):
+    with usage_tag("index"):
+        matrix = Embeddings([f"text {i}" for i in range(10)], batch_size=3, max_workers=4)
+    assert matrix.shape == (10, 8)
+    assert ledger.totals(tag="index").requests == 4
+
+
+def test_tag_follows_agent_tools_and_hedged_requests(gateway):
+    seen = []
+
+    @tool
+    def whoami() -> str:
+        """Return the caller tag."""
+        seen.append(current_tag())
+        return "ok"
+
+    agent = Agent("gpt-4-o-mini", [whoami])
+    hedger = Hedger(HedgePolicy(initial_delay=0.01, min_samples=1000))
+    with usage_tag("bot"):
+        agent.run_tools([ToolCall("1", "whoami", {})])
+        assert hedger.run("gpt-4-o-mini", current_tag, current_tag) == "bot"
+    assert seen == ["bot"]
+    hedger.close()
+
+
+def test_hard_budget_raises_in_fan_out(ledger):
+    ledger.add_budget(Budget(max_tokens=6, tag="capped"))
+    with usage_tag("capped"):
+        OpenAI("hi")
+        with pytest.raises(BudgetExceededError):
+            list(fan_out("hi", MODELS))
+    OpenAI("hi")
+
+
+def test_budget_errors_are_client_errors(ledger):
+    ledger.add_budget(Budget(max_tokens=1, deployment="gpt-4-o-mini"))
+    OpenAI("hi")
+    with pytest.raises(HKBUClientError):
+        OpenAI("hi")
+    assert isinstance(OpenAI("hi", model_name="gpt-4-o"), dict)
+
+
+def test_soft_budget_downgrades(ledger, gateway):
+    ledger.add_budget(Budget(max_tokens=1, deployment="gpt-4-o", hard=False, downgrade="gpt-4-o-mini"))
+    OpenAI("hi", model_name="gpt-4-o")
+    OpenAI("hi", model_name="gpt-4-o")
+    assert "/deployments/gpt-4-o-mini/" in gateway.last_path
+    assert ledger.totals(deployment="gpt-4-o-mini").requests == 1
+
+
+def test_usage_persists_and_primes_budgets(gateway, tmp_path):
+    path = str(tmp_path / "usage.sqlite")
+    ledger = configure_usage(path=path, flush_interval=3600)
+    with usage_tag("team"):
+        OpenAI("hi")
+    ledger.flush()
+    ledger = configure_usage(path=path, flush_interval=3600)
+    assert ledger.totals(tag="team").requests == 1
+    ledger.add_budget(Budget(max_tokens=6, tag="team"))
+    with usage_tag("team"), pytest.raises(BudgetExceededError):
+        OpenAI("hi")